@@ -0,0 +1,83 @@
+from collections import Counter, OrderedDict
+import threading
+import time
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from .config import ACCOUNT_CACHE_TTL_SECONDS, ACCOUNT_CACHE_MAX_ENTRIES
+from .models import Account
+
+# Process-level cache in front of "the user's account" lookups done by the
+# Accounts tools: user_id -> account_id with a short TTL, so each turn skips the
+# filter query on accounts.user_id. The transaction tools only need the ID;
+# get_balance loads the row by primary key. (A per-session row cache was tried,
+# but read tools run on separate sessions when several run at once, so it never hit.)
+# Writes to Account go through the ORM events below and invalidate the entry.
+
+
+class AccountCache:
+    def __init__(self, ttl_seconds: float = ACCOUNT_CACHE_TTL_SECONDS, max_entries: int = ACCOUNT_CACHE_MAX_ENTRIES):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries = OrderedDict() # user_id -> (stored_at, account_id)
+        self._lock = threading.Lock()
+        self.counters = Counter()
+
+    def get_account(self, db: Session, user_id: int):
+        account_id = self.account_id(db, user_id)
+        if account_id is None:
+            return None
+        return db.get(Account, account_id)
+
+    def account_id(self, db: Session, user_id: int):
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry and time.monotonic() - entry[0] <= self.ttl_seconds:
+                self._entries.move_to_end(user_id)
+                self.counters["hits"] += 1
+                return entry[1]
+
+        self.counters["misses"] += 1
+        account_id = db.query(Account.id).filter(Account.user_id == user_id).order_by(Account.id).limit(1).scalar()
+        if account_id is not None:
+            with self._lock:
+                self._entries[user_id] = (time.monotonic(), account_id)
+                self._entries.move_to_end(user_id)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return account_id
+
+    def invalidate(self, user_id: int):
+        with self._lock:
+            if self._entries.pop(user_id, None) is not None:
+                self.counters["invalidations"] += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        lookups = self.counters["hits"] + self.counters["misses"]
+        return {
+            "entries": len(self._entries),
+            **self.counters,
+            "hit_rate": self.counters["hits"] / lookups if lookups else 0.0,
+        }
+
+
+account_cache = AccountCache()
+
+
+@event.listens_for(Account, "after_insert")
+@event.listens_for(Account, "after_delete")
+def _invalidate_account(mapper, connection, target):
+    account_cache.invalidate(target.user_id)
+
+
+@event.listens_for(Account, "after_update")
+def _invalidate_updated_account(mapper, connection, target):
+    # Moving an account to another user invalidates both users
+    history = inspect(target).attrs.user_id.history
+    for user_id in list(history.deleted or []) + [target.user_id]:
+        account_cache.invalidate(user_id)
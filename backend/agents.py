@@ -1,48 +1,322 @@
-from groq import Groq
-from .config import GROQ_API_KEY
+from .config import GROQ_API_KEY, DB_THREADPOOL_SIZE, ROUTER_FAST_PATH, ROUTER_CONFIDENCE_THRESHOLD, RESPONSE_CACHE_ENABLED, TEMPLATED_TOOL_RESPONSES, SUBMISSION_QUEUE_ENABLED
 from .database import SessionLocal
 from .models import User, Account, Transaction, ServiceRequest
+from .router import default_classifiers
+from .cache import create_response_cache
+from .llm import LLMGateway
+from .metrics import agent_latency, tracer
+from .account_cache import account_cache
+from . import transactions as transaction_queries
+from .search import search_transactions
+from .submissions import submission_queue
 from sqlalchemy.orm import Session
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+import asyncio
+import contextvars
+import functools
 import json
 import time
 
-# Configure Groq
-if GROQ_API_KEY:
-    client = Groq(api_key=GROQ_API_KEY)
-    MODEL_NAME = "llama-3.3-70b-versatile" # Fast, smart, tool-capable model
-else:
-    client = None
+MODEL_NAME = "llama-3.3-70b-versatile" # Fast, smart, tool-capable model
+
+# Configure Groq; all completions go through the gateway (see llm.py). It is
+# built on the first LLM call, so startup doesn't pay for the SDK import.
+_llm = None
+if not GROQ_API_KEY:
     print("Warning: GROQ_API_KEY not set.")
 
+def get_llm():
+    global _llm
+    if _llm is None and GROQ_API_KEY:
+        _llm = LLMGateway()
+    return _llm
+
+def llm_stats():
+    return _llm.stats() if _llm else None
+
+# SQLAlchemy sessions are blocking, so tool queries run on a bounded pool
+# instead of the event loop. The bound keeps us under the DB connection limit.
+db_executor = ThreadPoolExecutor(max_workers=DB_THREADPOOL_SIZE, thread_name_prefix="db")
+
+# Shared across requests: FAQ answers from the CustomerSupportAgent
+faq_cache = create_response_cache()
+
+async def run_db(func, *args, **kwargs):
+    loop = asyncio.get_running_loop()
+    # Copy the context so trace spans opened on the DB thread nest under the caller's
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(db_executor, functools.partial(context.run, func, *args, **kwargs))
+
+def convert_history(history):
+    # Gemini history was [{'role': 'user', 'parts': ['msg']}]
+    # OpenAI/Groq history is [{'role': 'user', 'content': 'msg'}]
+    # Need to normalize frontend history or adapt it here.
+    # Assuming frontend sends compatible format or we convert.
+    # Frontend app.js sends: { role: 'user', parts: [text] }
+
+    new_history = []
+    for h in history:
+        # Server-side sessions already store converted messages
+        if 'content' in h:
+            new_history.append(h)
+            continue
+
+        role = h.get('role')
+        if role == "model": role = "assistant"
+
+        parts = h.get('parts', [])
+        content = parts[0] if parts else ""
+
+        new_history.append({"role": role, "content": content})
+    return new_history
+
 class BankingAgent:
+    system_prompt = ""
+    tools = []
+    # tool name -> format string over the tool's arguments and {result}
+    response_templates = {}
+    # Tools that only read; these may run concurrently on their own sessions
+    read_only_tools = set()
+    temperature = None
+
     def __init__(self, db: Session, user_id: int):
         self.db = db
         self.user_id = user_id
+        self._deferred_submissions = None
+
+    async def process(self, message: str, history: list):
+        start = time.perf_counter()
+        messages = self._build_messages(message, history)
+
+        if self.tools:
+            response_message = await self._complete_with_tools(messages)
+            if not response_message.tool_calls:
+                agent_latency.since("direct", start)
+                return response_message.content
+
+            # Append the model's response (which contains the tool call) to history
+            messages.append(response_message)
+            with tracer.span("tools", count=len(response_message.tool_calls)):
+                tool_messages = await self._run_tool_calls(response_message.tool_calls)
+            messages.extend(tool_messages)
+
+            # Simple tool results are rendered directly, skipping the second completion
+            rendered = self._render_templates(response_message.tool_calls, tool_messages)
+            if rendered is not None:
+                agent_latency.since("templated", start)
+                return rendered
+
+        # Final call to get the natural language response
+        with tracer.span("llm.summary" if self.tools else "llm.answer"):
+            completion = await get_llm().chat(
+                model=MODEL_NAME,
+                messages=messages,
+                **self._completion_options()
+            )
+        agent_latency.since("llm_summary" if self.tools else "direct", start)
+        return completion.choices[0].message.content
+
+    async def stream(self, message: str, history: list):
+        """Same flow as process(), yielding events and streaming the final completion."""
+        start = time.perf_counter()
+        messages = self._build_messages(message, history)
+
+        if self.tools:
+            # Streamed too: when the model answers without tools, this is the final answer
+            async for event in self._stream_with_tools(messages):
+                if event["type"] == "token":
+                    yield event
+                else:
+                    response_message, assistant = event["message"], event["assistant"]
+            if not response_message.tool_calls:
+                agent_latency.since("direct", start)
+                return
+
+            messages.append(assistant)
+            for tool_call in response_message.tool_calls:
+                yield {"type": "tool", "name": tool_call.function.name}
+            with tracer.span("tools", count=len(response_message.tool_calls)):
+                tool_messages = await self._run_tool_calls(response_message.tool_calls)
+            messages.extend(tool_messages)
+
+            rendered = self._render_templates(response_message.tool_calls, tool_messages)
+            if rendered is not None:
+                yield {"type": "token", "content": rendered}
+                agent_latency.since("templated", start)
+                return
+
+        with tracer.span("llm.summary" if self.tools else "llm.answer", stream=True):
+            stream = get_llm().chat_stream(
+                model=MODEL_NAME,
+                messages=messages,
+                **self._completion_options()
+            )
+            async for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield {"type": "token", "content": chunk.choices[0].delta.content}
+        agent_latency.since("llm_summary" if self.tools else "direct", start)
+
+    def call_tool(self, db: Session, name: str, args: dict):
+        # Runs on a DB worker thread; subclasses dispatch their tools and defer to super()
+        return "Error: Unknown function"
+
+    def _render_templates(self, tool_calls, tool_messages):
+        # Only when every tool in the turn declares a template; anything that
+        # needs analysis (e.g. transaction questions) goes back to the LLM.
+        if not TEMPLATED_TOOL_RESPONSES:
+            return None
+        if not all(tool_call.function.name in self.response_templates for tool_call in tool_calls):
+            return None
+
+        parts = []
+        for tool_call, tool_message in zip(tool_calls, tool_messages):
+            try:
+                # {result} is always the tool's output, even if the model sent an argument named result
+                values = {**json.loads(tool_call.function.arguments or "{}"), "result": tool_message["content"]}
+                parts.append(self.response_templates[tool_call.function.name].format_map(values))
+            except (KeyError, IndexError, ValueError, TypeError):
+                return None
+        return "\n\n".join(parts)
+
+    def _completion_options(self):
+        if self.temperature is None:
+            return {}
+        return {"temperature": self.temperature}
+
+    def _build_messages(self, message: str, history: list):
+        messages = [{"role": "system", "content": self.system_prompt}] + self._convert_history(history)
+        messages.append({"role": "user", "content": message})
+        return messages
+
+    async def _complete_with_tools(self, messages):
+        with tracer.span("llm.tools") as span:
+            response = await get_llm().chat(
+                model=MODEL_NAME,
+                messages=messages,
+                tools=self.tools,
+                tool_choice="auto",
+            )
+            span.set(tool_calls=len(response.choices[0].message.tool_calls or []))
+        return response.choices[0].message
+
+    async def _stream_with_tools(self, messages):
+        """Stream the tool-calling completion: content deltas are yielded as tokens,
+        then one "message" event with the assembled message (tool calls readable
+        by attribute, like a non-streamed one) and its dict form for the history."""
+        content, calls = [], {}
+        with tracer.span("llm.tools", stream=True) as span:
+            stream = get_llm().chat_stream(
+                model=MODEL_NAME,
+                messages=messages,
+                tools=self.tools,
+                tool_choice="auto",
+            )
+            async for chunk in stream:
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta
+                if delta.content:
+                    content.append(delta.content)
+                    yield {"type": "token", "content": delta.content}
+                # Tool calls arrive in pieces keyed by index; the arguments are concatenated
+                for part in delta.tool_calls or []:
+                    call = calls.setdefault(part.index, {"id": None, "name": "", "arguments": ""})
+                    call["id"] = part.id or call["id"]
+                    if part.function:
+                        call["name"] += part.function.name or ""
+                        call["arguments"] += part.function.arguments or ""
+            span.set(tool_calls=len(calls))
+
+        tool_calls = [
+            SimpleNamespace(id=call["id"], type="function",
+                            function=SimpleNamespace(name=call["name"], arguments=call["arguments"]))
+            for _, call in sorted(calls.items())
+        ]
+        assistant = {"role": "assistant", "content": "".join(content)}
+        if tool_calls:
+            assistant["tool_calls"] = [
+                {"id": call.id, "type": "function",
+                 "function": {"name": call.function.name, "arguments": call.function.arguments}}
+                for call in tool_calls
+            ]
+        yield {"type": "message", "message": SimpleNamespace(content=assistant["content"], tool_calls=tool_calls),
+               "assistant": assistant}
+
+    async def _run_tool_calls(self, tool_calls):
+        """Run one turn's tool calls and return their tool messages in tool_call order.
+
+        Read-only tools run concurrently, each on its own session when anything
+        else runs alongside it. Mutating tools run one after another on the
+        request session and are committed together in a single transaction;
+        queued submissions are journaled only after that commit.
+        """
+        calls = [(tool_call.function.name, json.loads(tool_call.function.arguments or "{}")) for tool_call in tool_calls]
+        reads = [i for i, (name, _) in enumerate(calls) if name in self.read_only_tools]
+        writes = [i for i, (name, _) in enumerate(calls) if name not in self.read_only_tools]
+        results = [None] * len(calls)
+
+        own_session = len(reads) + (1 if writes else 0) > 1
+
+        async def run_read(i):
+            name, args = calls[i]
+            if own_session:
+                results[i] = await run_db(self._call_tool_in_new_session, name, args)
+            else:
+                results[i] = await run_db(self._traced_call, self.db, name, args)
+
+        async def run_writes():
+            for i, result in zip(writes, await run_db(self._call_tools_in_transaction, [calls[i] for i in writes])):
+                results[i] = result
+
+        jobs = [run_read(i) for i in reads]
+        if writes:
+            jobs.append(run_writes())
+        await asyncio.gather(*jobs)
+
+        return [
+            {
+                "tool_call_id": tool_call.id,
+                "role": "tool",
+                "name": name,
+                "content": str(result),
+            }
+            for tool_call, (name, _), result in zip(tool_calls, calls, results)
+        ]
+
+    def _traced_call(self, db: Session, name: str, args: dict):
+        with tracer.span(f"tool.{name}"):
+            return self.call_tool(db, name, args)
+
+    def _call_tool_in_new_session(self, name: str, args: dict):
+        db = SessionLocal()
+        try:
+            return self._traced_call(db, name, args)
+        finally:
+            db.close()
+
+    def _call_tools_in_transaction(self, calls):
+        # Queued submissions live in the journal, outside this transaction, so they
+        # are only journaled once it commits: a failed turn leaves neither behind
+        self._deferred_submissions = []
+        try:
+            results = [self._traced_call(self.db, name, args) for name, args in calls]
+            self.db.commit()
+            if self._deferred_submissions:
+                submission_queue.accept(self._deferred_submissions)
+        except Exception:
+            self.db.rollback()
+            raise
+        finally:
+            self._deferred_submissions = None
+        return results
 
-    def process(self, message: str, history: list):
-        raise NotImplementedError
-        
     def _convert_history(self, history):
-        # Gemini history was [{'role': 'user', 'parts': ['msg']}]
-        # OpenAI/Groq history is [{'role': 'user', 'content': 'msg'}]
-        # Need to normalize frontend history or adapt it here.
-        # Assuming frontend sends compatible format or we convert.
-        # Frontend app.js sends: { role: 'user', parts: [text] }
-        
-        new_history = []
-        for h in history:
-            role = h.get('role')
-            if role == "model": role = "assistant"
-            
-            parts = h.get('parts', [])
-            content = parts[0] if parts else ""
-            
-            new_history.append({"role": role, "content": content})
-        return new_history
+        return convert_history(history)
 
 class CustomerSupportAgent(BankingAgent):
-    def process(self, message: str, history: list):
-        system_prompt = """
+    system_prompt = """
         You are a helpful Customer Support Agent for a bank.
         You can answer questions about:
         - Branch working hours (9 AM - 5 PM, Mon-Sat)
@@ -53,119 +327,244 @@ class CustomerSupportAgent(BankingAgent):
         
         If the user asks about personal details, account balance, or loans, politely say you can't help with that and they should ask the relevant department.
         """
-        
-        messages = [{"role": "system", "content": system_prompt}] + self._convert_history(history)
-        messages.append({"role": "user", "content": message})
-        
-        completion = client.chat.completions.create(
-            model=MODEL_NAME,
-            messages=messages,
-            temperature=0.7
-        )
-        return completion.choices[0].message.content
+    temperature = 0.7
+
+    async def process(self, message: str, history: list):
+        start = time.perf_counter()
+        cached = await self._cached_answer(message)
+        if cached is not None:
+            agent_latency.since("cached", start)
+            return cached
+
+        answer = await super().process(message, history)
+        await self._remember_answer(message, history, answer)
+        return answer
+
+    async def stream(self, message: str, history: list):
+        start = time.perf_counter()
+        cached = await self._cached_answer(message)
+        if cached is not None:
+            yield {"type": "token", "content": cached}
+            agent_latency.since("cached", start)
+            return
+
+        tokens = []
+        async for event in super().stream(message, history):
+            if event["type"] == "token":
+                tokens.append(event["content"])
+            yield event
+        await self._remember_answer(message, history, "".join(tokens))
+
+    async def _cached_answer(self, message: str):
+        if not RESPONSE_CACHE_ENABLED:
+            return None
+        if faq_cache.blocking:
+            # The shared cache reads the database
+            return await run_db(faq_cache.get, message, self.system_prompt)
+        return faq_cache.get(message, self.system_prompt)
+
+    async def _remember_answer(self, message: str, history: list, answer: str):
+        # Only cache answers to standalone questions so they never depend on earlier turns.
+        # With server-side sessions that is the first message of each conversation;
+        # later turns are still answered from the cache, just never stored.
+        if RESPONSE_CACHE_ENABLED and answer and not history:
+            if faq_cache.blocking:
+                await run_db(faq_cache.put, message, self.system_prompt, answer)
+            else:
+                faq_cache.put(message, self.system_prompt, answer)
 
 class AccountsAgent(BankingAgent):
-    def process(self, message: str, history: list):
-        system_prompt = """
+    system_prompt = """
         You are the Accounts Agent for NeoBank.
         You have DIRECT ACCESS to the user's database via tools.
         
         PERMISSIONS:
         - You ARE authorized to check balances and transactions.
         - You SHOULD NOT refuse to answer valid queries about the user's account.
-        - When asked about transactions (like 'coffee' or 'deposits'), call 'get_recent_transactions' first, then analyze the result to answer.
+        - For totals ("how much did I spend on coffee last month") call 'aggregate_transactions' with filters (transaction_type 'Debit' for spending); do not add up rows yourself.
+        - To list or search transactions use 'query_transactions' with filters; pass 'cursor' from the previous result for more.
+        - To find transactions by merchant ("coffee", "Uber") use 'search_transactions'.
+        - 'get_recent_transactions' returns the latest 10 transactions.
         """
-        
-        tools = [
-            {
-                "type": "function",
-                "function": {
-                    "name": "get_balance",
-                    "description": "Get the current balance of the user's account",
-                    "parameters": {
-                        "type": "object",
-                        "properties": {},
-                        "required": [],
+
+    # Shared by query_transactions and aggregate_transactions
+    transaction_filters = {
+        "start_date": {"type": "string", "description": "Earliest date, YYYY-MM-DD"},
+        "end_date": {"type": "string", "description": "Latest date (inclusive), YYYY-MM-DD"},
+        "transaction_type": {"type": "string", "enum": ["Debit", "Credit"]},
+        "description": {"type": "string", "description": "Text the merchant/description contains, e.g. 'coffee'"},
+        "min_amount": {"type": "number"},
+        "max_amount": {"type": "number"},
+    }
+
+    tools = [
+        {
+            "type": "function",
+            "function": {
+                "name": "get_balance",
+                "description": "Get the current balance of the user's account",
+                "parameters": {
+                    "type": "object",
+                    "properties": {},
+                    "required": [],
+                },
+            },
+        },
+        {
+            "type": "function",
+            "function": {
+                "name": "get_recent_transactions",
+                "description": "Get the last 10 transactions for the account",
+                "parameters": {
+                    "type": "object",
+                    "properties": {},
+                    "required": [],
+                },
+            },
+        },
+        {
+            "type": "function",
+            "function": {
+                "name": "query_transactions",
+                "description": "List the account's transactions, newest first, matching the given filters",
+                "parameters": {
+                    "type": "object",
+                    "properties": {
+                        **transaction_filters,
+                        "limit": {"type": "integer", "description": "Page size (max 50)"},
+                        "cursor": {"type": "string", "description": "next_cursor from the previous page"},
                     },
+                    "required": [],
                 },
             },
-            {
-                "type": "function",
-                "function": {
-                    "name": "get_recent_transactions",
-                    "description": "Get the last 5 transactions for the account",
-                    "parameters": {
-                        "type": "object",
-                        "properties": {},
-                        "required": [],
+        },
+        {
+            "type": "function",
+            "function": {
+                "name": "search_transactions",
+                "description": "Find the account's transactions whose merchant/description matches the search words, newest first",
+                "parameters": {
+                    "type": "object",
+                    "properties": {
+                        "query": {"type": "string", "description": "Words to search for, e.g. 'starbucks' or 'uber ride'"},
+                        "transaction_type": {"type": "string", "enum": ["Debit", "Credit"]},
+                        "limit": {"type": "integer", "description": "Maximum results (max 50)"},
                     },
+                    "required": ["query"],
                 },
-            }
-        ]
-        
-        messages = [{"role": "system", "content": system_prompt}] + self._convert_history(history)
-        messages.append({"role": "user", "content": message})
-        
-        response = client.chat.completions.create(
-            model=MODEL_NAME,
-            messages=messages,
-            tools=tools,
-            tool_choice="auto",
-        )
-        
-        response_message = response.choices[0].message
-        tool_calls = response_message.tool_calls
-        
-        if tool_calls:
-            # Append the model's response (which contains the tool call) to history
-            messages.append(response_message)
-            
-            for tool_call in tool_calls:
-                function_name = tool_call.function.name
-                function_args = json.loads(tool_call.function.arguments)
-                
-                if function_name == "get_balance":
-                    function_response = self.get_balance()
-                elif function_name == "get_recent_transactions":
-                    function_response = self.get_recent_transactions()
-                else:
-                    function_response = "Error: Unknown function"
-                
-                messages.append(
-                    {
-                        "tool_call_id": tool_call.id,
-                        "role": "tool",
-                        "name": function_name,
-                        "content": str(function_response),
-                    }
-                )
-            
-            # Second call to get the final natural language response
-            second_response = client.chat.completions.create(
-                model=MODEL_NAME,
-                messages=messages
-            )
-            return second_response.choices[0].message.content
-        else:
-            return response_message.content
+            },
+        },
+        {
+            "type": "function",
+            "function": {
+                "name": "aggregate_transactions",
+                "description": "Total amount and count of the account's transactions matching the filters, grouped by merchant description, type or month",
+                "parameters": {
+                    "type": "object",
+                    "properties": {
+                        **transaction_filters,
+                        "group_by": {"type": "string", "enum": list(transaction_queries.GROUP_BY_CHOICES)},
+                    },
+                    "required": [],
+                },
+            },
+        },
+    ]
+
+    # get_recent_transactions is left to the LLM, which has to analyse the rows
+    response_templates = {
+        "get_balance": "Your current account balance is **{result}**.",
+    }
+
+    read_only_tools = {"get_balance", "get_recent_transactions", "query_transactions", "search_transactions", "aggregate_transactions"}
 
-    def get_balance(self):
-        account = self.db.query(Account).filter(Account.user_id == self.user_id).first()
+    def call_tool(self, db: Session, name: str, args: dict):
+        if name == "get_balance":
+            return self.get_balance(db)
+        elif name == "get_recent_transactions":
+            return self.get_recent_transactions(db)
+        elif name == "query_transactions":
+            return self.query_transactions(db, **args)
+        elif name == "search_transactions":
+            return self.search_transactions(db, **args)
+        elif name == "aggregate_transactions":
+            return self.aggregate_transactions(db, **args)
+        return super().call_tool(db, name, args)
+
+    def get_balance(self, db: Session):
+        account = account_cache.get_account(db, self.user_id)
         if account:
             return f"{account.balance} USD"
         return "Account not found."
 
-    def get_recent_transactions(self):
-        account = self.db.query(Account).filter(Account.user_id == self.user_id).first()
-        if not account:
+    def get_recent_transactions(self, db: Session):
+        account_id = account_cache.account_id(db, self.user_id)
+        if account_id is None:
             return "Account not found."
-        
-        txs = self.db.query(Transaction).filter(Transaction.account_id == account.id).order_by(Transaction.timestamp.desc()).limit(10).all()
-        return "\n".join([f"{t.timestamp.date()}: {t.transaction_type} ${t.amount} ({t.description}) - {t.status}" for t in txs])
+
+        txs = db.query(Transaction).filter(Transaction.account_id == account_id).order_by(Transaction.timestamp.desc()).limit(10).all()
+        return "\n".join([self._format_transaction(t) for t in txs])
+
+    def query_transactions(self, db: Session, limit: int = 20, cursor: str = None, **filters):
+        account_id = account_cache.account_id(db, self.user_id)
+        if account_id is None:
+            return "Account not found."
+        try:
+            txs, next_cursor = transaction_queries.query_transactions(db, account_id, limit=limit, cursor=cursor, **filters)
+        except (TypeError, ValueError) as e:
+            return f"Error: {e}"
+
+        if not txs:
+            return "No matching transactions."
+        lines = [self._format_transaction(t) for t in txs]
+        if next_cursor:
+            lines.append(f"next_cursor: {next_cursor}")
+        return "\n".join(lines)
+
+    def search_transactions(self, db: Session, query: str = None, transaction_type: str = None, limit: int = 20,
+                            **unexpected):
+        account_id = account_cache.account_id(db, self.user_id)
+        if account_id is None:
+            return "Account not found."
+        # Bad arguments from the model become an error result it can correct, not a failed turn
+        try:
+            if unexpected:
+                raise TypeError(f"unexpected argument(s): {', '.join(unexpected)}")
+            if not query:
+                raise ValueError("query is required")
+            limit = transaction_queries.page_size(limit)
+            transaction_type = transaction_queries.normalize_type(transaction_type)
+        except (TypeError, ValueError) as e:
+            return f"Error: {e}"
+        txs = search_transactions(db, query, account_id=account_id, transaction_type=transaction_type, limit=limit)
+        if not txs:
+            return f"No transactions matching '{query}'."
+        return "\n".join([self._format_transaction(t) for t in txs])
+
+    def aggregate_transactions(self, db: Session, group_by: str = "description", **filters):
+        account_id = account_cache.account_id(db, self.user_id)
+        if account_id is None:
+            return "Account not found."
+        try:
+            groups = transaction_queries.aggregate_transactions(db, account_id, group_by=group_by, **filters)
+        except (TypeError, ValueError) as e:
+            return f"Error: {e}"
+
+        if not groups:
+            return "No matching transactions."
+        lines = [f"{g['key']}: ${g['total']:.2f} across {g['count']} transactions" for g in groups]
+        # Without a type filter the groups mix credits and debits, and their sum reads as spending
+        if filters.get("transaction_type"):
+            total = sum(g["total"] for g in groups)
+            count = sum(g["count"] for g in groups)
+            lines.append(f"Total: ${total:.2f} across {count} transactions")
+        return "\n".join(lines)
+
+    def _format_transaction(self, t: Transaction):
+        return f"{t.timestamp.date()}: {t.transaction_type} ${t.amount} ({t.description}) - {t.status}"
 
 class LoansAgent(BankingAgent):
-    def process(self, message: str, history: list):
-        system_prompt = """
+    system_prompt = """
         You are the Loans & Services Agent for NeoBank.
         You are authorized to submit applications on behalf of the user.
         
@@ -173,109 +572,150 @@ class LoansAgent(BankingAgent):
         - If the user asks for a loan or service, ALWAYS use the provided tools to submit the request.
         - Do not ask for sensitive personal info (like SSN) in chat; just assume the user is authenticated and submit the request type/amount.
         """
-        
-        tools = [
-            {
-                "type": "function",
-                "function": {
-                    "name": "apply_for_loan",
-                    "description": "Apply for a new loan",
-                    "parameters": {
-                        "type": "object",
-                        "properties": {
-                            "amount": {"type": "number", "description": "The amount of money requested"},
-                            "loan_type": {"type": "string", "description": "The type of loan (e.g. Personal, Home, Auto)"}
-                        },
-                        "required": ["amount", "loan_type"],
+
+    tools = [
+        {
+            "type": "function",
+            "function": {
+                "name": "apply_for_loan",
+                "description": "Apply for a new loan",
+                "parameters": {
+                    "type": "object",
+                    "properties": {
+                        "amount": {"type": "number", "description": "The amount of money requested"},
+                        "loan_type": {"type": "string", "description": "The type of loan (e.g. Personal, Home, Auto)"}
                     },
+                    "required": ["amount", "loan_type"],
                 },
             },
-             {
-                "type": "function",
-                "function": {
-                    "name": "request_service",
-                    "description": "Request a bank service like checkbook or credit card",
-                    "parameters": {
-                        "type": "object",
-                        "properties": {
-                            "service_type": {"type": "string", "description": "Type of service (e.g. Credit Card, Checkbook)"},
-                            "details": {"type": "string", "description": "Additional details"}
-                        },
-                        "required": ["service_type"],
+        },
+        {
+            "type": "function",
+            "function": {
+                "name": "request_service",
+                "description": "Request a bank service like checkbook or credit card",
+                "parameters": {
+                    "type": "object",
+                    "properties": {
+                        "service_type": {"type": "string", "description": "Type of service (e.g. Credit Card, Checkbook)"},
+                        "details": {"type": "string", "description": "Additional details"}
                     },
+                    "required": ["service_type"],
                 },
-            }
-        ]
-        
-        # Ensure system prompt works
-        messages = [{"role": "system", "content": system_prompt}] + self._convert_history(history)
-        messages.append({"role": "user", "content": message})
-        
-        response = client.chat.completions.create(
-            model=MODEL_NAME,
-            messages=messages,
-            tools=tools,
-            tool_choice="auto",
-        )
-        
-        response_message = response.choices[0].message
-        tool_calls = response_message.tool_calls
+            },
+        }
+    ]
 
-        if tool_calls:
-            messages.append(response_message)
-            for tool_call in tool_calls:
-                function_name = tool_call.function.name
-                function_args = json.loads(tool_call.function.arguments)
-                
-                if function_name == "apply_for_loan":
-                    result = self.apply_for_loan(function_args.get("amount"), function_args.get("loan_type"))
-                elif function_name == "request_service":
-                    result = self.request_service(function_args.get("service_type"), function_args.get("details", ""))
-                
-                messages.append(
-                    {
-                        "tool_call_id": tool_call.id,
-                        "role": "tool",
-                        "name": function_name,
-                        "content": str(result),
-                    }
-                )
-            
-            second_response = client.chat.completions.create(
-                model=MODEL_NAME,
-                messages=messages
-            )
-            return second_response.choices[0].message.content
-        else:
-            return response_message.content
-
-    def apply_for_loan(self, amount: float, loan_type: str):
-        sr = ServiceRequest(
-            user_id=self.user_id,
-            service_type=f"Loan Application - {loan_type}",
-            details=f"Amount: {amount}",
-            status="Under Review"
-        )
-        self.db.add(sr)
-        self.db.commit()
-        return f"Loan application for {amount} ({loan_type}) submitted successfully. Reference ID: {sr.id}"
-
-    def request_service(self, service_type: str, details: str):
-         sr = ServiceRequest(
-            user_id=self.user_id,
-            service_type=service_type,
-            details=details,
-             status="Requested"
+    response_templates = {
+        "apply_for_loan": "{result}. Our loans team will review it and get back to you.",
+        "request_service": "{result}. We'll notify you as soon as it has been processed.",
+    }
+
+    def call_tool(self, db: Session, name: str, args: dict):
+        if name == "apply_for_loan":
+            return self.apply_for_loan(db, args.get("amount"), args.get("loan_type"))
+        elif name == "request_service":
+            return self.request_service(db, args.get("service_type"), args.get("details", ""))
+        return super().call_tool(db, name, args)
+
+    def apply_for_loan(self, db: Session, amount: float, loan_type: str):
+        reference = self._submit(db, f"Loan Application - {loan_type}", f"Amount: {amount}", "Under Review")
+        return f"Loan application for {amount} ({loan_type}) submitted successfully. Reference ID: {reference}"
+
+    def request_service(self, db: Session, service_type: str, details: str):
+        reference = self._submit(db, service_type, details, "Requested")
+        return f"Service request '{service_type}' collected. Reference ID: {reference}"
+
+    def _submit(self, db: Session, service_type: str, details: str, status: str):
+        # Queued: journaled under a pre-allocated reference ID once the turn's transaction
+        # commits, then group-committed in the background. Otherwise flushed to get the ID;
+        # the caller commits once per turn.
+        if SUBMISSION_QUEUE_ENABLED:
+            if self._deferred_submissions is None:
+                return submission_queue.submit(self.user_id, service_type, details, status)
+            reference = submission_queue.next_id()
+            self._deferred_submissions.append(submission_queue.request(reference, self.user_id, service_type, details, status))
+            return reference
+        sr = ServiceRequest(user_id=self.user_id, service_type=service_type, details=details, status=status)
+        db.add(sr)
+        db.flush()
+        return sr.id
+
+class UnifiedAgent(AccountsAgent, LoansAgent):
+    """Single-agent mode: one tool-calling completion covers routing and answering."""
+
+    system_prompt = """
+        You are the NeoBank Assistant. You handle support questions, the user's accounts and loans/services.
+        You have DIRECT ACCESS to the user's database via tools and are authorized to use them.
+
+        SUPPORT FAQ (answer directly, no tools needed):
+        - Branch working hours (9 AM - 5 PM, Mon-Sat)
+        - Customer care numbers (1-800-BANK-HELP)
+        - Account opening (Need ID, Address Proof, Photo)
+        - ATM availability (24/7)
+        - Card blocking (Call support or use the app)
+
+        ACCOUNTS:
+        - Use 'get_balance' for balances.
+        - For totals ("how much did I spend on coffee last month") use 'aggregate_transactions'; to list use 'query_transactions'; to find a merchant use 'search_transactions'.
+        - 'get_recent_transactions' returns the latest 10 transactions.
+
+        LOANS & SERVICES:
+        - If the user asks for a loan or service, ALWAYS use the provided tools to submit the request.
+        - Do not ask for sensitive personal info (like SSN) in chat; just assume the user is authenticated and submit the request type/amount.
+        """
+    tools = AccountsAgent.tools + LoansAgent.tools
+    response_templates = {**AccountsAgent.response_templates, **LoansAgent.response_templates}
+    read_only_tools = AccountsAgent.read_only_tools | LoansAgent.read_only_tools
+    # call_tool resolves through AccountsAgent -> LoansAgent -> BankingAgent
+
+async def summarize_conversation(previous_summary: str, messages: list):
+    prompt = """
+        Summarize this banking support conversation in a few sentences for another agent.
+        Keep amounts, account facts, reference IDs and open requests. Return only the summary.
+        """
+    transcript = "\n".join(f"{m['role']}: {m['content']}" for m in messages)
+    if previous_summary:
+        transcript = f"Earlier summary: {previous_summary}\n\n{transcript}"
+
+    with tracer.span("llm.summarize_history"):
+        completion = await get_llm().chat(
+            model=MODEL_NAME,
+            messages=[{"role": "system", "content": prompt}, {"role": "user", "content": transcript}],
+            temperature=0
         )
-         self.db.add(sr)
-         self.db.commit()
-         return f"Service request '{service_type}' collected. Reference ID: {sr.id}"
+    return completion.choices[0].message.content.strip()
 
 class Orchestrator:
-    def __init__(self):
-        self.model = "llama-3.3-70b-versatile"
+    def __init__(self, classifiers=None, threshold: float = ROUTER_CONFIDENCE_THRESHOLD):
+        self.model = MODEL_NAME
+        # Local classifiers are tried in order; the LLM is only asked when none is confident
+        if classifiers is None:
+            classifiers = default_classifiers() if ROUTER_FAST_PATH else []
+        self.classifiers = classifiers
+        self.threshold = threshold
+        self.hits = Counter()
+
+    async def route(self, message: str, history: list) -> str:
+        for classifier in self.classifiers:
+            result = classifier.classify(message)
+            if result and result[1] >= self.threshold:
+                self.hits[classifier.name] += 1
+                return result[0]
 
-    def route(self, message: str, history: list) -> str:
+        self.hits["llm"] += 1
+        return await self.route_with_llm(message, history)
+
+    def stats(self):
+        total = sum(self.hits.values())
+        local = total - self.hits["llm"]
+        return {
+            "total": total,
+            "by_tier": dict(self.hits),
+            "fast_path_hit_rate": local / total if total else 0.0,
+        }
+
+    async def route_with_llm(self, message: str, history: list) -> str:
         prompt = """
         You are a routing agent for a bank.
         Classify the user's message into one of these categories:
@@ -288,11 +728,12 @@ class Orchestrator:
         messages = [{"role": "system", "content": prompt}]
         messages.append({"role": "user", "content": message})
         
-        completion = client.chat.completions.create(
-            model=self.model,
-            messages=messages,
-            temperature=0
-        )
+        with tracer.span("llm.route"):
+            completion = await get_llm().chat(
+                model=self.model,
+                messages=messages,
+                temperature=0
+            )
         
         category = completion.choices[0].message.content.strip().upper()
         
@@ -0,0 +1,78 @@
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+import os
+import time
+
+from sqlalchemy.orm import Session
+
+from .config import INIT_LOCK_PATH
+from .database import engine as app_engine
+from .migrations import upgrade
+from .models import User, Account, Transaction
+
+# One-time startup work: schema upgrade and demo seed. It runs under an
+# exclusive file lock, so worker processes started together (or serve.py and a
+# worker) never upgrade or seed at the same time; whoever comes second finds
+# the work done and only pays for the checks.
+
+
+@contextmanager
+def file_lock(path):
+    with open(path, "a+") as handle:
+        if os.name == "nt":
+            import msvcrt
+            while True:
+                try:
+                    msvcrt.locking(handle.fileno(), msvcrt.LK_NBLCK, 1)
+                    break
+                except OSError:
+                    time.sleep(0.1)
+            try:
+                yield
+            finally:
+                handle.seek(0)
+                msvcrt.locking(handle.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(handle, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(handle, fcntl.LOCK_UN)
+
+
+def seed_data(db: Session):
+    if not db.query(User).first():
+        user = User(name="John Doe", email="john@example.com")
+        db.add(user)
+        db.commit()
+        db.refresh(user)
+
+        # Create Account
+        account = Account(user_id=user.id, account_type="Savings", balance=5000.00)
+        db.add(account)
+        db.commit()
+        db.refresh(account)
+
+        # Seed Transactions
+        transactions = [
+            Transaction(account_id=account.id, transaction_type="Credit", amount=3000.00, status="Success", description="Salary Update", timestamp=datetime.utcnow() - timedelta(days=10)),
+            Transaction(account_id=account.id, transaction_type="Debit", amount=5.50, status="Success", description="Starbucks Coffee", timestamp=datetime.utcnow() - timedelta(days=1)),
+            Transaction(account_id=account.id, transaction_type="Debit", amount=15.00, status="Success", description="Uber Ride", timestamp=datetime.utcnow() - timedelta(days=2)),
+            Transaction(account_id=account.id, transaction_type="Debit", amount=120.00, status="Success", description="Grocery Store", timestamp=datetime.utcnow() - timedelta(days=3)),
+            Transaction(account_id=account.id, transaction_type="Credit", amount=500.00, status="Success", description="Freelance Payment", timestamp=datetime.utcnow() - timedelta(days=5)),
+        ]
+        db.add_all(transactions)
+        db.commit()
+
+        print("Seeded initial data (User, Account, Transactions).")
+
+
+def initialize(engine=None, lock_path: str = INIT_LOCK_PATH):
+    """Brings the schema up to date and seeds an empty database. Returns the indexes created."""
+    engine = engine or app_engine
+    with file_lock(lock_path):
+        created = upgrade(engine)
+        with Session(engine) as db:
+            seed_data(db)
+    return created
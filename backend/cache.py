@@ -0,0 +1,198 @@
+from collections import Counter, OrderedDict
+import hashlib
+import re
+import threading
+import time
+
+from sqlalchemy import delete, select
+
+from .config import (
+    RESPONSE_CACHE_MAX_ENTRIES, RESPONSE_CACHE_TTL_SECONDS, RESPONSE_CACHE_SEMANTIC, RESPONSE_CACHE_SIMILARITY,
+    RESPONSE_CACHE_SHARED,
+)
+from .database import SessionLocal, dialect_insert
+from .models import ResponseCacheEntry
+from .router import STOPWORDS, TOKEN_RE, TRAINING_EXAMPLES, TfidfVectorizer, cosine
+
+# Answer cache for repeated FAQ questions. Lookups try the normalized text
+# first, then (optionally) the nearest cached question by TF-IDF similarity.
+# The vectorizer only knows the router's training sentences and drops other
+# words, so questions with a content word outside that vocabulary ("close an
+# account", "customer care email") take part in exact matching only.
+
+PUNCTUATION_RE = re.compile(r"[^a-z0-9\s]")
+
+
+def normalize(text: str) -> str:
+    return " ".join(PUNCTUATION_RE.sub(" ", text.lower()).split())
+
+
+def prompt_fingerprint(system_prompt: str) -> str:
+    return hashlib.sha256(system_prompt.encode()).hexdigest()[:16]
+
+
+class ResponseCache:
+    def __init__(self, max_entries: int = RESPONSE_CACHE_MAX_ENTRIES, ttl_seconds: int = RESPONSE_CACHE_TTL_SECONDS,
+                 semantic: bool = RESPONSE_CACHE_SEMANTIC, similarity: float = RESPONSE_CACHE_SIMILARITY,
+                 vocabulary=None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.similarity = similarity
+        self.vectorizer = TfidfVectorizer(vocabulary or [text for text, _ in TRAINING_EXAMPLES]) if semantic else None
+        self._entries = OrderedDict() # normalized question -> (stored_at, answer, vector)
+        self._fingerprint = None
+        self._lock = threading.Lock()
+        self.counters = Counter()
+
+    # get/put touch only process memory, so they are safe to call on the event loop
+    blocking = False
+
+    def get(self, message: str, system_prompt: str):
+        answer = self._lookup(normalize(message), system_prompt)
+        if answer is None:
+            self.counters["misses"] += 1
+        return answer
+
+    def _lookup(self, key, system_prompt):
+        with self._lock:
+            self._check_prompt(system_prompt)
+            entry = self._entries.get(key)
+            if entry and self._fresh(entry):
+                self._entries.move_to_end(key)
+                self.counters["exact_hits"] += 1
+                return entry[1]
+            if entry:
+                del self._entries[key]
+
+            if self.vectorizer:
+                match = self._nearest(self._vector(key))
+                if match:
+                    self._entries.move_to_end(match)
+                    self.counters["semantic_hits"] += 1
+                    return self._entries[match][1]
+            return None
+
+    def put(self, message: str, system_prompt: str, answer: str):
+        self._store(normalize(message), system_prompt, answer, time.time())
+
+    def _store(self, key, system_prompt, answer, stored_at):
+        vector = self._vector(key) if self.vectorizer else None
+        with self._lock:
+            self._check_prompt(system_prompt)
+            self._entries[key] = (stored_at, answer, vector)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def evict_expired(self):
+        cutoff = time.time() - self.ttl_seconds
+        with self._lock:
+            expired = [key for key, entry in self._entries.items() if entry[0] < cutoff]
+            for key in expired:
+                del self._entries[key]
+        return len(expired)
+
+    def stats(self):
+        hits = self.counters["exact_hits"] + self.counters["semantic_hits"] + self.counters["shared_hits"]
+        lookups = hits + self.counters["misses"]
+        return {
+            "entries": len(self._entries),
+            **self.counters,
+            "hit_rate": hits / lookups if lookups else 0.0,
+        }
+
+    def _check_prompt(self, system_prompt):
+        # Answers produced under an older system prompt are no longer valid
+        fingerprint = prompt_fingerprint(system_prompt)
+        if fingerprint != self._fingerprint:
+            if self._fingerprint is not None:
+                self.counters["invalidations"] += 1
+            self._entries.clear()
+            self._fingerprint = fingerprint
+
+    def _fresh(self, entry):
+        return time.time() - entry[0] <= self.ttl_seconds
+
+    def _vector(self, key):
+        # None (no semantic matching) when a word that carries meaning would be ignored
+        if any(word not in self.vectorizer.idf and word not in STOPWORDS for word in TOKEN_RE.findall(key)):
+            return None
+        return self.vectorizer.transform(key)
+
+    def _nearest(self, vector):
+        if not vector:
+            return None
+        best_key, best_score = None, self.similarity
+        for key, entry in self._entries.items():
+            if entry[2] and self._fresh(entry):
+                score = cosine(vector, entry[2])
+                if score >= best_score:
+                    best_key, best_score = key, score
+        return best_key
+
+
+class SqliteResponseCache(ResponseCache):
+    """Per-process LRU in front of the response_cache table, so an answer cached by one worker serves them all."""
+
+    blocking = True
+
+    def __init__(self, session_factory=SessionLocal, **kwargs):
+        super().__init__(**kwargs)
+        self.session_factory = session_factory
+
+    def get(self, message: str, system_prompt: str):
+        key = normalize(message)
+        answer = self._lookup(key, system_prompt)
+        if answer is not None:
+            return answer
+
+        # Semantic matching stays local; the table is looked up by exact question only
+        table = ResponseCacheEntry.__table__
+        with self.session_factory() as db:
+            row = db.execute(
+                select(table.c.answer, table.c.stored_at).where(
+                    table.c.fingerprint == prompt_fingerprint(system_prompt),
+                    table.c.question == key,
+                    table.c.stored_at >= time.time() - self.ttl_seconds,
+                )
+            ).first()
+        if row is None:
+            self.counters["misses"] += 1
+            return None
+        self._store(key, system_prompt, row.answer, row.stored_at)
+        self.counters["shared_hits"] += 1
+        return row.answer
+
+    def put(self, message: str, system_prompt: str, answer: str):
+        key, stored_at = normalize(message), time.time()
+        self._store(key, system_prompt, answer, stored_at)
+        table = ResponseCacheEntry.__table__
+        with self.session_factory() as db:
+            stmt = dialect_insert(db.get_bind().dialect.name)(table).values(
+                fingerprint=prompt_fingerprint(system_prompt), question=key, answer=answer, stored_at=stored_at,
+            )
+            db.execute(stmt.on_conflict_do_update(
+                index_elements=[table.c.fingerprint, table.c.question],
+                set_={"answer": stmt.excluded.answer, "stored_at": stmt.excluded.stored_at},
+            ))
+            db.commit()
+
+    def evict_expired(self):
+        super().evict_expired()
+        # Also drops answers left behind by an older system prompt once they age out
+        with self.session_factory() as db:
+            removed = db.execute(
+                delete(ResponseCacheEntry).where(ResponseCacheEntry.stored_at < time.time() - self.ttl_seconds)
+            ).rowcount
+            db.commit()
+        return removed
+
+
+def create_response_cache():
+    if RESPONSE_CACHE_SHARED:
+        return SqliteResponseCache()
+    return ResponseCache()
@@ -3,5 +3,111 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
 GROQ_API_KEY = os.getenv("GROQ_API_KEY")
+# Point the agents at an OpenAI-compatible stub (see benchmarks/stub_llm.py) instead of Groq
+GROQ_BASE_URL = os.getenv("GROQ_BASE_URL") or None
+# "stub": use the local stub server at STUB_LLM_URL (synth, record or replay mode) instead of Groq;
+# no API key or network needed
+LLM_PROVIDER = os.getenv("LLM_PROVIDER", "groq")
+STUB_LLM_URL = os.getenv("STUB_LLM_URL", "http://127.0.0.1:9100")
+if LLM_PROVIDER == "stub":
+    GROQ_BASE_URL = STUB_LLM_URL
+    GROQ_API_KEY = "stub"
+
+# Shared by the backend, dashboard and scripts; any SQLAlchemy URL (e.g. postgresql+psycopg2://...)
+DATABASE_URL = os.getenv("DATABASE_URL") or "sqlite:///" + os.path.join(PROJECT_ROOT, "app.db").replace("\\", "/")
+# Postgres (QueuePool) sizing
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+# SQLite connection pragmas
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+SQLITE_CACHE_SIZE_KB = int(os.getenv("SQLITE_CACHE_SIZE_KB", "65536"))
+SQLITE_MMAP_SIZE_MB = int(os.getenv("SQLITE_MMAP_SIZE_MB", "256"))
+
+# user -> account resolution cache used by the Accounts tools
+ACCOUNT_CACHE_TTL_SECONDS = float(os.getenv("ACCOUNT_CACHE_TTL_SECONDS", "30"))
+ACCOUNT_CACHE_MAX_ENTRIES = int(os.getenv("ACCOUNT_CACHE_MAX_ENTRIES", "10000"))
+
+# Dashboard Overview: default chart window and how long aggregates are cached
+DASHBOARD_WINDOW_DAYS = int(os.getenv("DASHBOARD_WINDOW_DAYS", "90"))
+DASHBOARD_CACHE_TTL_SECONDS = int(os.getenv("DASHBOARD_CACHE_TTL_SECONDS", "60"))
+
+# Write-behind queue for loan/service submissions: accepted into a local journal
+# with a pre-allocated reference ID, then group-committed to service_requests
+SUBMISSION_QUEUE_ENABLED = os.getenv("SUBMISSION_QUEUE_ENABLED", "true").lower() == "true"
+SUBMISSION_JOURNAL_PATH = os.getenv("SUBMISSION_JOURNAL_PATH") or os.path.join(PROJECT_ROOT, "submissions.journal.db")
+SUBMISSION_BATCH_SIZE = int(os.getenv("SUBMISSION_BATCH_SIZE", "200"))
+SUBMISSION_FLUSH_INTERVAL_SECONDS = float(os.getenv("SUBMISSION_FLUSH_INTERVAL_SECONDS", "0.05"))
+SUBMISSION_ID_BLOCK_SIZE = int(os.getenv("SUBMISSION_ID_BLOCK_SIZE", "100"))
+
+# Worker processes (serve.py --workers; uvicorn also reads WEB_CONCURRENCY). With more
+# than one, sessions and FAQ answers default to the shared database-backed stores.
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", "1"))
+# Schema upgrade + seed on startup, under INIT_LOCK_PATH so concurrent workers never race.
+# serve.py runs it once before forking and turns it off for the workers.
+DB_AUTO_INIT = os.getenv("DB_AUTO_INIT", "true").lower() == "true"
+INIT_LOCK_PATH = os.getenv("INIT_LOCK_PATH") or os.path.join(PROJECT_ROOT, "app.init.lock")
+
+# Worker threads used to run blocking SQLAlchemy calls off the event loop
+DB_THREADPOOL_SIZE = int(os.getenv("DB_THREADPOOL_SIZE", "8"))
+
+# Local rule/TF-IDF routing in front of the LLM Orchestrator
+ROUTER_FAST_PATH = os.getenv("ROUTER_FAST_PATH", "true").lower() == "true"
+ROUTER_CONFIDENCE_THRESHOLD = float(os.getenv("ROUTER_CONFIDENCE_THRESHOLD", "0.8"))
+
+# Server-side chat sessions: "memory" (LRU only) or "sqlite" (chat_sessions table, with a
+# per-process LRU in front when there is a single worker)
+SESSION_STORE = os.getenv("SESSION_STORE") or ("sqlite" if WEB_CONCURRENCY > 1 else "memory")
+SESSION_TTL_SECONDS = int(os.getenv("SESSION_TTL_SECONDS", "3600"))
+SESSION_MAX_ENTRIES = int(os.getenv("SESSION_MAX_ENTRIES", "1000"))
+
+# History windowing: last N turns verbatim, older turns folded into a rolling summary
+CONTEXT_KEEP_TURNS = int(os.getenv("CONTEXT_KEEP_TURNS", "6"))
+CONTEXT_SUMMARY_CACHE_SIZE = int(os.getenv("CONTEXT_SUMMARY_CACHE_SIZE", "1000"))
+# Prompt-token budget for the conversation history given to each agent
+CONTEXT_TOKEN_BUDGETS = {
+    "CUSTOMER_SUPPORT": int(os.getenv("CONTEXT_TOKEN_BUDGET_CUSTOMER_SUPPORT", "1500")),
+    "ACCOUNTS": int(os.getenv("CONTEXT_TOKEN_BUDGET_ACCOUNTS", "3000")),
+    "LOANS_SERVICES": int(os.getenv("CONTEXT_TOKEN_BUDGET_LOANS_SERVICES", "2000")),
+    "SINGLE": int(os.getenv("CONTEXT_TOKEN_BUDGET_SINGLE", "3000")),
+}
+
+# FAQ answer cache in front of the CustomerSupportAgent
+RESPONSE_CACHE_ENABLED = os.getenv("RESPONSE_CACHE_ENABLED", "true").lower() == "true"
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "500"))
+RESPONSE_CACHE_TTL_SECONDS = int(os.getenv("RESPONSE_CACHE_TTL_SECONDS", "86400"))
+RESPONSE_CACHE_SEMANTIC = os.getenv("RESPONSE_CACHE_SEMANTIC", "true").lower() == "true"
+RESPONSE_CACHE_SIMILARITY = float(os.getenv("RESPONSE_CACHE_SIMILARITY", "0.8"))
+# Also keep answers in the response_cache table so every worker process shares them
+RESPONSE_CACHE_SHARED = os.getenv("RESPONSE_CACHE_SHARED", str(WEB_CONCURRENCY > 1)).lower() == "true"
+
+# LLM gateway: pooling, deadlines, retries and circuit breaking for every upstream call
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "16"))
+LLM_TIMEOUT_SECONDS = float(os.getenv("LLM_TIMEOUT_SECONDS", "20"))
+LLM_DEADLINE_SECONDS = float(os.getenv("LLM_DEADLINE_SECONDS", "45"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "3"))
+LLM_BACKOFF_BASE_SECONDS = float(os.getenv("LLM_BACKOFF_BASE_SECONDS", "0.25"))
+LLM_BACKOFF_MAX_SECONDS = float(os.getenv("LLM_BACKOFF_MAX_SECONDS", "4"))
+LLM_BREAKER_FAILURES = int(os.getenv("LLM_BREAKER_FAILURES", "5"))
+LLM_BREAKER_RESET_SECONDS = float(os.getenv("LLM_BREAKER_RESET_SECONDS", "30"))
+
+# Stage spans, latency/token/DB-time histograms (GET /metrics) and recent traces (GET /traces)
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+TRACE_BUFFER_SIZE = int(os.getenv("TRACE_BUFFER_SIZE", "200"))
+# Histograms are per process; with several workers each one snapshots them into
+# METRICS_DIR every METRICS_SNAPSHOT_SECONDS and GET /metrics serves the sum over all
+# workers. /traces and /stats stay per worker (the answering worker's pid is included).
+METRICS_DIR = os.getenv("METRICS_DIR") or (os.path.join(PROJECT_ROOT, "metrics") if WEB_CONCURRENCY > 1 else "")
+METRICS_SNAPSHOT_SECONDS = float(os.getenv("METRICS_SNAPSHOT_SECONDS", "5"))
+
+# Render simple tool results (balance, loan/service references) from templates
+# instead of making a second LLM call
+TEMPLATED_TOOL_RESPONSES = os.getenv("TEMPLATED_TOOL_RESPONSES", "true").lower() == "true"
 
+# "orchestrated": route first, then a specialist agent. "single": one agent with
+# every tool, saving the routing round-trip.
+AGENT_MODE = os.getenv("AGENT_MODE", "orchestrated")
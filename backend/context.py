@@ -0,0 +1,58 @@
+from collections import OrderedDict
+
+from .config import CONTEXT_KEEP_TURNS, CONTEXT_SUMMARY_CACHE_SIZE
+
+# Keeps prompts bounded on long conversations: the last N turns go to the model
+# verbatim and everything older is folded into a rolling summary.
+
+
+def estimate_tokens(messages: list) -> int:
+    # ~4 characters per token plus a few tokens of per-message overhead
+    return sum(len(m.get("content") or "") // 4 + 4 for m in messages)
+
+
+class ContextManager:
+    def __init__(self, summarizer, keep_turns: int = CONTEXT_KEEP_TURNS, cache_size: int = CONTEXT_SUMMARY_CACHE_SIZE):
+        # summarizer(previous_summary, messages) -> new summary text (async)
+        self.summarizer = summarizer
+        self.keep_messages = keep_turns * 2
+        self.cache_size = cache_size
+        self._summaries = OrderedDict() # key -> (messages folded so far, summary)
+        self.summary_calls = 0
+
+    async def fit(self, history: list, token_budget: int, key: str = None):
+        folded, summary = self._summaries.get(key, (0, "")) if key else (0, "")
+        if folded > len(history):
+            folded, summary = 0, ""
+
+        recent = history[folded:]
+        context = self._with_summary(summary, recent)
+
+        # Only summarize when the verbatim window has grown well past N turns or
+        # the budget is exceeded; folding in batches amortises the summary calls.
+        if len(recent) > 2 * self.keep_messages or estimate_tokens(context) > token_budget:
+            fold_to = max(folded, len(history) - self.keep_messages)
+            if fold_to > folded:
+                self.summary_calls += 1
+                summary = await self.summarizer(summary, history[folded:fold_to])
+                folded = fold_to
+                if key:
+                    self._remember(key, folded, summary)
+            context = self._with_summary(summary, history[folded:])
+
+        # Hard budget: drop the oldest verbatim messages, always keeping the last one
+        first = 1 if summary else 0
+        while estimate_tokens(context) > token_budget and len(context) > first + 1:
+            context.pop(first)
+        return context
+
+    def _with_summary(self, summary: str, messages: list):
+        if not summary:
+            return list(messages)
+        return [{"role": "system", "content": f"Summary of the earlier conversation: {summary}"}] + list(messages)
+
+    def _remember(self, key, folded, summary):
+        self._summaries[key] = (folded, summary)
+        self._summaries.move_to_end(key)
+        while len(self._summaries) > self.cache_size:
+            self._summaries.popitem(last=False)
@@ -1,16 +1,97 @@
-from sqlalchemy import create_engine
+from contextlib import contextmanager
+import time
+from sqlalchemy import create_engine, event
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from .config import (
+    DATABASE_URL, DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT, DB_POOL_RECYCLE,
+    SQLITE_BUSY_TIMEOUT_MS, SQLITE_CACHE_SIZE_KB, SQLITE_MMAP_SIZE_MB, METRICS_ENABLED,
+)
+from .metrics import record_db_query
 
-SQLALCHEMY_DATABASE_URL = "sqlite:///./app.db"
+SQLALCHEMY_DATABASE_URL = DATABASE_URL
 
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
-)
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    # WAL lets dashboard reads run alongside chat writes instead of waiting on
+    # the rollback-journal lock; NORMAL sync is durable under WAL except on power loss.
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+    cursor.execute(f"PRAGMA cache_size=-{SQLITE_CACHE_SIZE_KB}")
+    cursor.execute(f"PRAGMA mmap_size={SQLITE_MMAP_SIZE_MB * 1024 * 1024}")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.close()
+
+def _start_query_timer(conn, cursor, statement, parameters, context, executemany):
+    context._query_started = time.perf_counter()
+
+def _record_query_time(conn, cursor, statement, parameters, context, executemany):
+    # Feeds the DB query histogram and the DB time of the enclosing trace spans
+    record_db_query(statement, time.perf_counter() - context._query_started)
+
+def instrument_engine(engine):
+    if METRICS_ENABLED:
+        event.listen(engine, "before_cursor_execute", _start_query_timer)
+        event.listen(engine, "after_cursor_execute", _record_query_time)
+    return engine
+
+def create_db_engine(url: str = None, **kwargs):
+    """Engine factory used by the backend, dashboard and scripts."""
+    url = url or DATABASE_URL
+    if url.startswith("sqlite"):
+        engine = create_engine(
+            url,
+            connect_args={"check_same_thread": False, "timeout": SQLITE_BUSY_TIMEOUT_MS / 1000},
+            **kwargs
+        )
+        event.listen(engine, "connect", set_sqlite_pragmas)
+        return instrument_engine(engine)
+
+    options = dict(
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE,
+        pool_pre_ping=True,
+    )
+    options.update(kwargs)
+    return instrument_engine(create_engine(url, **options))
+
+def dialect_insert(dialect_name: str):
+    """insert() with ON CONFLICT support for the dialect; the Postgres dialect is only imported when used."""
+    if dialect_name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert
+
+engine = create_db_engine()
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
 
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+        self.statements = []
+
+@contextmanager
+def count_queries(bind=None):
+    """Counts the SQL statements run on an engine inside the block, e.g. to catch N+1 lazy loads."""
+    bind = bind or engine
+    counter = QueryCounter()
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        counter.count += 1
+        counter.statements.append(statement)
+
+    event.listen(bind, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield counter
+    finally:
+        event.remove(bind, "before_cursor_execute", before_cursor_execute)
+
 def get_db():
     db = SessionLocal()
     try:
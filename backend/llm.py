@@ -0,0 +1,186 @@
+import asyncio
+import random
+import time
+
+from .config import (
+    GROQ_API_KEY, GROQ_BASE_URL, LLM_MAX_CONCURRENCY, LLM_TIMEOUT_SECONDS, LLM_DEADLINE_SECONDS,
+    LLM_MAX_RETRIES, LLM_BACKOFF_BASE_SECONDS, LLM_BACKOFF_MAX_SECONDS,
+    LLM_BREAKER_FAILURES, LLM_BREAKER_RESET_SECONDS,
+)
+from .metrics import record_token_usage
+
+# Single gateway every agent and the Orchestrator call through: one pooled HTTP
+# client, a cap on in-flight requests, per-call deadlines, jittered retries on
+# 429/5xx/connection errors and a circuit breaker that fails fast while the
+# upstream is down.
+# httpx and the Groq SDK are imported when the first gateway is built, not with
+# the module, so importing the backend stays cheap (see benchmarks/bench_startup.py).
+
+
+class CircuitOpenError(Exception):
+    pass
+
+
+class DeadlineExceededError(Exception):
+    pass
+
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold: int = LLM_BREAKER_FAILURES, reset_seconds: float = LLM_BREAKER_RESET_SECONDS):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.failures = 0
+        self.opened_at = None
+        self._trial_in_flight = False
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_seconds:
+            return "half_open"
+        return "open"
+
+    def allow(self):
+        state = self.state
+        if state == "closed":
+            return True
+        # Half-open: let a single trial request through
+        if state == "half_open" and not self._trial_in_flight:
+            self._trial_in_flight = True
+            return True
+        return False
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+        self._trial_in_flight = False
+
+    def record_failure(self):
+        self.failures += 1
+        self._trial_in_flight = False
+        if self.failures >= self.failure_threshold or self.opened_at is not None:
+            self.opened_at = time.monotonic()
+
+    def release_trial(self):
+        # A trial that ended without a verdict (cancelled, caller error, deadline);
+        # the next caller gets to try instead
+        self._trial_in_flight = False
+
+
+def is_retryable(error: Exception):
+    from groq import APIConnectionError, APIStatusError
+    if isinstance(error, APIStatusError):
+        return error.status_code == 429 or error.status_code >= 500
+    # APITimeoutError is a subclass of APIConnectionError
+    return isinstance(error, APIConnectionError)
+
+
+def retry_after_seconds(error: Exception):
+    response = getattr(error, "response", None)
+    if response is None:
+        return None
+    try:
+        return float(response.headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+class LLMGateway:
+    def __init__(self, api_key: str = GROQ_API_KEY, base_url: str = GROQ_BASE_URL,
+                 max_concurrency: int = LLM_MAX_CONCURRENCY, timeout: float = LLM_TIMEOUT_SECONDS,
+                 deadline: float = LLM_DEADLINE_SECONDS, max_retries: int = LLM_MAX_RETRIES,
+                 backoff_base: float = LLM_BACKOFF_BASE_SECONDS, backoff_max: float = LLM_BACKOFF_MAX_SECONDS,
+                 breaker: CircuitBreaker = None):
+        import httpx
+        from groq import AsyncGroq
+
+        self.timeout = timeout
+        self.deadline = deadline
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.max_concurrency = max_concurrency
+        self.breaker = breaker or CircuitBreaker()
+        self.http_client = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=max_concurrency, max_keepalive_connections=max_concurrency),
+            timeout=timeout,
+        )
+        # Retries are ours (with jitter and a deadline), so the SDK's are disabled
+        self.client = AsyncGroq(api_key=api_key, base_url=base_url, http_client=self.http_client,
+                                max_retries=0, timeout=timeout)
+        self._semaphore = None
+        self.counters = {"calls": 0, "retries": 0, "failures": 0, "rejected_open_circuit": 0}
+
+    @property
+    def semaphore(self):
+        # Created lazily so it binds to the serving event loop
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+
+    async def chat(self, deadline: float = None, **kwargs):
+        """chat.completions.create() with the gateway's limits applied."""
+        result = await self._call(kwargs, deadline)
+        record_token_usage(getattr(result, "usage", None))
+        return result
+
+    async def chat_stream(self, deadline: float = None, **kwargs):
+        """Yield completion chunks; the concurrency slot is held until the stream ends."""
+        async with self.semaphore:
+            stream = await self._call(dict(kwargs, stream=True), deadline, acquire=False)
+            async for chunk in stream:
+                # Groq reports usage on the last chunk (x_groq); OpenAI-style servers on chunk.usage
+                x_groq = getattr(chunk, "x_groq", None)
+                record_token_usage(getattr(chunk, "usage", None) or getattr(x_groq, "usage", None))
+                yield chunk
+
+    async def _call(self, kwargs, deadline, acquire=True):
+        ends_at = time.monotonic() + (deadline or self.deadline)
+        attempt = 0
+        while True:
+            trial = self.breaker.state == "half_open"
+            if not self.breaker.allow():
+                self.counters["rejected_open_circuit"] += 1
+                raise CircuitOpenError("LLM upstream circuit is open; failing fast")
+
+            try:
+                if acquire:
+                    async with self.semaphore:
+                        result = await self._create(kwargs, ends_at)
+                else:
+                    result = await self._create(kwargs, ends_at)
+            except Exception as e:
+                if not is_retryable(e):
+                    # Caller errors (400/401/...) and our own deadline say nothing about upstream health
+                    raise
+                self.breaker.record_failure()
+                self.counters["failures"] += 1
+
+                attempt += 1
+                delay = retry_after_seconds(e)
+                if delay is None:
+                    delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+                if attempt > self.max_retries or time.monotonic() + delay >= ends_at:
+                    raise
+                self.counters["retries"] += 1
+                await asyncio.sleep(delay)
+                continue
+            finally:
+                # Also on CancelledError (client disconnect), which would otherwise leave the breaker half-open for good
+                if trial:
+                    self.breaker.release_trial()
+
+            self.breaker.record_success()
+            return result
+
+    async def _create(self, kwargs, ends_at):
+        # Measured after the concurrency slot is acquired, so queueing counts against the deadline
+        remaining = ends_at - time.monotonic()
+        if remaining <= 0:
+            raise DeadlineExceededError("LLM call deadline exceeded")
+        self.counters["calls"] += 1
+        return await self.client.chat.completions.create(timeout=min(self.timeout, remaining), **kwargs)
+
+    def stats(self):
+        return {**self.counters, "circuit": self.breaker.state, "max_concurrency": self.max_concurrency}
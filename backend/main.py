@@ -1,14 +1,21 @@
 from fastapi import FastAPI, Depends, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from pydantic import BaseModel
+from typing import Optional
 from sqlalchemy.orm import Session
-from .database import engine, Base, get_db
-from .models import User, Account, Transaction, ServiceRequest
-from .agents import Orchestrator, CustomerSupportAgent, AccountsAgent, LoansAgent
-import uvicorn
-
-# Create tables
-Base.metadata.create_all(bind=engine)
+from .database import get_db
+from .bootstrap import initialize
+from .agents import Orchestrator, CustomerSupportAgent, AccountsAgent, LoansAgent, UnifiedAgent, convert_history, run_db, summarize_conversation, faq_cache, llm_stats
+from .config import AGENT_MODE, CONTEXT_TOKEN_BUDGETS, SUBMISSION_QUEUE_ENABLED, DB_AUTO_INIT, METRICS_ENABLED, METRICS_DIR, METRICS_SNAPSHOT_SECONDS
+from .context import ContextManager
+from .metrics import agent_latency, render_metrics, tracer, write_snapshot
+from .account_cache import account_cache
+from .submissions import submission_queue
+from .sessions import create_session_store
+import asyncio
+import json
+import os
 
 app = FastAPI()
 
@@ -21,49 +28,121 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Seed Initial Data
-def seed_data(db: Session):
-    if not db.query(User).first():
-        user = User(name="John Doe", email="john@example.com")
-        db.add(user)
-        db.commit()
-        db.refresh(user)
-        
-        from datetime import datetime, timedelta
-        
-        # Create Account
-        account = Account(user_id=user.id, account_type="Savings", balance=5000.00)
-        db.add(account)
-        db.commit()
-        db.refresh(account)
-
-        # Seed Transactions
-        transactions = [
-            Transaction(account_id=account.id, transaction_type="Credit", amount=3000.00, status="Success", description="Salary Update", timestamp=datetime.utcnow() - timedelta(days=10)),
-            Transaction(account_id=account.id, transaction_type="Debit", amount=5.50, status="Success", description="Starbucks Coffee", timestamp=datetime.utcnow() - timedelta(days=1)),
-            Transaction(account_id=account.id, transaction_type="Debit", amount=15.00, status="Success", description="Uber Ride", timestamp=datetime.utcnow() - timedelta(days=2)),
-            Transaction(account_id=account.id, transaction_type="Debit", amount=120.00, status="Success", description="Grocery Store", timestamp=datetime.utcnow() - timedelta(days=3)),
-            Transaction(account_id=account.id, transaction_type="Credit", amount=500.00, status="Success", description="Freelance Payment", timestamp=datetime.utcnow() - timedelta(days=5)),
-        ]
-        db.add_all(transactions)
-        db.commit()
-        
-        print("Seeded initial data (User, Account, Transactions).")
+session_store = create_session_store()
+
+async def evict_sessions_periodically():
+    while True:
+        await asyncio.sleep(max(60, session_store.ttl_seconds // 4))
+        await run_db(session_store.evict_expired)
+        await run_db(faq_cache.evict_expired)
+
+async def write_metrics_periodically():
+    while True:
+        await asyncio.sleep(METRICS_SNAPSHOT_SECONDS)
+        write_snapshot()
 
 @app.on_event("startup")
 def startup_event():
-    db = next(get_db())
-    seed_data(db)
+    if DB_AUTO_INIT:
+        # Tables, indexes missing from an older app.db, and the demo seed
+        initialize()
+    asyncio.get_event_loop().create_task(evict_sessions_periodically())
+    if METRICS_ENABLED and METRICS_DIR:
+        # Several workers: GET /metrics merges every worker's snapshot
+        asyncio.get_event_loop().create_task(write_metrics_periodically())
+    if SUBMISSION_QUEUE_ENABLED:
+        # Replays submissions journaled before a crash, then group-commits new ones
+        submission_queue.start()
+
+@app.on_event("shutdown")
+def shutdown_event():
+    if SUBMISSION_QUEUE_ENABLED:
+        submission_queue.stop()
+    if METRICS_ENABLED and METRICS_DIR:
+        write_snapshot()
 
 class ChatRequest(BaseModel):
     message: str
+    # Send session_id to continue a server-side conversation; history is only
+    # used to seed a new session for clients that still keep their own.
+    session_id: Optional[str] = None
     history: list = []
 
 class ChatResponse(BaseModel):
     response: str
     role: str = "model"
+    session_id: Optional[str] = None
 
 orchestrator = Orchestrator()
+context_manager = ContextManager(summarizer=summarize_conversation)
+
+async def load_session(request: ChatRequest, user_id: int):
+    with tracer.span("session.load"):
+        return await _load_session(request, user_id)
+
+async def _load_session(request: ChatRequest, user_id: int):
+    if request.session_id:
+        history = await run_db(session_store.get, request.session_id)
+        if history is not None:
+            return request.session_id, history
+
+    # Unknown/expired session: start a fresh one
+    history = convert_history(request.history)
+    session_id = await run_db(session_store.create, user_id, history)
+    return session_id, history
+
+async def save_turn(session_id: str, message: str, response_text: str):
+    with tracer.span("session.save"):
+        await run_db(session_store.append, session_id, [
+            {"role": "user", "content": message},
+            {"role": "assistant", "content": response_text},
+        ])
+
+# /stats and /traces describe the worker that answers (see METRICS_DIR for /metrics)
+@app.get("/stats")
+def stats_endpoint():
+    return {
+        "worker": os.getpid(),
+        "router": orchestrator.stats(),
+        "faq_cache": faq_cache.stats(),
+        "llm": llm_stats(),
+        "agent_latency": agent_latency.stats(),
+        "account_cache": account_cache.stats(),
+        "submissions": submission_queue.stats(),
+    }
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics_endpoint():
+    # Prometheus text format: stage latency, LLM tokens and DB query time histograms,
+    # summed over all workers when there are several
+    return render_metrics()
+
+@app.get("/traces")
+def traces_endpoint(limit: int = 20, slowest: bool = False):
+    """Most recent (or slowest) request traces with their stage spans."""
+    return tracer.recent(limit, slowest)
+
+async def route(message: str, history: list):
+    if AGENT_MODE == "single":
+        return "SINGLE"
+    with tracer.span("route") as span:
+        agent_type = await orchestrator.route(message, history)
+        span.set(agent=agent_type)
+    return agent_type
+
+async def fit_context(agent_type: str, history: list, session_id: str):
+    # History trimmed to the agent's token budget
+    with tracer.span("context", turns=len(history) // 2):
+        return await context_manager.fit(history, CONTEXT_TOKEN_BUDGETS[agent_type], key=session_id)
+
+def make_agent(agent_type: str, db: Session, user_id: int):
+    if agent_type == "SINGLE":
+        return UnifiedAgent(db, user_id)
+    elif agent_type == "ACCOUNTS":
+        return AccountsAgent(db, user_id)
+    elif agent_type == "LOANS_SERVICES":
+        return LoansAgent(db, user_id)
+    return CustomerSupportAgent(db, user_id)
 
 @app.post("/chat", response_model=ChatResponse)
 async def chat_endpoint(request: ChatRequest, db: Session = Depends(get_db)):
@@ -71,26 +150,63 @@ async def chat_endpoint(request: ChatRequest, db: Session = Depends(get_db)):
     user_id = 1
     
     try:
-        # 1. Route
-        agent_type = orchestrator.route(request.message, request.history)
-        print(f"Routed to: {agent_type}")
-        
-        # 2. Dispatch
-        if agent_type == "ACCOUNTS":
-            agent = AccountsAgent(db, user_id)
-        elif agent_type == "LOANS_SERVICES":
-            agent = LoansAgent(db, user_id)
-        else:
-            agent = CustomerSupportAgent(db, user_id)
-            
-        # 3. Process
-        response_text = agent.process(request.message, request.history)
-        return ChatResponse(response=response_text)
+        with tracer.span("chat") as trace:
+            session_id, history = await load_session(request, user_id)
+
+            # 1. Route
+            agent_type = await route(request.message, history)
+            trace.set(agent=agent_type, session_id=session_id)
+
+            # 2. Dispatch
+            agent = make_agent(agent_type, db, user_id)
+
+            # 3. Process, with history trimmed to the agent's token budget
+            context = await fit_context(agent_type, history, session_id)
+            with tracer.span("agent", agent=agent_type):
+                response_text = await agent.process(request.message, context)
+            await save_turn(session_id, request.message, response_text)
+        return ChatResponse(response=response_text, session_id=session_id)
     except Exception as e:
         import traceback
         traceback.print_exc()
         print(f"Error processing request: {e}")
         return ChatResponse(response=f"Error: {str(e)}")
 
+def sse_event(event: dict):
+    return f"data: {json.dumps(event)}\n\n"
+
+@app.post("/chat/stream")
+async def chat_stream_endpoint(request: ChatRequest, db: Session = Depends(get_db)):
+    # Server-Sent Events: session -> route -> tool* -> token* -> done (or error)
+    user_id = 1
+
+    async def events():
+        try:
+            with tracer.span("chat.stream") as trace:
+                session_id, history = await load_session(request, user_id)
+                yield sse_event({"type": "session", "session_id": session_id})
+
+                agent_type = await route(request.message, history)
+                trace.set(agent=agent_type, session_id=session_id)
+                yield sse_event({"type": "route", "agent": agent_type})
+
+                agent = make_agent(agent_type, db, user_id)
+                context = await fit_context(agent_type, history, session_id)
+                tokens = []
+                with tracer.span("agent", agent=agent_type):
+                    async for event in agent.stream(request.message, context):
+                        if event["type"] == "token":
+                            tokens.append(event["content"])
+                        yield sse_event(event)
+                await save_turn(session_id, request.message, "".join(tokens))
+            yield sse_event({"type": "done"})
+        except Exception as e:
+            import traceback
+            traceback.print_exc()
+            yield sse_event({"type": "error", "message": f"Error: {str(e)}"})
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
 if __name__ == "__main__":
+    import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -0,0 +1,264 @@
+from collections import defaultdict, deque
+from contextlib import contextmanager
+import contextvars
+import json
+import os
+import threading
+import time
+import uuid
+
+from .config import METRICS_DIR, METRICS_ENABLED, TRACE_BUFFER_SIZE
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+class LatencyRecorder:
+    """Keeps the most recent samples per label and reports count/mean/p50/p95 in ms."""
+
+    def __init__(self, window: int = 1000):
+        self.window = window
+        self._samples = defaultdict(lambda: deque(maxlen=self.window))
+        self._counts = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def record(self, label: str, seconds: float):
+        with self._lock:
+            self._samples[label].append(seconds)
+            self._counts[label] += 1
+
+    def since(self, label: str, start: float):
+        self.record(label, time.perf_counter() - start)
+
+    def stats(self):
+        with self._lock:
+            snapshot = {label: list(samples) for label, samples in self._samples.items()}
+            counts = dict(self._counts)
+        return {
+            label: {
+                "count": counts[label],
+                "mean_ms": sum(samples) / len(samples) * 1000,
+                "p50_ms": percentile(samples, 50) * 1000,
+                "p95_ms": percentile(samples, 95) * 1000,
+            }
+            for label, samples in snapshot.items()
+        }
+
+
+# Agent turn latency by response path: direct, templated, llm_summary, cached
+agent_latency = LatencyRecorder()
+
+
+# Prometheus-style histograms and lightweight, OpenTelemetry-shaped spans.
+# Spans nest through a contextvar (run_db copies it into the DB threads), time
+# each stage of a chat turn into stage_seconds, and accumulate the DB queries
+# and LLM tokens spent inside them. Finished root spans (one per request) are
+# kept in a ring buffer for GET /traces; the histograms are served at
+# GET /metrics in the Prometheus text format.
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+DB_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+TOKEN_BUCKETS = (16, 32, 64, 128, 256, 512, 1024, 2048, 4096, 8192)
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, buckets, labelnames=()):
+        self.name = name
+        self.help = help
+        self.buckets = tuple(buckets)
+        self.labelnames = tuple(labelnames)
+        self._series = {} # label values -> [bucket counts..., sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * (len(self.buckets) + 2)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+                    break
+            series[-2] += value
+            series[-1] += 1
+
+    def snapshot(self):
+        with self._lock:
+            return {key: list(series) for key, series in self._series.items()}
+
+    def render(self, snapshot=None):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        if snapshot is None:
+            snapshot = self.snapshot()
+        for key, series in sorted(snapshot.items()):
+            labels = [f'{name}="{_escape_label(value)}"' for name, value in zip(self.labelnames, key)]
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), series[:-2] + [series[-1] - sum(series[:-2])]):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(float(bound))
+                bucket_labels = ",".join(labels + ['le="%s"' % le])
+                lines.append(f"{self.name}_bucket{{{bucket_labels}}} {cumulative}")
+            suffix = "{" + ",".join(labels) + "}" if labels else ""
+            lines.append(f"{self.name}_sum{suffix} {series[-2]}")
+            lines.append(f"{self.name}_count{suffix} {series[-1]}")
+        return "\n".join(lines)
+
+
+def _escape_label(value: str):
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+stage_seconds = Histogram("banking_stage_duration_seconds", "Duration of each traced stage of a chat turn", LATENCY_BUCKETS, ("stage",))
+llm_tokens = Histogram("banking_llm_tokens", "Tokens per LLM completion, from the usage fields", TOKEN_BUCKETS, ("stage", "kind"))
+db_query_seconds = Histogram("banking_db_query_duration_seconds", "Duration of each SQL statement", DB_BUCKETS, ("operation",))
+HISTOGRAMS = [stage_seconds, llm_tokens, db_query_seconds]
+
+_current_span = contextvars.ContextVar("current_span", default=None)
+
+
+class Span:
+    def __init__(self, name: str, parent=None, attributes=None):
+        self.name = name
+        self.trace_id = parent.trace_id if parent else uuid.uuid4().hex
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent = parent
+        self.attributes = dict(attributes or {})
+        self.children = []
+        self.started_at = time.time()
+        self.duration = None
+        self.db_queries = 0
+        self.db_seconds = 0.0
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+
+    def to_dict(self):
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "started_at": self.started_at,
+            "duration_ms": (self.duration or 0.0) * 1000,
+            "db_queries": self.db_queries,
+            "db_ms": self.db_seconds * 1000,
+            "attributes": self.attributes,
+            "children": [child.to_dict() for child in self.children],
+        }
+
+
+class Tracer:
+    def __init__(self, keep: int = TRACE_BUFFER_SIZE, enabled: bool = METRICS_ENABLED):
+        self.enabled = enabled
+        self._recent = deque(maxlen=keep)
+
+    @contextmanager
+    def span(self, name: str, **attributes):
+        if not self.enabled:
+            yield Span(name, attributes=attributes)
+            return
+        parent = _current_span.get()
+        span = Span(name, parent, attributes)
+        _current_span.set(span)
+        start = time.perf_counter()
+        try:
+            yield span
+        except BaseException as e:
+            span.attributes["error"] = type(e).__name__
+            raise
+        finally:
+            span.duration = time.perf_counter() - start
+            # set(), not reset(): async generators may finish in another context
+            _current_span.set(parent)
+            stage_seconds.observe(span.duration, stage=name)
+            if parent is None:
+                self._recent.append(span)
+            else:
+                parent.children.append(span)
+
+    def recent(self, limit: int = 20, slowest: bool = False):
+        traces = list(self._recent)
+        if slowest:
+            traces.sort(key=lambda span: span.duration or 0.0, reverse=True)
+        else:
+            traces.reverse()
+        return [dict(span.to_dict(), worker=os.getpid()) for span in traces[:limit]]
+
+
+def current_span():
+    return _current_span.get()
+
+
+def record_db_query(statement: str, seconds: float):
+    db_query_seconds.observe(seconds, operation=(statement.lstrip().split(None, 1) or ["?"])[0].upper())
+    # Every enclosing span is charged, so a request's root shows its total DB time
+    span = _current_span.get()
+    while span is not None:
+        span.db_queries += 1
+        span.db_seconds += seconds
+        span = span.parent
+
+
+def record_token_usage(usage):
+    if usage is None:
+        return
+    span = _current_span.get()
+    stage = span.name if span else "llm"
+    for kind in ("prompt_tokens", "completion_tokens"):
+        value = getattr(usage, kind, None)
+        if value is None and isinstance(usage, dict):
+            value = usage.get(kind)
+        if value is None:
+            continue
+        llm_tokens.observe(value, stage=stage, kind=kind.split("_")[0])
+        if span is not None:
+            span.attributes[kind] = span.attributes.get(kind, 0) + value
+
+
+def write_snapshot(directory: str = METRICS_DIR):
+    """Saves this process's histograms for the other workers' GET /metrics."""
+    os.makedirs(directory, exist_ok=True)
+    data = {h.name: [[list(key), series] for key, series in h.snapshot().items()] for h in HISTOGRAMS}
+    path = os.path.join(directory, f"{os.getpid()}.json")
+    with open(path + ".tmp", "w") as f:
+        json.dump(data, f)
+    # Readers see the old snapshot or the new one, never half of one
+    os.replace(path + ".tmp", path)
+
+
+def merged_snapshots(directory: str = METRICS_DIR):
+    # Histograms add up across processes; a worker that has exited keeps its
+    # file, so the totals stay monotonic (serve.py clears the directory on start)
+    merged = {h.name: {} for h in HISTOGRAMS}
+    for filename in os.listdir(directory):
+        if not filename.endswith(".json"):
+            continue
+        try:
+            with open(os.path.join(directory, filename)) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            continue
+        for name, series_list in data.items():
+            if name not in merged:
+                continue
+            for key, series in series_list:
+                key = tuple(key)
+                current = merged[name].get(key)
+                merged[name][key] = series if current is None else [a + b for a, b in zip(current, series)]
+    return merged
+
+
+def render_metrics(directory: str = METRICS_DIR):
+    if not directory:
+        return "\n".join(histogram.render() for histogram in HISTOGRAMS) + "\n"
+    write_snapshot(directory)
+    merged = merged_snapshots(directory)
+    return "\n".join(histogram.render(merged[histogram.name]) for histogram in HISTOGRAMS) + "\n"
+
+
+tracer = Tracer()
@@ -0,0 +1,30 @@
+from sqlalchemy import inspect
+
+from .database import Base
+from . import models  # noqa: F401 (registers the tables on Base.metadata)
+from .rollups import rebuild_rollups
+from .search import ensure_search_index
+
+# Idempotent schema upgrade. create_all only creates missing tables, so indexes
+# added to existing tables (e.g. ix_transactions_account_id_timestamp) are
+# created here as well. Safe to run on every start and on an up-to-date DB.
+# A newly created rollup table or search index is backfilled from the existing
+# transactions.
+
+
+def upgrade(engine):
+    had_rollups = inspect(engine).has_table(models.TransactionDailyTotal.__tablename__)
+    Base.metadata.create_all(bind=engine)
+    if not had_rollups:
+        rebuild_rollups(engine)
+
+    inspector = inspect(engine)
+    created = []
+    for table in Base.metadata.sorted_tables:
+        existing = {ix["name"] for ix in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in existing:
+                index.create(bind=engine)
+                created.append(index.name)
+    created += ensure_search_index(engine)
+    return created
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, String, Float, ForeignKey, DateTime, Date, Index
 from sqlalchemy.orm import relationship
 from .database import Base
 from datetime import datetime
@@ -17,7 +17,7 @@ class Account(Base):
     __tablename__ = "accounts"
 
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"))
+    user_id = Column(Integer, ForeignKey("users.id"), index=True)
     account_type = Column(String) # Savings, Current
     balance = Column(Float, default=0.0)
     
@@ -37,14 +37,81 @@ class Transaction(Base):
 
     account = relationship("Account", back_populates="transactions")
 
+    __table_args__ = (
+        # Serves "latest transactions for an account" (filter + ORDER BY timestamp DESC)
+        # and any lookup by account_id alone, so no separate account_id index
+        Index("ix_transactions_account_id_timestamp", "account_id", "timestamp"),
+    )
+
+class TransactionDailyTotal(Base):
+    __tablename__ = "transaction_daily_totals"
+
+    # Rollup of transactions per account, day and type; maintained by backend/rollups.py
+    account_id = Column(Integer, ForeignKey("accounts.id"), primary_key=True)
+    day = Column(Date, primary_key=True)
+    transaction_type = Column(String, primary_key=True)
+    total_amount = Column(Float, default=0.0)
+    tx_count = Column(Integer, default=0)
+
+    __table_args__ = (
+        # Bank-wide charts: all accounts for a day range. Covering, so the
+        # dashboard's GROUP BY day/type never reads the table itself
+        Index("ix_transaction_daily_totals_day_type_totals", "day", "transaction_type", "total_amount", "tx_count"),
+    )
+
 class ServiceRequest(Base):
     __tablename__ = "service_requests"
 
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"))
+    user_id = Column(Integer, ForeignKey("users.id"), index=True)
     service_type = Column(String) # Loan, Credit Card, etc.
     details = Column(String) # JSON or text details
     status = Column(String, default="Requested")
     timestamp = Column(DateTime, default=datetime.utcnow)
 
     owner = relationship("User", back_populates="service_requests")
+
+    __table_args__ = (
+        # Dashboard queues: filter by status, newest first
+        Index("ix_service_requests_status_timestamp", "status", "timestamp"),
+    )
+
+class IdAllocation(Base):
+    __tablename__ = "id_allocations"
+
+    # High-water marks for IDs handed out in blocks before the row exists (see backend/submissions.py)
+    name = Column(String, primary_key=True) # Table name
+    next_id = Column(Integer)
+
+class ChatSession(Base):
+    __tablename__ = "chat_sessions"
+
+    id = Column(String, primary_key=True) # Opaque session ID handed to the client
+    user_id = Column(Integer, ForeignKey("users.id"))
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, index=True)
+
+    messages = relationship("ChatMessage", back_populates="session", cascade="all, delete-orphan", order_by="ChatMessage.id")
+
+class ChatMessage(Base):
+    __tablename__ = "chat_messages"
+
+    id = Column(Integer, primary_key=True, index=True)
+    session_id = Column(String, ForeignKey("chat_sessions.id"), index=True)
+    role = Column(String) # user, assistant
+    content = Column(String)
+    timestamp = Column(DateTime, default=datetime.utcnow)
+
+    session = relationship("ChatSession", back_populates="messages")
+
+class ResponseCacheEntry(Base):
+    __tablename__ = "response_cache"
+
+    # FAQ answers shared by all worker processes (see backend/cache.py)
+    fingerprint = Column(String, primary_key=True) # System prompt the answer was produced under
+    question = Column(String, primary_key=True) # Normalized question
+    answer = Column(String)
+    stored_at = Column(Float, index=True) # Epoch seconds
+
+from . import rollups  # noqa: E402,F401 (keeps transaction_daily_totals in step with inserts)
+from . import submissions  # noqa: E402,F401 (ORM inserts into service_requests take reserved IDs)
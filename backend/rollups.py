@@ -0,0 +1,105 @@
+from datetime import datetime
+
+from sqlalchemy import delete, event, func, insert, select
+
+from .database import dialect_insert
+from .models import Transaction, TransactionDailyTotal
+
+# Daily per-account totals by transaction type (transaction_daily_totals).
+# Every ORM insert of a Transaction upserts its day in the same flush, so the
+# rollup commits or rolls back with the transaction itself. Rows written with
+# Core (bulk loads, benchmarks) bypass the ORM event; run rebuild_rollups()
+# (or rebuild_rollups.py) after those.
+
+rollups = TransactionDailyTotal.__table__
+
+
+def _upsert_statement(dialect_name):
+    stmt = dialect_insert(dialect_name)(rollups)
+    return stmt.on_conflict_do_update(
+        index_elements=[rollups.c.account_id, rollups.c.day, rollups.c.transaction_type],
+        set_={
+            "total_amount": rollups.c.total_amount + stmt.excluded.total_amount,
+            "tx_count": rollups.c.tx_count + stmt.excluded.tx_count,
+        },
+    )
+
+
+@event.listens_for(Transaction, "after_insert")
+def _record_transaction(mapper, connection, target):
+    timestamp = target.timestamp or datetime.utcnow()
+    connection.execute(_upsert_statement(connection.dialect.name), {
+        "account_id": target.account_id,
+        "day": timestamp.date(),
+        "transaction_type": target.transaction_type,
+        "total_amount": target.amount or 0.0,
+        "tx_count": 1,
+    })
+
+
+def rebuild_rollups(engine, account_id=None):
+    """Recompute the rollups from transactions (all accounts, or one). Returns the row count."""
+    source = (
+        select(
+            Transaction.account_id,
+            func.date(Transaction.timestamp).label("day"),
+            Transaction.transaction_type,
+            func.sum(Transaction.amount),
+            func.count(),
+        )
+        .group_by(Transaction.account_id, func.date(Transaction.timestamp), Transaction.transaction_type)
+    )
+    clear = delete(rollups)
+    if account_id is not None:
+        source = source.where(Transaction.account_id == account_id)
+        clear = clear.where(rollups.c.account_id == account_id)
+
+    with engine.begin() as conn:
+        conn.execute(clear)
+        conn.execute(insert(rollups).from_select(
+            ["account_id", "day", "transaction_type", "total_amount", "tx_count"], source))
+        query = select(func.count()).select_from(rollups)
+        if account_id is not None:
+            query = query.where(rollups.c.account_id == account_id)
+        return conn.execute(query).scalar()
+
+
+def day_bounds(start=None, end=None):
+    # Rollups have day granularity; start/end are the datetimes produced by
+    # transactions.parse_date (end exclusive). None means they are not day-aligned.
+    for bound in (start, end):
+        if bound is not None and bound != datetime(bound.year, bound.month, bound.day):
+            return None
+    return (start.date() if start else None, end.date() if end else None)
+
+
+def rollup_conditions(account_id=None, start_day=None, end_day=None, transaction_type=None):
+    conditions = []
+    if account_id is not None:
+        conditions.append(rollups.c.account_id == account_id)
+    if start_day is not None:
+        conditions.append(rollups.c.day >= start_day)
+    if end_day is not None:
+        conditions.append(rollups.c.day < end_day)
+    if transaction_type:
+        conditions.append(rollups.c.transaction_type == transaction_type)
+    return conditions
+
+
+def totals_by_type(db, account_id=None, start_day=None, end_day=None):
+    """[(transaction_type, total, count)] for one account or the whole bank."""
+    return db.execute(
+        select(rollups.c.transaction_type, func.sum(rollups.c.total_amount), func.sum(rollups.c.tx_count))
+        .where(*rollup_conditions(account_id, start_day, end_day))
+        .group_by(rollups.c.transaction_type)
+    ).all()
+
+
+def daily_totals(db, account_id=None, start_day=None, end_day=None):
+    """[(day, transaction_type, total, count)] ordered by day, for one account or the whole bank."""
+    return db.execute(
+        select(rollups.c.day, rollups.c.transaction_type, func.sum(rollups.c.total_amount), func.sum(rollups.c.tx_count))
+        .where(*rollup_conditions(account_id, start_day, end_day))
+        .group_by(rollups.c.day, rollups.c.transaction_type)
+        .order_by(rollups.c.day, rollups.c.transaction_type)
+    ).all()
@@ -0,0 +1,146 @@
+import math
+import re
+from collections import Counter
+
+# Local classifiers that let the Orchestrator skip the LLM for obvious messages.
+# Each classifier exposes `classify(message) -> (label, confidence) | None`.
+
+ACCOUNTS = "ACCOUNTS"
+LOANS_SERVICES = "LOANS_SERVICES"
+CUSTOMER_SUPPORT = "CUSTOMER_SUPPORT"
+
+RULES = [
+    (re.compile(r"\b(balance|how much (money )?(do i have|is in my account)|account statement)\b"), ACCOUNTS),
+    (re.compile(r"\b(transactions?|spent|spending|deposits?|withdrawals?|transfer(red)?|payments? history)\b"), ACCOUNTS),
+    (re.compile(r"\b(loans?|mortgage|borrow)\b"), LOANS_SERVICES),
+    (re.compile(r"\b(cheque ?book|check ?book|credit card|debit card|new card|service request)\b"), LOANS_SERVICES),
+    (re.compile(r"\b(branch|opening hours|working hours|open on|customer care|helpline|phone number|atm|open an account|documents)\b"), CUSTOMER_SUPPORT),
+    (re.compile(r"\b(block|lost|stolen)\b.*\bcard\b"), CUSTOMER_SUPPORT),
+]
+
+# Labelled examples for the TF-IDF tier. Keep them short and varied; the
+# benchmark in benchmarks/bench_router.py uses a separate evaluation set.
+TRAINING_EXAMPLES = [
+    ("what's my balance", ACCOUNTS),
+    ("how much money do i have", ACCOUNTS),
+    ("show me my recent transactions", ACCOUNTS),
+    ("how much did i spend on coffee", ACCOUNTS),
+    ("list my last deposits", ACCOUNTS),
+    ("did my salary get credited", ACCOUNTS),
+    ("what did i pay uber last week", ACCOUNTS),
+    ("check my savings account", ACCOUNTS),
+    ("money i spent on groceries", ACCOUNTS),
+    ("am i overdrawn", ACCOUNTS),
+    ("when was my last payment", ACCOUNTS),
+    ("show my account activity", ACCOUNTS),
+    ("i want to apply for a loan", LOANS_SERVICES),
+    ("apply for a personal loan of 5000", LOANS_SERVICES),
+    ("i need a home loan", LOANS_SERVICES),
+    ("can i get a car loan", LOANS_SERVICES),
+    ("request a new cheque book", LOANS_SERVICES),
+    ("i want a credit card", LOANS_SERVICES),
+    ("order a checkbook", LOANS_SERVICES),
+    ("i would like to borrow money", LOANS_SERVICES),
+    ("submit an application for financing", LOANS_SERVICES),
+    ("request a debit card replacement", LOANS_SERVICES),
+    ("upgrade my card to platinum", LOANS_SERVICES),
+    ("what are the branch hours", CUSTOMER_SUPPORT),
+    ("when are you open", CUSTOMER_SUPPORT),
+    ("what is the customer care number", CUSTOMER_SUPPORT),
+    ("how do i contact support", CUSTOMER_SUPPORT),
+    ("is the atm open at night", CUSTOMER_SUPPORT),
+    ("what documents do i need to open an account", CUSTOMER_SUPPORT),
+    ("how do i block my card", CUSTOMER_SUPPORT),
+    ("i lost my card", CUSTOMER_SUPPORT),
+    ("hello", CUSTOMER_SUPPORT),
+    ("thanks for your help", CUSTOMER_SUPPORT),
+    ("are you open on saturday", CUSTOMER_SUPPORT),
+    ("how do i reset my password", CUSTOMER_SUPPORT),
+    ("where is the nearest branch", CUSTOMER_SUPPORT),
+]
+
+TOKEN_RE = re.compile(r"[a-z0-9']+")
+# Words that carry no intent; a message has to share something else with the
+# training examples before the TF-IDF tier will route it
+STOPWORDS = {
+    "a", "an", "the", "i", "i'd", "i'm", "me", "my", "you", "your", "we", "our", "it", "is", "are", "am", "was",
+    "be", "do", "did", "does", "to", "of", "for", "on", "in", "at", "and", "or", "what", "what's", "how", "when",
+    "where", "which", "can", "could", "would", "please", "this", "that", "there", "with", "any", "some",
+}
+
+
+def tokenize(text: str):
+    words = TOKEN_RE.findall(text.lower())
+    return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+
+class RuleClassifier:
+    name = "rules"
+
+    def __init__(self, rules=RULES):
+        self.rules = rules
+
+    def classify(self, message: str):
+        text = message.lower()
+        labels = {label for pattern, label in self.rules if pattern.search(text)}
+        # Only decide when the rules agree; mixed intents go to the next tier
+        if len(labels) == 1:
+            return labels.pop(), 1.0
+        return None
+
+
+class TfidfVectorizer:
+    def __init__(self, documents):
+        doc_freq = Counter()
+        for doc in documents:
+            doc_freq.update(set(tokenize(doc)))
+        n = len(documents)
+        self.idf = {term: math.log((1 + n) / (1 + df)) + 1 for term, df in doc_freq.items()}
+
+    def transform(self, text: str):
+        counts = Counter(t for t in tokenize(text) if t in self.idf)
+        vector = {term: count * self.idf[term] for term, count in counts.items()}
+        norm = math.sqrt(sum(v * v for v in vector.values()))
+        if not norm:
+            return {}
+        return {term: v / norm for term, v in vector.items()}
+
+
+def cosine(a: dict, b: dict):
+    if len(a) > len(b):
+        a, b = b, a
+    return sum(v * b.get(term, 0.0) for term, v in a.items())
+
+
+class TfidfClassifier:
+    """Nearest-centroid (linear) classifier over TF-IDF vectors."""
+
+    name = "tfidf"
+
+    def __init__(self, examples=TRAINING_EXAMPLES, sharpness: float = 10.0):
+        self.vectorizer = TfidfVectorizer([text for text, _ in examples])
+        self.sharpness = sharpness
+        self.centroids = {}
+        for text, label in examples:
+            centroid = self.centroids.setdefault(label, Counter())
+            centroid.update(self.vectorizer.transform(text))
+        for label, centroid in self.centroids.items():
+            norm = math.sqrt(sum(v * v for v in centroid.values()))
+            self.centroids[label] = {term: v / norm for term, v in centroid.items()}
+
+    def classify(self, message: str):
+        # transform() drops unknown words, so without a known content word the
+        # message would be judged on its stop words alone ("update my address")
+        if not any(word in self.vectorizer.idf and word not in STOPWORDS for word in TOKEN_RE.findall(message.lower())):
+            return None
+        vector = self.vectorizer.transform(message)
+        scores = {label: cosine(vector, centroid) for label, centroid in self.centroids.items()}
+        # Softmax over similarities gives a confidence comparable to the threshold
+        exps = {label: math.exp(self.sharpness * s) for label, s in scores.items()}
+        total = sum(exps.values())
+        label = max(exps, key=exps.get)
+        return label, exps[label] / total
+
+
+def default_classifiers():
+    return [RuleClassifier(), TfidfClassifier()]
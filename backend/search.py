@@ -0,0 +1,123 @@
+import re
+
+from sqlalchemy import and_, func, inspect, or_, select, text
+from sqlalchemy.orm import Session
+
+from .models import Transaction
+from .transactions import escape_like
+
+# Full-text search over transaction descriptions, replacing ILIKE '%term%'
+# scans. SQLite: an external-content FTS5 table (transactions_fts) kept in sync
+# by triggers, so ORM and Core inserts are both indexed. Postgres: a GIN index
+# on to_tsvector('simple', description). Every word of the search term is
+# matched as a prefix, so "star coff" finds "Starbucks Coffee".
+# Searches scoped to one account skip the index: the account's rows are already
+# a small range of ix_transactions_account_id_timestamp, and filtering that is
+# cheaper than materializing every bank-wide match (see benchmarks/bench_search.py).
+
+FTS_TABLE = "transactions_fts"
+PG_INDEX = "ix_transactions_description_fts"
+
+SQLITE_DDL = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        description, content='transactions', content_rowid='id', prefix='2 3'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS transactions_fts_ai AFTER INSERT ON transactions BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, description) VALUES (new.id, new.description);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS transactions_fts_ad AFTER DELETE ON transactions BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, description) VALUES ('delete', old.id, old.description);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS transactions_fts_au AFTER UPDATE OF description ON transactions BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, description) VALUES ('delete', old.id, old.description);
+        INSERT INTO {FTS_TABLE}(rowid, description) VALUES (new.id, new.description);
+    END""",
+]
+
+PG_DDL = [
+    f"CREATE INDEX IF NOT EXISTS {PG_INDEX} ON transactions "
+    "USING GIN (to_tsvector('simple', coalesce(description, '')))",
+]
+
+
+def ensure_search_index(engine):
+    """Creates the search index if missing (backfilled from existing rows). Returns the created names."""
+    dialect = engine.dialect.name
+    if dialect == "sqlite":
+        exists = inspect(engine).has_table(FTS_TABLE)
+        with engine.begin() as conn:
+            # IF NOT EXISTS throughout, so this also restores triggers dropped for a bulk load
+            for statement in SQLITE_DDL:
+                conn.execute(text(statement))
+            if not exists:
+                conn.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"))
+        return [] if exists else [FTS_TABLE]
+    if dialect == "postgresql":
+        existing = {ix["name"] for ix in inspect(engine).get_indexes("transactions")}
+        if PG_INDEX in existing:
+            return []
+        with engine.begin() as conn:
+            for statement in PG_DDL:
+                conn.execute(text(statement))
+        return [PG_INDEX]
+    return []
+
+
+def suspend_search_index(engine):
+    """Stops index maintenance for a bulk load; ensure_search_index + rebuild_search_index bring it back."""
+    with engine.begin() as conn:
+        if engine.dialect.name == "sqlite":
+            for trigger in ("transactions_fts_ai", "transactions_fts_ad", "transactions_fts_au"):
+                conn.execute(text(f"DROP TRIGGER IF EXISTS {trigger}"))
+        elif engine.dialect.name == "postgresql":
+            conn.execute(text(f"DROP INDEX IF EXISTS {PG_INDEX}"))
+
+
+def rebuild_search_index(engine):
+    # Only needed if the index was bypassed (e.g. triggers dropped for a bulk load)
+    if engine.dialect.name == "sqlite":
+        with engine.begin() as conn:
+            conn.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"))
+    elif engine.dialect.name == "postgresql":
+        with engine.begin() as conn:
+            conn.execute(text(f"REINDEX INDEX {PG_INDEX}"))
+
+
+def search_terms(term: str):
+    return re.findall(r"\w+", (term or "").lower())
+
+
+def search_condition(db: Session, term: str, account_scoped: bool = False):
+    """WHERE clause matching transactions whose description contains every word of term as a prefix."""
+    words = search_terms(term)
+    if not words:
+        return None
+    if account_scoped:
+        return and_(*[
+            or_(
+                Transaction.description.ilike(f"{escape_like(w)}%", escape="\\"),
+                Transaction.description.ilike(f"% {escape_like(w)}%", escape="\\"),
+            )
+            for w in words
+        ])
+    if db.get_bind().dialect.name == "postgresql":
+        query = " & ".join(f"{w}:*" for w in words)
+        vector = func.to_tsvector("simple", func.coalesce(Transaction.description, ""))
+        return vector.op("@@")(func.to_tsquery("simple", query))
+
+    query = " ".join(f'"{w}"*' for w in words)
+    matches = select(text("rowid")).select_from(text(FTS_TABLE)).where(text(f"{FTS_TABLE} MATCH :fts_query"))
+    return Transaction.id.in_(matches.params(fts_query=query))
+
+
+def search_transactions(db: Session, term: str, account_id: int = None, transaction_type: str = None, limit: int = 20):
+    """Newest matching transactions for one account or the whole bank."""
+    condition = search_condition(db, term, account_scoped=account_id is not None)
+    if condition is None:
+        return []
+    query = select(Transaction).where(condition)
+    if account_id is not None:
+        query = query.where(Transaction.account_id == account_id)
+    if transaction_type:
+        query = query.where(Transaction.transaction_type == transaction_type)
+    return db.scalars(query.order_by(Transaction.timestamp.desc(), Transaction.id.desc()).limit(limit)).all()
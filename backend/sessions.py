@@ -0,0 +1,146 @@
+from collections import OrderedDict
+from datetime import datetime, timedelta
+import threading
+import time
+import uuid
+
+from .config import SESSION_STORE, SESSION_TTL_SECONDS, SESSION_MAX_ENTRIES, WEB_CONCURRENCY
+from .database import SessionLocal
+from .models import ChatSession, ChatMessage
+
+# Conversation history kept on the server, already in OpenAI/Groq message
+# format, so clients only send the new message and the history is not
+# re-converted on every turn.
+
+class MemorySessionStore:
+    def __init__(self, max_entries: int = SESSION_MAX_ENTRIES, ttl_seconds: int = SESSION_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._sessions = OrderedDict() # session_id -> (last_access, messages)
+        self._lock = threading.Lock()
+
+    def create(self, user_id: int, messages: list = None):
+        session_id = uuid.uuid4().hex
+        with self._lock:
+            self._put(session_id, list(messages or []))
+        return session_id
+
+    def get(self, session_id: str):
+        """Return the stored messages, or None if the session is unknown or expired."""
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            if entry is None:
+                return None
+            last_access, messages = entry
+            if time.time() - last_access > self.ttl_seconds:
+                del self._sessions[session_id]
+                return None
+            self._put(session_id, messages)
+            return list(messages)
+
+    def append(self, session_id: str, messages: list):
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            stored = entry[1] if entry else []
+            stored.extend(messages)
+            self._put(session_id, stored)
+
+    def evict_expired(self):
+        cutoff = time.time() - self.ttl_seconds
+        with self._lock:
+            expired = [sid for sid, (last_access, _) in self._sessions.items() if last_access < cutoff]
+            for session_id in expired:
+                del self._sessions[session_id]
+        return len(expired)
+
+    def _put(self, session_id, messages):
+        self._sessions[session_id] = (time.time(), messages)
+        self._sessions.move_to_end(session_id)
+        while len(self._sessions) > self.max_entries:
+            self._sessions.popitem(last=False)
+
+
+class SqliteSessionStore(MemorySessionStore):
+    """LRU cache in front of the chat_sessions/chat_messages tables.
+
+    With several worker processes a conversation's turns may land on different
+    workers, so a per-process copy would go stale; cache_messages=False reads
+    the history from the tables on every get().
+    """
+
+    def __init__(self, session_factory=SessionLocal, cache_messages: bool = True, **kwargs):
+        super().__init__(**kwargs)
+        self.session_factory = session_factory
+        self.cache_messages = cache_messages
+
+    def create(self, user_id: int, messages: list = None):
+        if self.cache_messages:
+            session_id = super().create(user_id, messages)
+        else:
+            session_id = uuid.uuid4().hex
+        db = self.session_factory()
+        try:
+            db.add(ChatSession(id=session_id, user_id=user_id, messages=[
+                ChatMessage(role=m["role"], content=m["content"]) for m in messages or []
+            ]))
+            db.commit()
+        finally:
+            db.close()
+        return session_id
+
+    def get(self, session_id: str):
+        messages = super().get(session_id)
+        if messages is not None:
+            return messages
+
+        db = self.session_factory()
+        try:
+            session = db.get(ChatSession, session_id)
+            if session is None:
+                return None
+            if datetime.utcnow() - session.updated_at > timedelta(seconds=self.ttl_seconds):
+                db.delete(session)
+                db.commit()
+                return None
+            messages = [{"role": m.role, "content": m.content} for m in session.messages]
+        finally:
+            db.close()
+
+        if self.cache_messages:
+            with self._lock:
+                self._put(session_id, messages)
+        return list(messages)
+
+    def append(self, session_id: str, messages: list):
+        with self._lock:
+            cached = session_id in self._sessions
+        # An evicted session is reloaded in full from the table on the next get()
+        if cached:
+            super().append(session_id, messages)
+        db = self.session_factory()
+        try:
+            # Only the new messages are written; earlier turns are never rewritten
+            db.add_all([ChatMessage(session_id=session_id, role=m["role"], content=m["content"]) for m in messages])
+            db.query(ChatSession).filter(ChatSession.id == session_id).update({"updated_at": datetime.utcnow()})
+            db.commit()
+        finally:
+            db.close()
+
+    def evict_expired(self):
+        super().evict_expired()
+        cutoff = datetime.utcnow() - timedelta(seconds=self.ttl_seconds)
+        db = self.session_factory()
+        try:
+            expired = db.query(ChatSession).filter(ChatSession.updated_at < cutoff).all()
+            for session in expired:
+                db.delete(session)
+            db.commit()
+            return len(expired)
+        finally:
+            db.close()
+
+
+def create_session_store():
+    if SESSION_STORE == "sqlite":
+        return SqliteSessionStore(cache_messages=WEB_CONCURRENCY == 1)
+    return MemorySessionStore()
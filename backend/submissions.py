@@ -0,0 +1,217 @@
+from collections import Counter
+from datetime import datetime
+import threading
+
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, case, delete, event, func, insert, select, update
+from sqlalchemy.schema import CreateTable
+
+from .config import (
+    SUBMISSION_JOURNAL_PATH, SUBMISSION_BATCH_SIZE, SUBMISSION_FLUSH_INTERVAL_SECONDS, SUBMISSION_ID_BLOCK_SIZE,
+)
+from .database import create_db_engine, dialect_insert, engine as app_engine
+from .models import IdAllocation, ServiceRequest
+
+# Write-behind queue for loan/service submissions. submit() appends the request
+# to a local SQLite journal under a reference ID taken from a block reserved in
+# the main database, and returns at once. A background thread group-commits
+# journaled requests to service_requests, then deletes them from the journal.
+#
+# Exactly-once: the journal row, the reference ID and the service_requests row
+# share one primary key and the insert ignores existing IDs, so replaying the
+# journal after a crash (even between the main commit and the journal delete)
+# never duplicates a request, and an accepted request is never lost.
+#
+# That only holds if nothing else takes a reserved ID: ORM inserts into
+# service_requests draw theirs from id_allocations too (see _assign_id below),
+# and flush() checks that an existing row with a journaled ID is the same
+# request. If it isn't, the batch is rolled back and stays in the journal
+# (SubmissionConflictError) rather than being dropped.
+
+class SubmissionConflictError(Exception):
+    """service_requests holds a different request under a journaled reference ID."""
+
+
+journal_metadata = MetaData()
+journal = Table(
+    "submissions", journal_metadata,
+    Column("id", Integer, primary_key=True), # Reference ID == service_requests.id
+    Column("user_id", Integer),
+    Column("service_type", String),
+    Column("details", String),
+    Column("status", String),
+    Column("timestamp", DateTime),
+)
+
+
+def _insert_ignoring_existing(table, dialect_name, index_elements):
+    return dialect_insert(dialect_name)(table).on_conflict_do_nothing(index_elements=index_elements)
+
+
+def reserve_ids(conn, size, table=ServiceRequest.__table__):
+    """Reserves size consecutive IDs above any in use, inside the caller's transaction."""
+    allocations = IdAllocation.__table__
+    in_use = select(func.coalesce(func.max(table.c.id), 0) + 1).scalar_subquery()
+    # The first statement takes the write lock, so concurrent allocators serialize
+    conn.execute(_insert_ignoring_existing(allocations, conn.dialect.name, ["name"]), {"name": table.name, "next_id": 1})
+    conn.execute(
+        update(allocations).where(allocations.c.name == table.name)
+        .values(next_id=case((allocations.c.next_id > in_use, allocations.c.next_id), else_=in_use) + size)
+    )
+    next_id = conn.execute(select(allocations.c.next_id).where(allocations.c.name == table.name)).scalar()
+    return range(next_id - size, next_id)
+
+
+def allocate_ids(engine, size, table=ServiceRequest.__table__):
+    """Reserves size consecutive IDs above any in use. Safe across threads and processes."""
+    with engine.begin() as conn:
+        return reserve_ids(conn, size, table)
+
+
+@event.listens_for(ServiceRequest, "before_insert")
+def _assign_id(mapper, connection, target):
+    # Left to the database, the ID would be max(id) + 1, which may be a reference
+    # ID a queue has handed out but not yet flushed
+    if target.id is None:
+        target.id = reserve_ids(connection, 1)[0]
+
+
+class SubmissionQueue:
+    def __init__(self, journal_path: str = SUBMISSION_JOURNAL_PATH, engine=None,
+                 batch_size: int = SUBMISSION_BATCH_SIZE, flush_interval: float = SUBMISSION_FLUSH_INTERVAL_SECONDS,
+                 block_size: int = SUBMISSION_ID_BLOCK_SIZE):
+        self.journal_path = journal_path
+        self.engine = engine or app_engine
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.block_size = block_size
+        self.counters = Counter()
+        self._journal_engine = None
+        self._ids = iter(())
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def journal_engine(self):
+        # Created on first use so importing the agents doesn't create the journal file
+        if self._journal_engine is None:
+            with self._lock:
+                if self._journal_engine is None:
+                    journal_engine = create_db_engine(f"sqlite:///{self.journal_path}")
+                    with journal_engine.begin() as conn:
+                        # Worker processes share the journal and may get here at the same moment
+                        conn.execute(CreateTable(journal, if_not_exists=True))
+                    self._journal_engine = journal_engine
+        return self._journal_engine
+
+    def next_id(self):
+        with self._lock:
+            reference = next(self._ids, None)
+            if reference is None:
+                self._ids = iter(allocate_ids(self.engine, self.block_size))
+                self.counters["id_blocks"] += 1
+                reference = next(self._ids)
+            return reference
+
+    def submit(self, user_id: int, service_type: str, details: str, status: str = "Requested"):
+        """Durably accepts a request and returns its reference ID; it reaches service_requests on the next flush."""
+        reference = self.next_id()
+        self.accept([self.request(reference, user_id, service_type, details, status)])
+        return reference
+
+    @staticmethod
+    def request(reference: int, user_id: int, service_type: str, details: str, status: str = "Requested"):
+        return {"id": reference, "user_id": user_id, "service_type": service_type, "details": details,
+                "status": status, "timestamp": datetime.utcnow()}
+
+    def accept(self, requests):
+        """Journals requests whose reference IDs came from next_id(), all or none."""
+        with self.journal_engine.begin() as conn:
+            conn.execute(insert(journal), requests)
+        self.counters["accepted"] += len(requests)
+
+    def flush(self):
+        """Applies everything in the journal, one transaction per batch. Returns the number of rows applied."""
+        applied = 0
+        with self._flush_lock:
+            while True:
+                with self.journal_engine.connect() as conn:
+                    rows = conn.execute(select(journal).order_by(journal.c.id).limit(self.batch_size)).mappings().all()
+                if not rows:
+                    return applied
+
+                with self.engine.begin() as conn:
+                    conn.execute(
+                        _insert_ignoring_existing(ServiceRequest.__table__, conn.dialect.name, ["id"]),
+                        [dict(row) for row in rows],
+                    )
+                    # An ID that was already taken is only fine if it is this request, applied
+                    # before a crash; anything else is a collision, and raising rolls the batch back
+                    conflicts = self._conflicting_ids(conn, rows)
+                    if conflicts:
+                        self.counters["conflicts"] += len(conflicts)
+                        raise SubmissionConflictError(f"reference IDs {conflicts} belong to other service requests")
+                # A crash here replays the batch; the insert above skips the IDs already present
+                with self.journal_engine.begin() as conn:
+                    conn.execute(delete(journal).where(journal.c.id.in_([row["id"] for row in rows])))
+
+                applied += len(rows)
+                self.counters["applied"] += len(rows)
+                self.counters["batches"] += 1
+
+    @staticmethod
+    def _conflicting_ids(conn, rows):
+        table = ServiceRequest.__table__
+        # Status is left out: the dashboard may have approved a replayed request already
+        fields = ("user_id", "service_type", "details", "timestamp")
+        stored = conn.execute(
+            select(table.c.id, *(table.c[name] for name in fields)).where(table.c.id.in_([row["id"] for row in rows]))
+        ).mappings()
+        expected = {row["id"]: tuple(row[name] for name in fields) for row in rows}
+        return sorted(row["id"] for row in stored if tuple(row[name] for name in fields) != expected[row["id"]])
+
+    def pending(self):
+        with self.journal_engine.connect() as conn:
+            return conn.execute(select(func.count()).select_from(journal)).scalar()
+
+    def start(self):
+        """Replays anything left in the journal (crash recovery), then starts the background writer."""
+        if self._thread and self._thread.is_alive():
+            return
+        try:
+            self.counters["replayed"] += self.flush()
+        except SubmissionConflictError as e:
+            # Left in the journal and retried (and reported) on every tick; other
+            # chat traffic keeps working
+            self.counters["errors"] += 1
+            print(f"Submission replay failed: {e}")
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="submission-writer", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+        self.flush()
+
+    def _run(self):
+        while not self._stop.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception as e:
+                # Rows stay in the journal and are retried on the next tick
+                self.counters["errors"] += 1
+                print(f"Submission flush failed: {e}")
+
+    def stats(self):
+        return {
+            "running": bool(self._thread and self._thread.is_alive()),
+            "pending": self.pending() if self._journal_engine else 0,
+            **self.counters,
+        }
+
+
+submission_queue = SubmissionQueue()
@@ -0,0 +1,136 @@
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import and_, func, or_, select
+from sqlalchemy.orm import Session
+
+from .models import Transaction, TransactionDailyTotal
+from .rollups import day_bounds, rollup_conditions
+
+# Filterable transaction queries for the Accounts tools. Listing uses keyset
+# pagination on (timestamp, id) so every page is an index range scan on
+# ix_transactions_account_id_timestamp (SQLite appends the rowid to the index),
+# and aggregation runs in the database so the model never has to add up rows.
+# Type/month totals over whole days are read from the daily rollups instead.
+
+MAX_PAGE_SIZE = 50
+GROUP_BY_CHOICES = ("description", "type", "month")
+
+
+def parse_date(value, end=False):
+    # Dates come from the model as YYYY-MM-DD; an end date includes the whole day
+    if value is None or value == "":
+        return None
+    if isinstance(value, datetime):
+        return value
+    parsed = value if isinstance(value, date) else date.fromisoformat(str(value)[:10])
+    if end:
+        parsed += timedelta(days=1)
+    return datetime(parsed.year, parsed.month, parsed.day)
+
+
+def normalize_type(value):
+    return value.strip().capitalize() if value else None
+
+
+def encode_cursor(transaction):
+    return f"{transaction.timestamp.isoformat()}|{transaction.id}"
+
+
+def decode_cursor(cursor):
+    timestamp, _, tx_id = cursor.rpartition("|")
+    return datetime.fromisoformat(timestamp), int(tx_id)
+
+
+def escape_like(value):
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def filter_conditions(account_id, start_date=None, end_date=None, transaction_type=None,
+                      description=None, min_amount=None, max_amount=None):
+    conditions = [Transaction.account_id == account_id]
+    start, end = parse_date(start_date), parse_date(end_date, end=True)
+    if start is not None:
+        conditions.append(Transaction.timestamp >= start)
+    if end is not None:
+        conditions.append(Transaction.timestamp < end)
+    if transaction_type:
+        conditions.append(Transaction.transaction_type == normalize_type(transaction_type))
+    if description:
+        conditions.append(Transaction.description.ilike(f"%{escape_like(description.strip())}%", escape="\\"))
+    if min_amount is not None:
+        conditions.append(Transaction.amount >= float(min_amount))
+    if max_amount is not None:
+        conditions.append(Transaction.amount <= float(max_amount))
+    return conditions
+
+
+def page_size(limit, default: int = 20):
+    # Tool calls may send "limit": null
+    return max(1, min(default if limit is None else int(limit), MAX_PAGE_SIZE))
+
+
+def query_transactions(db: Session, account_id: int, limit: int = 20, cursor: str = None, **filters):
+    """Newest-first page of matching transactions and the cursor for the next page (or None)."""
+    limit = page_size(limit)
+    conditions = filter_conditions(account_id, **filters)
+    if cursor:
+        timestamp, tx_id = decode_cursor(cursor)
+        conditions.append(or_(
+            Transaction.timestamp < timestamp,
+            and_(Transaction.timestamp == timestamp, Transaction.id < tx_id),
+        ))
+
+    rows = db.scalars(
+        select(Transaction).where(*conditions)
+        .order_by(Transaction.timestamp.desc(), Transaction.id.desc())
+        .limit(limit + 1)
+    ).all()
+    next_cursor = encode_cursor(rows[limit - 1]) if len(rows) > limit else None
+    return rows[:limit], next_cursor
+
+
+def month_expression(db: Session, column=Transaction.timestamp):
+    if db.get_bind().dialect.name == "sqlite":
+        return func.strftime("%Y-%m", column)
+    return func.to_char(column, "YYYY-MM")
+
+
+def _rollup_aggregate(db: Session, account_id: int, group_by: str, start_date=None, end_date=None,
+                      transaction_type=None, description=None, min_amount=None, max_amount=None):
+    # Only type/month groupings filtered by whole days and type can use the rollups
+    if group_by == "description" or description or min_amount is not None or max_amount is not None:
+        return None
+    days = day_bounds(parse_date(start_date), parse_date(end_date, end=True))
+    if days is None:
+        return None
+
+    key = TransactionDailyTotal.transaction_type if group_by == "type" else month_expression(db, TransactionDailyTotal.day)
+    total = func.sum(TransactionDailyTotal.total_amount)
+    return (
+        select(key.label("key"), total.label("total"), func.sum(TransactionDailyTotal.tx_count).label("count"))
+        .where(*rollup_conditions(account_id, *days, normalize_type(transaction_type)))
+        .group_by(key)
+        .order_by(key if group_by == "month" else total.desc())
+    )
+
+
+def aggregate_transactions(db: Session, account_id: int, group_by: str = "description", **filters):
+    """Sum and count of matching transactions per merchant description, type or month."""
+    if group_by not in GROUP_BY_CHOICES:
+        raise ValueError(f"group_by must be one of {', '.join(GROUP_BY_CHOICES)}")
+    statement = _rollup_aggregate(db, account_id, group_by, **filters)
+    if statement is None:
+        key = {
+            "description": Transaction.description,
+            "type": Transaction.transaction_type,
+            "month": month_expression(db),
+        }[group_by]
+        statement = (
+            select(key.label("key"), func.sum(Transaction.amount).label("total"), func.count().label("count"))
+            .where(*filter_conditions(account_id, **filters))
+            .group_by(key)
+            .order_by(key if group_by == "month" else func.sum(Transaction.amount).desc())
+        )
+
+    rows = db.execute(statement).all()
+    return [{"key": row.key, "total": round(row.total or 0.0, 2), "count": row.count} for row in rows]
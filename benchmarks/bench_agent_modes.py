@@ -0,0 +1,86 @@
+"""
+Latency and token usage of AGENT_MODE=orchestrated vs AGENT_MODE=single.
+
+Each mode gets its own backend process against the same stub LLM; the same
+scripted mix of support, accounts and loan messages is sent to each, and
+the stub's counters give LLM calls and prompt/completion tokens per request.
+The FAQ cache is disabled so every request reaches the model.
+
+Run:  python -m benchmarks.bench_agent_modes --latency 0.2 --requests 60
+"""
+import argparse
+import asyncio
+import tempfile
+import time
+
+import httpx
+
+from .common import free_port, percentile, start_backend, start_stub_llm
+
+MESSAGES = [
+    "What is my balance?",
+    "What are the branch hours?",
+    "I want to apply for a personal loan",
+    "Show my recent transactions",
+    "What is the customer care number?",
+    "Request a new checkbook",
+]
+
+MODES = [
+    ("orchestrated (LLM router)", {"AGENT_MODE": "orchestrated", "ROUTER_FAST_PATH": "false"}),
+    ("orchestrated (fast path)", {"AGENT_MODE": "orchestrated"}),
+    ("single", {"AGENT_MODE": "single"}),
+]
+
+
+async def drive(api_port, llm_port, total, concurrency):
+    latencies = []
+    queue = asyncio.Queue()
+    for i in range(total):
+        queue.put_nowait(MESSAGES[i % len(MESSAGES)])
+
+    async def worker(client):
+        while not queue.empty():
+            message = queue.get_nowait()
+            start = time.perf_counter()
+            response = await client.post(f"http://127.0.0.1:{api_port}/chat", json={"message": message})
+            response.raise_for_status()
+            latencies.append(time.perf_counter() - start)
+
+    async with httpx.AsyncClient(timeout=120) as client:
+        await client.post(f"http://127.0.0.1:{llm_port}/_faults", json={})
+        await asyncio.gather(*(worker(client) for _ in range(concurrency)))
+        usage = (await client.get(f"http://127.0.0.1:{llm_port}/_stats")).json()
+    return latencies, usage
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency", type=float, default=0.2, help="Stub LLM latency per call (seconds)")
+    parser.add_argument("--requests", type=int, default=60)
+    parser.add_argument("--concurrency", type=int, default=4)
+    args = parser.parse_args()
+
+    llm_port = free_port()
+    stub = start_stub_llm(llm_port, args.latency)
+    try:
+        print(f"{'mode':<27} {'p50 ms':>7} {'p95 ms':>7} {'calls/req':>9} {'prompt tok/req':>14} {'compl tok/req':>13}")
+        for name, env in MODES:
+            api_port = free_port()
+            backend = start_backend(api_port, llm_port, cwd=tempfile.mkdtemp(prefix="bench_modes_"),
+                                    env=dict(env, RESPONSE_CACHE_ENABLED="false"))
+            try:
+                latencies, usage = asyncio.run(drive(api_port, llm_port, args.requests, args.concurrency))
+            finally:
+                backend.terminate()
+                backend.wait()
+            n = len(latencies)
+            print(f"{name:<27} {percentile(latencies, 50) * 1000:>7.0f} {percentile(latencies, 95) * 1000:>7.0f} "
+                  f"{usage['requests'] / n:>9.2f} {usage['prompt_tokens'] / n:>14.0f} {usage['completion_tokens'] / n:>13.0f}")
+    finally:
+        stub.terminate()
+        stub.wait()
+
+
+if __name__ == "__main__":
+    main()
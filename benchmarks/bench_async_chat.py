@@ -0,0 +1,79 @@
+"""
+Concurrent /chat load test against a stub LLM.
+
+Starts benchmarks/stub_llm.py with a fixed per-call latency, starts the backend
+pointed at it (in a scratch directory so app.db is not touched) and measures
+requests/sec at increasing concurrency. With a blocking pipeline throughput is
+pinned near 1 / (calls_per_request * latency); with the async pipeline it should
+grow roughly linearly with concurrency until the DB pool or CPU saturates.
+
+Run:  python -m benchmarks.bench_async_chat --latency 0.2
+"""
+import argparse
+import asyncio
+import tempfile
+import time
+
+import httpx
+
+from .common import free_port, percentile, start_backend, start_stub_llm
+
+MESSAGES = [
+    "What is my balance?",
+    "What are the branch hours?",
+    "I want to apply for a loan",
+    "Show my recent transactions",
+]
+
+
+async def run_level(url, concurrency, requests_per_worker):
+    latencies = []
+
+    async def worker(worker_id, client):
+        for i in range(requests_per_worker):
+            message = MESSAGES[(worker_id + i) % len(MESSAGES)]
+            start = time.perf_counter()
+            response = await client.post(url, json={"message": message, "history": []})
+            response.raise_for_status()
+            latencies.append(time.perf_counter() - start)
+
+    async with httpx.AsyncClient(timeout=120) as client:
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(w, client) for w in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    return {
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "rps": len(latencies) / elapsed,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency", type=float, default=0.2, help="Stub LLM latency per call (seconds)")
+    parser.add_argument("--levels", default="1,4,16,32", help="Comma separated concurrency levels")
+    parser.add_argument("--requests-per-worker", type=int, default=4)
+    args = parser.parse_args()
+
+    llm_port, api_port = free_port(), free_port()
+    workdir = tempfile.mkdtemp(prefix="bench_async_chat_")
+    stub = start_stub_llm(llm_port, args.latency)
+    backend = start_backend(api_port, llm_port, cwd=workdir)
+    try:
+        url = f"http://127.0.0.1:{api_port}/chat"
+        print(f"{'concurrency':>11} {'requests':>8} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8}")
+        for level in [int(x) for x in args.levels.split(",")]:
+            r = asyncio.run(run_level(url, level, args.requests_per_worker))
+            print(f"{r['concurrency']:>11} {r['requests']:>8} {r['rps']:>8.2f} {r['p50_ms']:>8.0f} {r['p95_ms']:>8.0f}")
+    finally:
+        backend.terminate()
+        stub.terminate()
+        backend.wait()
+        stub.wait()
+
+
+if __name__ == "__main__":
+    main()
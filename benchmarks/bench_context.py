@@ -0,0 +1,90 @@
+"""
+Prompt size and latency of history windowing on synthetic long conversations.
+
+Replays 50- and 200-turn conversations one turn at a time, exactly as the
+backend does (full session history -> ContextManager.fit -> prompt), and
+compares prompt tokens against sending the full history. The summarizer is
+a stand-in with a fixed latency so the numbers are reproducible offline;
+the "est. LLM ms" column models upstream time as a fixed overhead plus a
+per-prompt-token cost.
+
+Run:  python -m benchmarks.bench_context --budget 3000
+"""
+import argparse
+import asyncio
+import random
+import time
+
+from backend.context import ContextManager, estimate_tokens
+
+WORDS = "balance loan transfer coffee salary branch card account payment deposit statement interest rate fee".split()
+
+
+def synthetic_conversation(turns, seed=0):
+    rng = random.Random(seed)
+    messages = []
+    for _ in range(turns):
+        messages.append({"role": "user", "content": " ".join(rng.choice(WORDS) for _ in range(rng.randint(8, 30)))})
+        messages.append({"role": "assistant", "content": " ".join(rng.choice(WORDS) for _ in range(rng.randint(40, 120)))})
+    return messages
+
+
+def make_summarizer(latency):
+    async def summarize(previous_summary, messages):
+        await asyncio.sleep(latency)
+        # Summaries stay roughly constant in size no matter how much is folded
+        return (previous_summary + " " if previous_summary else "") [:400] + f"[{len(messages)} messages folded]"
+    return summarize
+
+
+async def replay(turns, budget, keep_turns, summary_latency, ms_per_1k_tokens, overhead_ms):
+    conversation = synthetic_conversation(turns)
+    manager = ContextManager(make_summarizer(summary_latency), keep_turns=keep_turns)
+
+    full_tokens, windowed_tokens, fit_seconds = [], [], []
+    for turn in range(turns):
+        history = conversation[: turn * 2]
+        full_tokens.append(estimate_tokens(history))
+
+        start = time.perf_counter()
+        context = await manager.fit(history, budget, key="bench")
+        fit_seconds.append(time.perf_counter() - start)
+        windowed_tokens.append(estimate_tokens(context))
+
+    def llm_ms(tokens):
+        return overhead_ms + tokens / 1000 * ms_per_1k_tokens
+
+    return {
+        "turns": turns,
+        "full_max": max(full_tokens),
+        "full_total": sum(full_tokens),
+        "win_max": max(windowed_tokens),
+        "win_total": sum(windowed_tokens),
+        "summary_calls": manager.summary_calls,
+        "fit_ms_mean": sum(fit_seconds) / len(fit_seconds) * 1000,
+        "llm_ms_full_last": llm_ms(full_tokens[-1]),
+        "llm_ms_win_last": llm_ms(windowed_tokens[-1]),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--budget", type=int, default=3000, help="History token budget")
+    parser.add_argument("--keep-turns", type=int, default=6)
+    parser.add_argument("--summary-latency", type=float, default=0.05, help="Seconds per summarizer call")
+    parser.add_argument("--ms-per-1k-tokens", type=float, default=40.0, help="Modelled prefill cost")
+    parser.add_argument("--overhead-ms", type=float, default=250.0, help="Modelled fixed LLM latency")
+    args = parser.parse_args()
+
+    print(f"{'turns':>5} {'full max':>9} {'win max':>8} {'full total':>11} {'win total':>10} "
+          f"{'summaries':>9} {'fit ms':>7} {'est. LLM ms (last turn) full/win':>34}")
+    for turns in (50, 200):
+        r = asyncio.run(replay(turns, args.budget, args.keep_turns, args.summary_latency,
+                               args.ms_per_1k_tokens, args.overhead_ms))
+        print(f"{r['turns']:>5} {r['full_max']:>9} {r['win_max']:>8} {r['full_total']:>11} {r['win_total']:>10} "
+              f"{r['summary_calls']:>9} {r['fit_ms_mean']:>7.2f} "
+              f"{r['llm_ms_full_last']:>16.0f} / {r['llm_ms_win_last']:<15.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Mixed read/write concurrency: default SQLite settings vs the tuned engine factory.
+
+Reader threads run the get_recent_transactions query (the dashboard/agent read
+path); writer threads insert-and-commit service requests, as the loan and
+service tools do. Each profile gets a fresh database file because WAL is a
+persistent property of the file. With --url the tuned profile is run against
+that database instead (e.g. a Postgres instance).
+
+Run:  python -m benchmarks.bench_db_concurrency --readers 8 --writers 2 --seconds 10
+"""
+import argparse
+import os
+import random
+import tempfile
+import threading
+import time
+
+from sqlalchemy import create_engine, select
+from sqlalchemy.exc import OperationalError
+
+from backend.database import create_db_engine
+from backend.metrics import percentile
+from backend.models import ServiceRequest, Transaction
+from .datagen import generate
+
+
+def run_profile(engine, accounts, readers, writers, seconds):
+    stop = threading.Event()
+    lock = threading.Lock()
+    results = {"reads": [], "writes": [], "errors": 0}
+
+    def reader(seed):
+        rng = random.Random(seed)
+        while not stop.is_set():
+            start = time.perf_counter()
+            try:
+                with engine.connect() as conn:
+                    conn.execute(
+                        select(Transaction).where(Transaction.account_id == rng.randint(1, accounts))
+                        .order_by(Transaction.timestamp.desc()).limit(10)
+                    ).all()
+            except OperationalError:
+                with lock:
+                    results["errors"] += 1
+                continue
+            with lock:
+                results["reads"].append(time.perf_counter() - start)
+
+    def writer(seed):
+        rng = random.Random(seed)
+        while not stop.is_set():
+            start = time.perf_counter()
+            try:
+                with engine.begin() as conn:
+                    conn.execute(ServiceRequest.__table__.insert().values(
+                        user_id=rng.randint(1, accounts), service_type="Checkbook", details="", status="Requested"))
+            except OperationalError:
+                with lock:
+                    results["errors"] += 1
+                continue
+            with lock:
+                results["writes"].append(time.perf_counter() - start)
+
+    threads = [threading.Thread(target=reader, args=(i,)) for i in range(readers)]
+    threads += [threading.Thread(target=writer, args=(1000 + i,)) for i in range(writers)]
+    for t in threads:
+        t.start()
+    time.sleep(seconds)
+    stop.set()
+    for t in threads:
+        t.join()
+    return results
+
+
+def report(name, results, seconds):
+    reads, writes = results["reads"], results["writes"]
+    print(f"{name:<10} {len(reads) / seconds:>9.0f} {percentile(reads, 95) * 1000:>12.2f} "
+          f"{len(writes) / seconds:>10.0f} {percentile(writes, 95) * 1000:>13.2f} {results['errors']:>7}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=200_000, help="Transactions to preload")
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--writers", type=int, default=2)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--url", help="Benchmark this database with the tuned factory only")
+    args = parser.parse_args()
+
+    print(f"{'profile':<10} {'reads/s':>9} {'read p95 ms':>12} {'writes/s':>10} {'write p95 ms':>13} {'errors':>7}")
+    if args.url:
+        engine = create_db_engine(args.url)
+        accounts = generate(engine, args.rows // 200, args.rows)["accounts"]
+        report("tuned", run_profile(engine, accounts, args.readers, args.writers, args.seconds), args.seconds)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        profiles = [
+            ("default", lambda url: create_engine(url, connect_args={"check_same_thread": False})),
+            ("tuned", create_db_engine),
+        ]
+        for name, factory in profiles:
+            engine = factory(f"sqlite:///{os.path.join(tmp, name + '.db')}")
+            accounts = generate(engine, args.rows // 200, args.rows)["accounts"]
+            report(name, run_profile(engine, accounts, args.readers, args.writers, args.seconds), args.seconds)
+            engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Offline accuracy / latency benchmark for the local routing tiers.
+
+For each tier (rules, TF-IDF, and the combined fast path at the configured
+threshold) reports coverage (share of messages decided locally), accuracy on
+the decided messages and mean classification latency. Messages the fast path
+leaves undecided are the ones that still cost an LLM round-trip.
+
+Run:  python -m benchmarks.bench_router --threshold 0.8
+"""
+import argparse
+import time
+
+from backend.router import ACCOUNTS, CUSTOMER_SUPPORT, LOANS_SERVICES, RuleClassifier, TfidfClassifier
+
+EVAL_SET = [
+    ("Check my account balance", ACCOUNTS),
+    ("what is my current balance?", ACCOUNTS),
+    ("How much money is in my account", ACCOUNTS),
+    ("Show recent transactions", ACCOUNTS),
+    ("Show me my last 5 transactions.", ACCOUNTS),
+    ("how much did I spend on coffee this month", ACCOUNTS),
+    ("did I get any deposits yesterday", ACCOUNTS),
+    ("what was that uber charge", ACCOUNTS),
+    ("when did my salary come in", ACCOUNTS),
+    ("what did I spend at the grocery store", ACCOUNTS),
+    ("any withdrawals this week?", ACCOUNTS),
+    ("transfer history please", ACCOUNTS),
+    ("Apply for a personal loan", LOANS_SERVICES),
+    ("I want to apply for a personal loan of $50,000", LOANS_SERVICES),
+    ("Request new cheque book", LOANS_SERVICES),
+    ("I'd like a new credit card", LOANS_SERVICES),
+    ("can I get a mortgage for a house", LOANS_SERVICES),
+    ("need an auto loan for 20000", LOANS_SERVICES),
+    ("please send me a checkbook", LOANS_SERVICES),
+    ("I need to borrow 3000 dollars", LOANS_SERVICES),
+    ("upgrade to a gold card", LOANS_SERVICES),
+    ("submit a service request for a debit card", LOANS_SERVICES),
+    ("What are the branch hours?", CUSTOMER_SUPPORT),
+    ("What are your branch opening hours?", CUSTOMER_SUPPORT),
+    ("How do I reset my password?", CUSTOMER_SUPPORT),
+    ("what's the customer care number", CUSTOMER_SUPPORT),
+    ("is there an ATM near me that is open now", CUSTOMER_SUPPORT),
+    ("which documents are needed to open an account", CUSTOMER_SUPPORT),
+    ("my card was stolen, how do I block it", CUSTOMER_SUPPORT),
+    ("are you open on sundays", CUSTOMER_SUPPORT),
+    ("hi", CUSTOMER_SUPPORT),
+    ("thank you!", CUSTOMER_SUPPORT),
+    ("how can I contact you", CUSTOMER_SUPPORT),
+    ("where can I find a branch", CUSTOMER_SUPPORT),
+    # Mostly words the training examples don't contain; a confident local guess
+    # here would come from stop words alone, so these should reach the LLM
+    ("update my address", CUSTOMER_SUPPORT),
+    ("change my email address", CUSTOMER_SUPPORT),
+    ("i want to close my account", CUSTOMER_SUPPORT),
+    ("my app keeps crashing", CUSTOMER_SUPPORT),
+]
+
+
+def evaluate(name, classify, repeat):
+    decided = correct = 0
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for text, _ in EVAL_SET:
+            classify(text)
+    per_call_us = (time.perf_counter() - start) / (repeat * len(EVAL_SET)) * 1e6
+
+    for text, expected in EVAL_SET:
+        label = classify(text)
+        if label is None:
+            continue
+        decided += 1
+        correct += label == expected
+
+    coverage = decided / len(EVAL_SET)
+    accuracy = correct / decided if decided else 0.0
+    print(f"{name:<12} {coverage:>9.0%} {accuracy:>9.0%} {per_call_us:>12.1f}")
+
+
+def thresholded(classifier, threshold):
+    def classify(text):
+        result = classifier.classify(text)
+        if result and result[1] >= threshold:
+            return result[0]
+        return None
+    return classify
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--threshold", type=float, default=0.8)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    rules, tfidf = RuleClassifier(), TfidfClassifier()
+    print(f"Model build time: {(time.perf_counter() - start) * 1000:.1f} ms, eval set: {len(EVAL_SET)} messages\n")
+
+    def fast_path(text):
+        for classifier in (rules, tfidf):
+            label = thresholded(classifier, args.threshold)(text)
+            if label:
+                return label
+        return None
+
+    print(f"{'tier':<12} {'coverage':>9} {'accuracy':>9} {'us/message':>12}")
+    evaluate("rules", thresholded(rules, args.threshold), args.repeat)
+    evaluate("tfidf", thresholded(tfidf, args.threshold), args.repeat)
+    evaluate("tfidf@any", thresholded(tfidf, 0.0), args.repeat)
+    evaluate("fast path", fast_path, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
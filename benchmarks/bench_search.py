@@ -0,0 +1,71 @@
+"""
+Transaction description search: ILIKE '%term%' vs the full-text index.
+
+Loads a synthetic SQLite database with benchmarks/datagen.py (a weighted
+merchant catalogue plus a long tail, so search terms range from common to
+rare), then times the dashboard query (newest 100 matches bank-wide) and the
+agent query (newest 20 matches for one account) for each term: ILIKE, the FTS index, and for the account query the word-prefix filter
+that backend/search.py uses for account-scoped searches.
+
+Run:  python -m benchmarks.bench_search --rows 1000000
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from backend.database import create_db_engine
+from backend.models import Transaction
+from backend.search import search_condition
+from .datagen import generate
+
+TERMS = ["coffee", "uber", "whole foods", "netflix subscription", "walg", "refund", "cafe"]
+
+
+def time_query(db, statement, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        rows = db.execute(statement).all()
+    return (time.perf_counter() - start) * 1000 / iterations, len(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--tx-per-account", type=int, default=200)
+    parser.add_argument("--iterations", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_db_engine(f"sqlite:///{os.path.join(tmp, 'search.db')}")
+        start = time.perf_counter()
+        accounts = generate(engine, max(1, args.rows // args.tx_per_account), args.rows)["accounts"]
+        print(f"Loaded and indexed {args.rows:,} transactions in {time.perf_counter() - start:.1f}s\n")
+
+        newest = (Transaction.timestamp.desc(), Transaction.id.desc())
+        columns = (Transaction.id, Transaction.description, Transaction.amount, Transaction.timestamp)
+        print(f"{'term':<22} {'matches':>8} {'bank ILIKE ms':>14} {'bank FTS ms':>12} "
+              f"{'acct ILIKE ms':>14} {'acct FTS ms':>12} {'acct prefix ms':>15}")
+        with Session(engine) as db:
+            for term in TERMS:
+                like = Transaction.description.ilike(f"%{term}%")
+                fts = search_condition(db, term)
+                scoped = search_condition(db, term, account_scoped=True)
+                matches = db.query(Transaction.id).filter(fts).count()
+                account = (Transaction.account_id == accounts // 2)
+                timings = [
+                    time_query(db, select(*columns).where(like).order_by(*newest).limit(100), args.iterations)[0],
+                    time_query(db, select(*columns).where(fts).order_by(*newest).limit(100), args.iterations)[0],
+                    time_query(db, select(*columns).where(account, like).order_by(*newest).limit(20), args.iterations)[0],
+                    time_query(db, select(*columns).where(account, fts).order_by(*newest).limit(20), args.iterations)[0],
+                    time_query(db, select(*columns).where(account, scoped).order_by(*newest).limit(20), args.iterations)[0],
+                ]
+                print(f"{term:<22} {matches:>8} " + " ".join(f"{t:>{w}.2f}" for t, w in zip(timings, (14, 12, 14, 12, 15))))
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
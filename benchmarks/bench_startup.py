@@ -0,0 +1,107 @@
+"""
+Backend cold start: import cost and time to first response.
+
+1. Runs `python -X importtime -c "import backend.main"` several times and
+   reports the median total and the heaviest top-level packages.
+2. Starts the backend (uvicorn, fresh scratch database, stub LLM) several times
+   and reports, from process spawn: when GET /stats first answers (ready),
+   and when the first /chat answer and a second one come back. The first chat
+   includes anything deferred to first use (e.g. the LLM client).
+
+Run:  python -m benchmarks.bench_startup --runs 5
+"""
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+from .common import PROJECT_ROOT, free_port, start_backend, start_stub_llm
+
+IMPORTTIME_RE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)")
+
+
+def import_profile(workdir):
+    env = dict(os.environ, PYTHONPATH=PROJECT_ROOT, GROQ_API_KEY="stub",
+               DATABASE_URL="sqlite:///" + os.path.join(workdir, "app.db"))
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", "import backend.main"],
+                            env=env, cwd=workdir, capture_output=True, text=True, check=True)
+    total, packages = 0, {}
+    for self_us, cumulative_us, indent, name in IMPORTTIME_RE.findall(result.stderr):
+        if name == "backend.main":
+            total = int(cumulative_us)
+        # A package's own entry covers everything it imports
+        root = name.split(".")[0]
+        if name == root and not name.startswith("backend"):
+            packages[root] = max(packages.get(root, 0), int(cumulative_us))
+    return total / 1e6, packages
+
+
+def wait_until(request, deadline=60.0):
+    start = time.perf_counter()
+    while time.perf_counter() - start < deadline:
+        try:
+            response = request()
+            if response.status_code == 200:
+                return response
+        except httpx.TransportError:
+            pass
+        time.sleep(0.005)
+    raise RuntimeError("backend did not answer")
+
+
+def first_responses(llm_port):
+    api_port = free_port()
+    base = f"http://127.0.0.1:{api_port}"
+    with tempfile.TemporaryDirectory(prefix="bench_startup_") as workdir:
+        start = time.perf_counter()
+        backend = start_backend(api_port, llm_port, cwd=workdir, wait=False)
+        try:
+            with httpx.Client(timeout=30) as client:
+                wait_until(lambda: client.get(f"{base}/stats"))
+                ready = time.perf_counter() - start
+                client.post(f"{base}/chat", json={"message": "What is my balance?"}).raise_for_status()
+                first_chat = time.perf_counter() - start
+                chat_start = time.perf_counter()
+                client.post(f"{base}/chat", json={"message": "What is my balance?"}).raise_for_status()
+                second_chat = time.perf_counter() - chat_start
+        finally:
+            backend.terminate()
+            backend.wait()
+    return ready, first_chat, second_chat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10, help="Heaviest packages to list")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="bench_startup_") as workdir:
+        profiles = [import_profile(workdir) for _ in range(args.runs)]
+    totals = [total for total, _ in profiles]
+    print(f"import backend.main: median {statistics.median(totals) * 1000:.0f} ms "
+          f"(min {min(totals) * 1000:.0f}, max {max(totals) * 1000:.0f}) over {args.runs} runs")
+    _, packages = profiles[-1]
+    for name, cumulative_us in sorted(packages.items(), key=lambda item: -item[1])[:args.top]:
+        print(f"  {name:<24} {cumulative_us / 1000:>8.1f} ms")
+
+    llm_port = free_port()
+    stub = start_stub_llm(llm_port, 0.0)
+    try:
+        runs = [first_responses(llm_port) for _ in range(args.runs)]
+    finally:
+        stub.terminate()
+        stub.wait()
+    print(f"\nfrom spawn, median of {args.runs} (stub LLM, no latency):")
+    for label, values in zip(("ready (GET /stats)", "first /chat answered", "second /chat (warm)"), zip(*runs)):
+        print(f"  {label:<24} {statistics.median(values) * 1000:>8.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Hot-path query latency with and without the transaction/account indexes.
+
+Builds a synthetic SQLite database with benchmarks/datagen.py (default 1M
+transactions; use --rows 10000000 for the 10M case), then times the queries behind get_balance and
+get_recent_transactions for random users, first with the indexes from
+backend/models.py and then with them dropped.
+
+Run:  python -m benchmarks.bench_transactions_index --rows 1000000
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from sqlalchemy import create_engine, select, text
+
+from backend.models import Account, Transaction
+from .datagen import generate
+
+INDEXES = ["ix_accounts_user_id", "ix_transactions_account_id_timestamp"]
+
+
+def time_queries(engine, users, iterations, seed=1):
+    rng = random.Random(seed)
+    account_ms, recent_ms = [], []
+    with engine.connect() as conn:
+        for _ in range(iterations):
+            user_id = rng.randint(1, users)
+            start = time.perf_counter()
+            account_id = conn.execute(select(Account.id).where(Account.user_id == user_id).limit(1)).scalar()
+            account_ms.append((time.perf_counter() - start) * 1000)
+
+            start = time.perf_counter()
+            conn.execute(
+                select(Transaction).where(Transaction.account_id == account_id)
+                .order_by(Transaction.timestamp.desc()).limit(10)
+            ).all()
+            recent_ms.append((time.perf_counter() - start) * 1000)
+    return sum(account_ms) / iterations, sum(recent_ms) / iterations
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--tx-per-account", type=int, default=200)
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--unindexed-iterations", type=int, default=10)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+
+        start = time.perf_counter()
+        users = max(1, args.rows // args.tx_per_account)
+        loaded = generate(engine, users, args.rows)
+        print(f"Loaded {args.rows:,} transactions / {loaded['accounts']:,} accounts in {time.perf_counter() - start:.1f}s\n")
+
+        account, recent = time_queries(engine, users, args.iterations)
+        print(f"{'':<10} {'account by user ms':>19} {'recent txns ms':>15}")
+        print(f"{'indexed':<10} {account:>19.3f} {recent:>15.3f}")
+
+        with engine.begin() as conn:
+            for name in INDEXES:
+                conn.execute(text(f"DROP INDEX {name}"))
+        account, recent = time_queries(engine, users, args.unindexed_iterations)
+        print(f"{'no index':<10} {account:>19.3f} {recent:>15.3f}")
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""
+Throughput scaling with worker processes.
+
+For each worker count, starts a fresh backend through serve.py (one-time init,
+then N uvicorn workers sharing sessions and FAQ answers through the database)
+against the stub LLM, and drives it for a fixed time with concurrent scripted
+conversations spread over several client processes. Each conversation keeps its
+session_id, so consecutive turns land on different workers.
+
+The backend is CPU bound once the LLM is stubbed, so requests/sec should grow
+close to linearly with workers up to the number of cores; worker counts above
+os.cpu_count() are reported but cannot scale.
+
+Run:  python -m benchmarks.bench_workers --workers 1,2,4 --duration 15
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import tempfile
+import time
+
+import httpx
+
+from .common import free_port, percentile, start_backend, start_stub_llm
+
+CONVERSATION = [
+    "What is my balance?",
+    "What are the branch hours?",
+    "Show my recent transactions",
+    "How do I reset my password?",
+    "I want to apply for a loan",
+]
+
+
+async def drive(url, conversations, duration):
+    latencies, errors = [], 0
+    deadline = time.perf_counter() + duration
+
+    async def conversation(offset, client):
+        nonlocal errors
+        session_id, turn = None, offset
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            try:
+                response = await client.post(url, json={"message": CONVERSATION[turn % len(CONVERSATION)], "session_id": session_id})
+                body = response.json() if response.status_code == 200 else {}
+            except httpx.HTTPError:
+                body = {}
+            if not body or body.get("response", "").startswith("Error"):
+                errors += 1
+            else:
+                latencies.append(time.perf_counter() - start)
+                session_id = body.get("session_id")
+            turn += 1
+
+    limits = httpx.Limits(max_connections=conversations)
+    async with httpx.AsyncClient(timeout=60, limits=limits) as client:
+        await asyncio.gather(*(conversation(c, client) for c in range(conversations)))
+    return latencies, errors
+
+
+def client_process(args):
+    return asyncio.run(drive(*args))
+
+
+def warm_up(url, requests):
+    # The listening socket is bound before the workers finish importing
+    deadline = time.time() + 60
+    with httpx.Client(timeout=60) as client:
+        done = 0
+        while done < requests:
+            try:
+                client.post(url, json={"message": CONVERSATION[done % len(CONVERSATION)]}).raise_for_status()
+                done += 1
+            except httpx.HTTPError:
+                if time.time() > deadline:
+                    raise
+                time.sleep(0.2)
+
+
+def run_level(workers, llm_port, concurrency, clients, duration):
+    api_port = free_port()
+    with tempfile.TemporaryDirectory(prefix="bench_workers_") as workdir:
+        backend = start_backend(api_port, llm_port, cwd=workdir, workers=workers)
+        try:
+            url = f"http://127.0.0.1:{api_port}/chat"
+            warm_up(url, 10 * workers)
+            per_client = [concurrency // clients + (1 if c < concurrency % clients else 0) for c in range(clients)]
+            start = time.perf_counter()
+            with multiprocessing.Pool(clients) as pool:
+                results = pool.map(client_process, [(url, n, duration) for n in per_client if n])
+            elapsed = time.perf_counter() - start
+        finally:
+            backend.terminate()
+            backend.wait()
+
+    latencies = [l for result in results for l in result[0]]
+    return {
+        "workers": workers,
+        "requests": len(latencies),
+        "errors": sum(result[1] for result in results),
+        "rps": len(latencies) / elapsed,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", default="1,2,4", help="Comma separated worker counts")
+    parser.add_argument("--latency", type=float, default=0.02, help="Stub LLM latency per call (seconds)")
+    parser.add_argument("--concurrency", type=int, default=64, help="Concurrent conversations")
+    parser.add_argument("--clients", type=int, default=4, help="Load generator processes")
+    parser.add_argument("--duration", type=float, default=15.0, help="Seconds per worker count")
+    args = parser.parse_args()
+
+    llm_port = free_port()
+    stub = start_stub_llm(llm_port, args.latency)
+    print(f"{os.cpu_count()} CPUs; stub LLM latency {args.latency * 1000:.0f} ms; "
+          f"{args.concurrency} conversations from {args.clients} client processes\n", flush=True)
+    print(f"{'workers':>7} {'requests':>8} {'errors':>6} {'req/s':>8} {'speedup':>7} {'p50 ms':>8} {'p95 ms':>8}", flush=True)
+    try:
+        baseline = None
+        for workers in [int(x) for x in args.workers.split(",")]:
+            r = run_level(workers, llm_port, args.concurrency, args.clients, args.duration)
+            baseline = baseline or r["rps"]
+            note = "  (more workers than CPUs)" if workers > (os.cpu_count() or 1) else ""
+            print(f"{r['workers']:>7} {r['requests']:>8} {r['errors']:>6} {r['rps']:>8.1f} "
+                  f"{r['rps'] / baseline:>6.2f}x {r['p50_ms']:>8.0f} {r['p95_ms']:>8.0f}{note}", flush=True)
+    finally:
+        stub.terminate()
+        stub.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+import os
+import shlex
+import socket
+import subprocess
+import sys
+import time
+
+from backend.metrics import percentile  # noqa: F401 (re-exported for the benchmarks)
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def wait_for_port(port, timeout=20.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.5):
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f"Nothing listening on port {port} after {timeout}s")
+
+
+def start_python(args, env=None, cwd=None):
+    """Start `python <args>` with the project root importable."""
+    full_env = dict(os.environ)
+    full_env["PYTHONPATH"] = PROJECT_ROOT + os.pathsep + full_env.get("PYTHONPATH", "")
+    full_env.update(env or {})
+    return subprocess.Popen([sys.executable] + list(args), env=full_env, cwd=cwd or PROJECT_ROOT)
+
+
+def start_stub_llm(port, latency, extra_args=()):
+    # STUB_LLM_ARGS applies to every benchmark, e.g. "--mode replay --cassette chat.jsonl"
+    # or "--latency-sigma 0.5 --token-rate 250"; later flags override --latency
+    extra_args = [*extra_args, *shlex.split(os.getenv("STUB_LLM_ARGS", ""))]
+    proc = start_python(["-m", "benchmarks.stub_llm", "--port", str(port), "--latency", str(latency), *extra_args])
+    wait_for_port(port)
+    return proc
+
+
+def start_backend(port, llm_port, cwd, env=None, workers=None, wait=True):
+    # Each backend gets its own database (and submission journal) in its scratch directory.
+    # workers runs it through serve.py (one-time init, then that many processes).
+    # wait=False returns as soon as the process is spawned (startup timing).
+    backend_env = {
+        "LLM_PROVIDER": "stub",
+        "STUB_LLM_URL": f"http://127.0.0.1:{llm_port}",
+        "DATABASE_URL": "sqlite:///" + os.path.join(cwd, "app.db"),
+        "SUBMISSION_JOURNAL_PATH": os.path.join(cwd, "submissions.journal.db"),
+        "INIT_LOCK_PATH": os.path.join(cwd, "app.init.lock"),
+    }
+    backend_env.update(env or {})
+    if workers:
+        backend_env.setdefault("METRICS_DIR", os.path.join(cwd, "metrics"))
+        args = [os.path.join(PROJECT_ROOT, "serve.py"), "--workers", str(workers), "--host", "127.0.0.1"]
+    else:
+        args = ["-m", "uvicorn", "backend.main:app"]
+    proc = start_python(args + ["--port", str(port), "--log-level", "warning"], env=backend_env, cwd=cwd)
+    if wait:
+        wait_for_port(port)
+    return proc
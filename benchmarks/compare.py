@@ -0,0 +1,74 @@
+"""
+Compares two benchmarks/suite.py results and flags regressions.
+
+Latencies (*_ms) regress when the new value is more than --threshold percent
+higher and at least --min-ms higher (sub-millisecond noise is ignored);
+throughput (rps) regresses when it drops by more than --threshold percent;
+any new errors are a regression. Metrics present in only one file are listed
+but not judged. Exits 1 if anything regressed.
+
+Run:  python -m benchmarks.compare benchmarks/results/abc123.json benchmarks/results/def456.json
+"""
+import argparse
+import json
+import sys
+
+
+def metrics(report):
+    """Flattens a report into {path: value} for the numbers worth comparing."""
+    flat = {}
+    for route, r in report.get("chat", {}).get("routes", {}).items():
+        for key in ("rps", "errors", "p50_ms", "p95_ms", "p99_ms"):
+            flat[f"chat/{route}/{key}"] = r[key]
+    for size, result in report.get("db", {}).get("sizes", {}).items():
+        for path, r in result["paths"].items():
+            for key in ("p50_ms", "p95_ms", "p99_ms"):
+                flat[f"db/{size}/{path}/{key}"] = r[key]
+    return flat
+
+
+def judge(key, old, new, threshold, min_ms):
+    if key.endswith("/errors"):
+        return new > old
+    if key.endswith("/rps"):
+        return new < old * (1 - threshold)
+    return new > old * (1 + threshold) and new - old >= min_ms
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    parser.add_argument("--threshold", type=float, default=10.0, help="Allowed change in percent")
+    parser.add_argument("--min-ms", type=float, default=0.5, help="Ignore latency increases smaller than this")
+    parser.add_argument("--all", action="store_true", help="List unchanged metrics too")
+    args = parser.parse_args()
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.candidate) as f:
+        candidate = json.load(f)
+    old, new = metrics(baseline), metrics(candidate)
+    print(f"baseline  {baseline['environment'].get('commit')}  ({baseline['environment'].get('timestamp')})")
+    print(f"candidate {candidate['environment'].get('commit')}  ({candidate['environment'].get('timestamp')})")
+    if baseline["environment"].get("platform") != candidate["environment"].get("platform"):
+        print("warning: the runs come from different machines")
+
+    regressions = 0
+    print(f"\n{'metric':<60} {'baseline':>10} {'candidate':>10} {'change':>8}")
+    for key in sorted(old.keys() | new.keys()):
+        if key not in old or key not in new:
+            print(f"{key:<60} {old.get(key, '-'):>10} {new.get(key, '-'):>10} {'only one':>8}")
+            continue
+        change = (new[key] - old[key]) / old[key] * 100 if old[key] else 0.0
+        regressed = judge(key, old[key], new[key], args.threshold / 100, args.min_ms)
+        regressions += regressed
+        if regressed or args.all or abs(change) > args.threshold:
+            print(f"{key:<60} {old[key]:>10} {new[key]:>10} {change:>+7.1f}%" + ("  REGRESSION" if regressed else ""))
+
+    print(f"\n{regressions} regression(s) beyond {args.threshold:.0f}%")
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,268 @@
+"""
+Synthetic data generator / bulk loader for load testing.
+
+Creates users, accounts, transactions and service requests with skewed,
+roughly realistic distributions: 1-2 accounts per user, per-account activity
+following a Pareto curve, a weighted merchant catalogue plus a long tail of
+rare merchants, log-normal amounts per merchant, and a few pending/failed
+transactions. Rows are generated as tuples with explicit primary keys (appended
+after any existing rows) and streamed in chunks: straight to the driver's
+executemany on SQLite, through SQLAlchemy Core executemany elsewhere. No ORM
+objects are involved; on PostgreSQL the ID sequences are moved past the loaded
+rows afterwards.
+
+During the load the transaction index and the search index triggers are
+dropped; afterwards they are recreated, and the search index and the daily
+rollups are rebuilt in one pass each.
+
+Run:  python -m benchmarks.datagen --url sqlite:///load.db --users 50000 --transactions 10000000
+"""
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, select, text
+
+from backend.config import DATABASE_URL
+from backend.database import create_db_engine
+from backend.migrations import upgrade
+from backend.models import Account, ServiceRequest, Transaction, User
+from backend.rollups import rebuild_rollups
+from backend.search import rebuild_search_index, suspend_search_index
+from backend.submissions import allocate_ids
+
+# (description, type, median amount, log-normal sigma, relative frequency)
+MERCHANTS = [
+    ("Starbucks Coffee", "Debit", 6.0, 0.4, 10),
+    ("Blue Bottle Coffee", "Debit", 6.5, 0.4, 3),
+    ("Uber Ride", "Debit", 18.0, 0.6, 6),
+    ("Lyft Ride", "Debit", 16.0, 0.6, 3),
+    ("Whole Foods Groceries", "Debit", 80.0, 0.7, 5),
+    ("Trader Joes Groceries", "Debit", 60.0, 0.6, 4),
+    ("Walmart Store", "Debit", 55.0, 0.9, 6),
+    ("Target Store", "Debit", 45.0, 0.9, 5),
+    ("Costco Store", "Debit", 150.0, 0.7, 2),
+    ("Amazon Online", "Debit", 40.0, 1.0, 8),
+    ("Netflix Subscription", "Debit", 15.49, 0.0, 1),
+    ("Spotify Subscription", "Debit", 10.99, 0.0, 1),
+    ("Shell Fuel", "Debit", 45.0, 0.4, 4),
+    ("Chevron Fuel", "Debit", 48.0, 0.4, 3),
+    ("CVS Pharmacy", "Debit", 25.0, 0.8, 2),
+    ("Walgreens Pharmacy", "Debit", 22.0, 0.8, 2),
+    ("Delta Travel", "Debit", 350.0, 0.5, 0.5),
+    ("Airbnb Travel", "Debit", 400.0, 0.6, 0.5),
+    ("Rent Payment", "Debit", 1500.0, 0.3, 0.4),
+    ("Utility Bill", "Debit", 120.0, 0.4, 1),
+    ("Salary Deposit", "Credit", 3000.0, 0.4, 2),
+    ("Freelance Payment", "Credit", 600.0, 0.8, 0.7),
+    ("Amazon Refund", "Credit", 35.0, 1.0, 0.5),
+    ("Transfer In", "Credit", 200.0, 1.0, 0.8),
+]
+TAIL_KINDS = ["Cafe", "Restaurant", "Store", "Online", "Services", "Market"]
+STATUSES = (["Success", "Pending", "Failed"], [0.98, 0.015, 0.005])
+SERVICE_TYPES = (["Loan - Personal", "Loan - Home", "Credit Card", "Debit Card", "Checkbook"], [3, 1, 3, 2, 2])
+SERVICE_STATUSES = (["Requested", "Under Review", "Approved", "Rejected"], [2, 2, 5, 1])
+
+
+def merchant_catalogue(tail, rng):
+    # The long tail shares 10% of the volume, so search terms range from common to rare
+    catalogue = list(MERCHANTS)
+    head_weight = sum(m[4] for m in MERCHANTS)
+    for _ in range(tail):
+        kind = rng.choice(TAIL_KINDS)
+        catalogue.append((f"Merchant{rng.randint(1000, 999999)} {kind}", "Debit", 30.0, 0.8, head_weight * 0.1 / tail))
+    return catalogue
+
+
+def cumulative(weights):
+    total, out = 0.0, []
+    for w in weights:
+        total += w
+        out.append(total)
+    return out
+
+
+def next_id(conn, column):
+    return (conn.execute(select(func.max(column))).scalar() or 0) + 1
+
+
+def insert_chunks(conn, table, columns, rows, chunk):
+    if conn.dialect.name == "sqlite":
+        # Skips per-row bind processing; rows must already hold SQLite-ready values
+        sql = f"INSERT INTO {table.name} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})"
+        execute = lambda batch: conn.exec_driver_sql(sql, batch)
+    else:
+        execute = lambda batch: conn.execute(table.insert(), [dict(zip(columns, row)) for row in batch])
+
+    batch, count = [], 0
+    for row in rows:
+        batch.append(row)
+        if len(batch) == chunk:
+            execute(batch)
+            conn.commit()
+            count += len(batch)
+            batch = []
+    if batch:
+        execute(batch)
+        conn.commit()
+        count += len(batch)
+    return count
+
+
+def generate(engine, users, transactions, service_requests=None, days=365, tail_merchants=500,
+             chunk=50_000, seed=0, progress=None):
+    """Appends synthetic data and rebuilds the derived indexes. Returns counts and the new id ranges."""
+    rng = random.Random(seed)
+    service_requests = users // 10 if service_requests is None else service_requests
+    catalogue = merchant_catalogue(tail_merchants, rng)
+    report = progress or (lambda message: None)
+
+    upgrade(engine)
+    suspend_search_index(engine)
+    tx_index = next(ix for ix in Transaction.__table__.indexes if ix.name == "ix_transactions_account_id_timestamp")
+    tx_index.drop(bind=engine, checkfirst=True)
+
+    now = datetime.utcnow()
+    span = days * 86400
+    # SQLAlchemy stores SQLite datetimes as text with microseconds
+    stamp = (lambda dt: dt.isoformat(" ", "microseconds")) if engine.dialect.name == "sqlite" else (lambda dt: dt)
+    # Reserved like any other writer's, so they can't collide with queued loan/service submissions
+    first_request = allocate_ids(engine, service_requests).start
+    with engine.connect() as conn:
+        if engine.dialect.name == "sqlite":
+            # Durability is irrelevant for a throwaway load; the file is consistent once it finishes
+            conn.exec_driver_sql("PRAGMA synchronous=OFF")
+        first_user, first_account = next_id(conn, User.id), next_id(conn, Account.id)
+        first_tx = next_id(conn, Transaction.id)
+
+        user_ids = range(first_user, first_user + users)
+        insert_chunks(conn, User.__table__, ("id", "name", "email"), (
+            (i, f"Customer {i}", f"customer{i}@example.com") for i in user_ids
+        ), chunk)
+
+        # Everyone has a savings account; a third also have a current account
+        accounts = []
+        for user_id in user_ids:
+            accounts.append((user_id, "Savings"))
+            if rng.random() < 0.33:
+                accounts.append((user_id, "Current"))
+        account_ids = range(first_account, first_account + len(accounts))
+        insert_chunks(conn, Account.__table__, ("id", "user_id", "account_type", "balance"), (
+            (account_id, user_id, kind, round(rng.lognormvariate(8, 1.2), 2))
+            for account_id, (user_id, kind) in zip(account_ids, accounts)
+        ), chunk)
+        report(f"{users:,} users, {len(accounts):,} accounts")
+
+        # A few accounts do most of the transacting
+        account_weights = cumulative(rng.paretovariate(1.2) for _ in account_ids)
+        merchant_weights = cumulative(m[4] for m in catalogue)
+        status_weights = cumulative(STATUSES[1])
+
+        def transaction_rows():
+            tx_id = first_tx
+            remaining = transactions
+            while remaining:
+                n = min(chunk, remaining)
+                picked_accounts = rng.choices(account_ids, cum_weights=account_weights, k=n)
+                picked_merchants = rng.choices(catalogue, cum_weights=merchant_weights, k=n)
+                picked_statuses = rng.choices(STATUSES[0], cum_weights=status_weights, k=n)
+                for account_id, (description, kind, median, sigma, _), status in zip(picked_accounts, picked_merchants, picked_statuses):
+                    yield (
+                        tx_id,
+                        account_id,
+                        kind,
+                        round(median * rng.lognormvariate(0, sigma), 2) if sigma else median,
+                        stamp(now - timedelta(seconds=rng.random() * span)),
+                        status,
+                        description,
+                    )
+                    tx_id += 1
+                remaining -= n
+                report(f"{transactions - remaining:,} / {transactions:,} transactions")
+
+        start = time.perf_counter()
+        insert_chunks(conn, Transaction.__table__,
+                      ("id", "account_id", "transaction_type", "amount", "timestamp", "status", "description"),
+                      transaction_rows(), chunk)
+        load_seconds = time.perf_counter() - start
+
+        request_users = [rng.choice(user_ids) for _ in range(service_requests)] if users else []
+        insert_chunks(conn, ServiceRequest.__table__, ("id", "user_id", "service_type", "details", "status", "timestamp"), (
+            (
+                first_request + n,
+                user_id,
+                rng.choices(*SERVICE_TYPES)[0],
+                "Submitted via load generator",
+                rng.choices(*SERVICE_STATUSES)[0],
+                stamp(now - timedelta(seconds=rng.random() * span)),
+            )
+            for n, user_id in enumerate(request_users)
+        ), chunk)
+
+    if engine.dialect.name == "postgresql":
+        # Explicit IDs don't move the serial sequences; the next ORM insert would reuse them
+        with engine.begin() as conn:
+            for table in (User.__table__, Account.__table__, Transaction.__table__, ServiceRequest.__table__):
+                conn.execute(text(
+                    f"SELECT setval(pg_get_serial_sequence('{table.name}', 'id'), "
+                    f"(SELECT COALESCE(MAX(id), 0) + 1 FROM {table.name}), false)"
+                ))
+
+    start = time.perf_counter()
+    report("recreating indexes")
+    upgrade(engine)
+    if engine.dialect.name == "sqlite":
+        report("rebuilding search index")
+        rebuild_search_index(engine)
+    report("rebuilding daily rollups")
+    rebuild_rollups(engine)
+    with engine.begin() as conn:
+        conn.execute(text("ANALYZE"))
+    index_seconds = time.perf_counter() - start
+
+    return {
+        "users": users,
+        "accounts": len(accounts),
+        "transactions": transactions,
+        "service_requests": service_requests,
+        "first_user_id": first_user,
+        "first_account_id": first_account,
+        "load_seconds": load_seconds,
+        "index_seconds": index_seconds,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default=DATABASE_URL, help="Target database (default: DATABASE_URL)")
+    parser.add_argument("--users", type=int, default=50_000)
+    parser.add_argument("--transactions", type=int, default=1_000_000)
+    parser.add_argument("--service-requests", type=int, help="Default: one per ten users")
+    parser.add_argument("--days", type=int, default=365, help="Spread transactions over this many days")
+    parser.add_argument("--tail-merchants", type=int, default=500)
+    parser.add_argument("--chunk", type=int, default=50_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    engine = create_db_engine(args.url)
+    print(f"Loading into {engine.url.render_as_string(hide_password=True)}")
+    last = [0.0]
+
+    def progress(message):
+        if time.perf_counter() - last[0] > 5 or not message[0].isdigit():
+            last[0] = time.perf_counter()
+            print(f"  {message}", flush=True)
+
+    start = time.perf_counter()
+    result = generate(engine, args.users, args.transactions, args.service_requests, args.days,
+                      args.tail_merchants, args.chunk, args.seed, progress=progress)
+    engine.dispose()
+    print(f"Loaded {result['transactions']:,} transactions in {result['load_seconds']:.1f}s "
+          f"({result['transactions'] / max(result['load_seconds'], 1e-9):,.0f} rows/s); "
+          f"indexes, search and rollups rebuilt in {result['index_seconds']:.1f}s; "
+          f"total {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
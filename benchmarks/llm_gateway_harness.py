@@ -0,0 +1,151 @@
+"""
+Fault-injection harness for backend/llm.py.
+
+Starts the stub LLM and drives an LLMGateway through scenarios with injected
+latency and failures, checking that retries, deadlines, the concurrency cap
+and the circuit breaker behave as configured. Exits non-zero on any failure.
+
+Run:  python -m benchmarks.llm_gateway_harness
+"""
+import asyncio
+import sys
+import time
+
+import httpx
+
+from backend.llm import CircuitBreaker, CircuitOpenError, LLMGateway
+from .common import free_port, start_stub_llm
+
+MESSAGES = [{"role": "user", "content": "hello"}]
+
+
+def make_gateway(port, **kwargs):
+    options = dict(api_key="stub", base_url=f"http://127.0.0.1:{port}", max_concurrency=4, timeout=1.0,
+                   deadline=5.0, max_retries=3, backoff_base=0.02, backoff_max=0.1)
+    options.update(kwargs)
+    return LLMGateway(**options)
+
+
+async def set_faults(port, **faults):
+    async with httpx.AsyncClient() as client:
+        await client.post(f"http://127.0.0.1:{port}/_faults", json=faults)
+
+
+async def upstream_stats(port):
+    async with httpx.AsyncClient() as client:
+        return (await client.get(f"http://127.0.0.1:{port}/_stats")).json()
+
+
+async def attempt(gateway):
+    try:
+        await gateway.chat(model="stub", messages=MESSAGES)
+        return "ok"
+    except CircuitOpenError:
+        return "open"
+    except Exception as e:
+        return type(e).__name__
+
+
+async def scenario_retries_recover(port):
+    await set_faults(port, latency=0.01, fail_rate=0.5, fail_status=429)
+    gateway = make_gateway(port, max_retries=8, breaker=CircuitBreaker(failure_threshold=100))
+    results = await asyncio.gather(*(attempt(gateway) for _ in range(20)))
+    ok = results.count("ok")
+    return ok == 20, f"{ok}/20 succeeded with 50% 429s, {gateway.counters['retries']} retries"
+
+
+async def scenario_timeout_deadline(port):
+    await set_faults(port, latency=2.0, fail_rate=0.0)
+    gateway = make_gateway(port, timeout=0.3, deadline=1.0)
+    start = time.perf_counter()
+    result = await attempt(gateway)
+    elapsed = time.perf_counter() - start
+    return result != "ok" and elapsed < 1.5, f"slow upstream -> {result} after {elapsed:.2f}s (deadline 1.0s)"
+
+
+async def scenario_concurrency_cap(port):
+    await set_faults(port, latency=0.2, fail_rate=0.0)
+    gateway = make_gateway(port, max_concurrency=4)
+    await asyncio.gather(*(attempt(gateway) for _ in range(20)))
+    peak = (await upstream_stats(port))["max_in_flight"]
+    return peak <= 4, f"20 concurrent calls, peak upstream in-flight = {peak} (cap 4)"
+
+
+async def scenario_circuit_breaker(port):
+    await set_faults(port, latency=0.0, fail_rate=1.0, fail_status=503)
+    gateway = make_gateway(port, max_retries=0, breaker=CircuitBreaker(failure_threshold=3, reset_seconds=0.5))
+    first = [await attempt(gateway) for _ in range(5)]
+    sent = (await upstream_stats(port))["requests"]
+    opened = first[-1] == "open" and sent == 3
+
+    # Upstream recovers: after the reset window a half-open trial closes the circuit
+    await set_faults(port, fail_rate=0.0)
+    await asyncio.sleep(0.6)
+    recovered = await attempt(gateway)
+    return opened and recovered == "ok" and gateway.breaker.state == "closed", \
+        f"outage -> {first}, upstream saw {sent} requests; after reset -> {recovered}"
+
+
+async def open_circuit(port):
+    await set_faults(port, latency=0.0, fail_rate=1.0, fail_status=503)
+    gateway = make_gateway(port, max_retries=0, breaker=CircuitBreaker(failure_threshold=2, reset_seconds=0.3))
+    for _ in range(2):
+        await attempt(gateway)
+    await asyncio.sleep(0.35)
+    return gateway
+
+
+async def scenario_cancelled_trial(port):
+    gateway = await open_circuit(port)
+    # The half-open trial is abandoned mid-flight, as on a client disconnect
+    await set_faults(port, latency=1.0, fail_rate=0.0)
+    trial = asyncio.create_task(attempt(gateway))
+    await asyncio.sleep(0.1)
+    trial.cancel()
+    await asyncio.gather(trial, return_exceptions=True)
+    await set_faults(port, latency=0.0)
+    after = await attempt(gateway)
+    return after == "ok" and gateway.breaker.state == "closed", \
+        f"next call after a cancelled trial -> {after}, circuit {gateway.breaker.state}"
+
+
+async def scenario_caller_error_trial(port):
+    gateway = await open_circuit(port)
+    await set_faults(port, fail_rate=1.0, fail_status=400)
+    trial = await attempt(gateway)
+    state = gateway.breaker.state
+    await set_faults(port, fail_rate=0.0)
+    after = await attempt(gateway)
+    return state == "half_open" and after == "ok" and gateway.breaker.state == "closed", \
+        f"400 during the trial -> {trial}, circuit stays {state}; next call -> {after}"
+
+
+async def run(port):
+    passed = True
+    for name, scenario in [
+        ("retries recover from 429s", scenario_retries_recover),
+        ("deadline bounds slow calls", scenario_timeout_deadline),
+        ("concurrency cap", scenario_concurrency_cap),
+        ("circuit breaker", scenario_circuit_breaker),
+        ("cancelled half-open trial", scenario_cancelled_trial),
+        ("caller error during trial", scenario_caller_error_trial),
+    ]:
+        ok, detail = await scenario(port)
+        passed &= ok
+        print(f"[{'PASS' if ok else 'FAIL'}] {name}: {detail}")
+    return passed
+
+
+def main():
+    port = free_port()
+    stub = start_stub_llm(port, 0.0)
+    try:
+        passed = asyncio.run(run(port))
+    finally:
+        stub.terminate()
+        stub.wait()
+    sys.exit(0 if passed else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,449 @@
+"""
+OpenAI/Groq-compatible chat completions server for offline benchmarks.
+
+Modes:
+  synth   answer from keyword rules (tool calls included), with latency and
+          token-rate distributions (lognormal around --latency/--token-rate)
+  record  forward every request to a real upstream (Groq by default) and
+          append the exchange to a JSONL cassette
+  replay  answer from a cassette, with the recorded timings scaled by
+          --replay-speed; no network needed
+
+Run:  python -m benchmarks.stub_llm --port 9100 --latency 0.2
+      python -m benchmarks.stub_llm --mode record --cassette chat.jsonl   # needs GROQ_API_KEY
+      python -m benchmarks.stub_llm --mode replay --cassette chat.jsonl
+Then start the backend with LLM_PROVIDER=stub (STUB_LLM_URL defaults to http://127.0.0.1:9100).
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import random
+import time
+import uuid
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+import httpx
+import uvicorn
+
+app = FastAPI()
+app.state.mode = "synth"
+app.state.latency = 0.0
+app.state.token_latency = 0.0
+# Synth distributions: latency (time to first token) is lognormal around
+# app.state.latency; completion tokens are generated at a lognormal rate
+# around token_rate tokens/s (0 = instantly). Sigmas of 0 make them fixed.
+app.state.latency_sigma = 0.0
+app.state.token_rate = 0.0
+app.state.token_rate_sigma = 0.0
+app.state.rng = random.Random(0)
+# Record/replay
+app.state.cassette = None
+app.state.upstream = None
+app.state.upstream_key = None
+app.state.upstream_client = None
+app.state.replay_speed = 1.0
+app.state.on_miss = "error"
+# Fault injection (used by benchmarks/llm_gateway_harness.py)
+app.state.fail_rate = 0.0
+app.state.fail_status = 503
+STAT_KEYS = ("requests", "failed", "in_flight", "max_in_flight", "prompt_tokens", "completion_tokens", "recorded", "replayed", "misses")
+app.state.stats = dict.fromkeys(STAT_KEYS, 0)
+
+# Keyword hints used to pick a tool (or a routing label) for a user message
+TOOL_KEYWORDS = {
+    "get_balance": ["balance"],
+    "get_recent_transactions": ["transaction", "spent", "spend", "coffee", "deposit"],
+    "query_transactions": ["list all"],
+    "search_transactions": ["search", "find"],
+    "aggregate_transactions": ["how much", "total"],
+    "apply_for_loan": ["loan"],
+    "request_service": ["card", "checkbook", "cheque", "service"],
+}
+ROUTE_KEYWORDS = {
+    "ACCOUNTS": ["balance", "transaction", "spent", "spend", "transfer"],
+    "LOANS_SERVICES": ["loan", "card", "checkbook", "cheque", "service"],
+}
+
+
+def _last_user_message(messages):
+    for m in reversed(messages):
+        if m.get("role") == "user":
+            return (m.get("content") or "").lower()
+    return ""
+
+
+def _pick_tools(tools, text):
+    # Every tool whose keywords appear is called, so multi-intent messages
+    # ("balance and recent transactions") produce several tool calls
+    return [
+        t["function"] for t in tools
+        if any(k in text for k in TOOL_KEYWORDS.get(t["function"]["name"], [t["function"]["name"].replace("_", " ")]))
+    ]
+
+
+def _fake_arguments(function):
+    args = {}
+    params = function.get("parameters", {})
+    for name in params.get("required", []):
+        kind = params.get("properties", {}).get(name, {}).get("type")
+        args[name] = 1000 if kind == "number" else "Personal"
+    return json.dumps(args)
+
+
+def synthesize(body):
+    messages = body.get("messages", [])
+    tools = body.get("tools") or []
+    text = _last_user_message(messages)
+    system = messages[0].get("content", "") if messages and messages[0].get("role") == "system" else ""
+
+    if "routing agent" in system:
+        label = "CUSTOMER_SUPPORT"
+        for category, keywords in ROUTE_KEYWORDS.items():
+            if any(k in text for k in keywords):
+                label = category
+                break
+        return {"role": "assistant", "content": label}
+
+    if tools and messages and messages[-1].get("role") == "user":
+        functions = _pick_tools(tools, text)
+        if functions:
+            return {
+                "role": "assistant",
+                "content": None,
+                "tool_calls": [{
+                    "id": f"call_{uuid.uuid4().hex[:8]}",
+                    "type": "function",
+                    "function": {"name": function["name"], "arguments": _fake_arguments(function)},
+                } for function in functions],
+            }
+
+    return {"role": "assistant", "content": "This is a stubbed response from the benchmark LLM."}
+
+
+def sample_latency():
+    if app.state.latency_sigma:
+        return app.state.latency * app.state.rng.lognormvariate(0, app.state.latency_sigma)
+    return app.state.latency
+
+
+def sample_token_delay(tokens):
+    # Seconds to generate `tokens` completion tokens at a sampled rate
+    if not app.state.token_rate or not tokens:
+        return 0.0
+    rate = app.state.token_rate
+    if app.state.token_rate_sigma:
+        rate *= app.state.rng.lognormvariate(0, app.state.token_rate_sigma)
+    return tokens / rate
+
+
+def request_key(body, loose=False):
+    """Cassette lookup key. The loose key ignores tool results and assistant text,
+    which change with database state (balances, reference IDs, dates)."""
+    messages = body.get("messages", [])
+    if loose:
+        material = {
+            "model": body.get("model"),
+            "tools": sorted(t["function"]["name"] for t in body.get("tools") or []),
+            "system": [m.get("content") for m in messages if m.get("role") == "system"],
+            "user": [m.get("content") for m in messages if m.get("role") == "user"],
+            "tool_results": sum(1 for m in messages if m.get("role") == "tool"),
+        }
+    else:
+        material = {k: body.get(k) for k in ("model", "messages", "tools", "tool_choice", "temperature")}
+    return hashlib.sha256(json.dumps(material, sort_keys=True, default=str).encode()).hexdigest()
+
+
+class Cassette:
+    """Recorded exchanges, one JSON object per line: keys, request, the assembled
+    assistant message, usage, and the upstream's latency/duration in seconds."""
+
+    def __init__(self, path):
+        self.path = path
+        self.entries = []
+        self._by_key = {}
+        self._by_loose_key = {}
+        self._next = {}
+        if os.path.exists(path):
+            with open(path) as f:
+                for line in f:
+                    if line.strip():
+                        self._index(json.loads(line))
+
+    def _index(self, entry):
+        self.entries.append(entry)
+        self._by_key.setdefault(entry["key"], []).append(entry)
+        self._by_loose_key.setdefault(entry["loose_key"], []).append(entry)
+
+    def add(self, body, message, usage, latency, duration):
+        entry = {
+            "key": request_key(body),
+            "loose_key": request_key(body, loose=True),
+            "request": body,
+            "message": message,
+            "usage": usage,
+            "latency": latency,
+            "duration": duration,
+        }
+        with open(self.path, "a") as f:
+            f.write(json.dumps(entry) + "\n")
+        self._index(entry)
+
+    def find(self, body):
+        # Repeated identical requests replay their recordings in order, then cycle
+        for index, key in ((self._by_key, request_key(body)), (self._by_loose_key, request_key(body, loose=True))):
+            candidates = index.get(key)
+            if candidates:
+                position = self._next.get(key, 0)
+                self._next[key] = position + 1
+                return candidates[position % len(candidates)]
+        return None
+
+
+def count_tokens(text):
+    # Rough token accounting (~4 chars/token)
+    return len(text or "") // 4
+
+
+def chunk_event(body, completion_id, delta, finish_reason=None):
+    chunk = {
+        "id": completion_id,
+        "object": "chat.completion.chunk",
+        "created": int(time.time()),
+        "model": body.get("model", "stub"),
+        "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+    }
+    return f"data: {json.dumps(chunk)}\n\n"
+
+
+async def stream_chunks(body, message, chunk_delay=None):
+    # Content is streamed word by word; each tool call as its name, then its
+    # arguments in two pieces, the way OpenAI-compatible servers split them
+    completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+    tool_calls = message.get("tool_calls") or []
+    for index, call in enumerate(tool_calls):
+        arguments = call["function"].get("arguments") or ""
+        half = len(arguments) // 2
+        yield chunk_event(body, completion_id, {"tool_calls": [{
+            "index": index, "id": call.get("id"), "type": "function",
+            "function": {"name": call["function"]["name"], "arguments": arguments[:half]},
+        }]})
+        yield chunk_event(body, completion_id, {"tool_calls": [{"index": index, "function": {"arguments": arguments[half:]}}]})
+    content = message.get("content") or ""
+    words = content.split(" ") if content or not tool_calls else []
+    for i, word in enumerate(words):
+        delay = chunk_delay if chunk_delay is not None else (app.state.token_latency or sample_token_delay(count_tokens(" " + word) or 1))
+        if delay:
+            await asyncio.sleep(delay)
+        yield chunk_event(body, completion_id, {"content": word if i == 0 else " " + word})
+    yield chunk_event(body, completion_id, {}, "tool_calls" if tool_calls else "stop")
+    yield "data: [DONE]\n\n"
+
+
+def completion_response(body, message, usage):
+    return {
+        "id": f"chatcmpl-{uuid.uuid4().hex}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": body.get("model", "stub"),
+        "choices": [{
+            "index": 0,
+            "message": message,
+            "finish_reason": "tool_calls" if message.get("tool_calls") else "stop",
+        }],
+        "usage": usage,
+    }
+
+
+@app.post("/openai/v1/chat/completions")
+@app.post("/v1/chat/completions")
+async def chat_completions(request: Request):
+    body = await request.json()
+    stats = app.state.stats
+    stats["requests"] += 1
+
+    if app.state.mode == "record":
+        return await record(body)
+
+    entry = None
+    if app.state.mode == "replay":
+        entry = app.state.cassette.find(body)
+        if entry is None:
+            stats["misses"] += 1
+            if app.state.on_miss == "error":
+                return JSONResponse({"error": {"message": "no cassette entry for this request"}}, status_code=404)
+        else:
+            stats["replayed"] += 1
+
+    stats["in_flight"] += 1
+    stats["max_in_flight"] = max(stats["max_in_flight"], stats["in_flight"])
+    try:
+        latency = entry["latency"] * app.state.replay_speed if entry else sample_latency()
+        if latency:
+            await asyncio.sleep(latency)
+    finally:
+        stats["in_flight"] -= 1
+
+    if app.state.fail_rate and random.random() < app.state.fail_rate:
+        stats["failed"] += 1
+        return JSONResponse({"error": {"message": "injected failure"}}, status_code=app.state.fail_status)
+
+    if entry:
+        message, usage = entry["message"], entry["usage"]
+        generation = max(0.0, entry["duration"] - entry["latency"]) * app.state.replay_speed
+    else:
+        message = synthesize(body)
+        # Tool schemas count towards the prompt
+        prompt_chars = sum(len(str(m.get("content") or "")) for m in body.get("messages", []))
+        prompt_tokens = (prompt_chars + len(json.dumps(body.get("tools") or []))) // 4
+        completion_tokens = count_tokens(message.get("content") or json.dumps(message.get("tool_calls") or ""))
+        usage = {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                 "total_tokens": prompt_tokens + completion_tokens}
+        generation = None
+    stats["prompt_tokens"] += usage.get("prompt_tokens", 0)
+    stats["completion_tokens"] += usage.get("completion_tokens", 0)
+
+    if body.get("stream"):
+        chunk_delay = None
+        if generation is not None:
+            chunk_delay = generation / max(1, len((message.get("content") or "").split(" ")))
+        return StreamingResponse(stream_chunks(body, message, chunk_delay), media_type="text/event-stream")
+
+    if generation is None:
+        generation = sample_token_delay(usage["completion_tokens"])
+    if generation:
+        await asyncio.sleep(generation)
+    return completion_response(body, message, usage)
+
+
+async def record(body):
+    stats = app.state.stats
+    headers = {"Authorization": f"Bearer {app.state.upstream_key}"}
+    url = app.state.upstream.rstrip("/") + "/chat/completions"
+    if app.state.upstream_client is None:
+        # One pooled client, so recorded latencies don't include connection setup
+        app.state.upstream_client = httpx.AsyncClient(timeout=120)
+    client = app.state.upstream_client
+    start = time.perf_counter()
+
+    if not body.get("stream"):
+        response = await client.post(url, json=body, headers=headers)
+        elapsed = time.perf_counter() - start
+        if response.status_code != 200:
+            # Errors are passed through, never recorded
+            stats["failed"] += 1
+            return JSONResponse(response.json(), status_code=response.status_code)
+        payload = response.json()
+        # Non-streamed: no separate first-token time, so it is all latency
+        app.state.cassette.add(body, payload["choices"][0]["message"], payload.get("usage") or {}, elapsed, elapsed)
+        stats["recorded"] += 1
+        return payload
+
+    request = client.build_request("POST", url, json=body, headers=headers)
+    response = await client.send(request, stream=True)
+    if response.status_code != 200:
+        content = await response.aread()
+        await response.aclose()
+        stats["failed"] += 1
+        return JSONResponse(json.loads(content or b"{}"), status_code=response.status_code)
+
+    async def relay():
+        # Passes chunks through untouched while assembling the message for the cassette
+        content, usage, first_token = [], {}, None
+        tool_calls = {}
+        try:
+            async for line in response.aiter_lines():
+                if line:
+                    yield line + "\n\n"
+                if not line.startswith("data: ") or line == "data: [DONE]":
+                    continue
+                chunk = json.loads(line[len("data: "):])
+                usage = chunk.get("usage") or (chunk.get("x_groq") or {}).get("usage") or usage
+                for choice in chunk.get("choices", []):
+                    delta = choice.get("delta") or {}
+                    if delta.get("content"):
+                        first_token = first_token or time.perf_counter() - start
+                        content.append(delta["content"])
+                    for call in delta.get("tool_calls") or []:
+                        merged = tool_calls.setdefault(call.get("index", 0), {"type": "function", "function": {"name": "", "arguments": ""}})
+                        merged["id"] = call.get("id") or merged.get("id")
+                        function = call.get("function") or {}
+                        merged["function"]["name"] += function.get("name") or ""
+                        merged["function"]["arguments"] += function.get("arguments") or ""
+        finally:
+            await response.aclose()
+        duration = time.perf_counter() - start
+        message = {"role": "assistant", "content": "".join(content) or None}
+        if tool_calls:
+            message["tool_calls"] = [tool_calls[i] for i in sorted(tool_calls)]
+        app.state.cassette.add(body, message, usage, first_token or duration, duration)
+        stats["recorded"] += 1
+
+    return StreamingResponse(relay(), media_type="text/event-stream")
+
+
+@app.post("/_faults")
+async def set_faults(request: Request):
+    # e.g. {"latency": 2.0, "fail_rate": 0.5, "fail_status": 429}
+    for key, value in (await request.json()).items():
+        if key in ("latency", "token_latency", "fail_rate", "fail_status", "latency_sigma", "token_rate", "token_rate_sigma"):
+            setattr(app.state, key, value)
+    app.state.stats = dict.fromkeys(STAT_KEYS, 0)
+    return {"ok": True}
+
+
+@app.get("/_stats")
+async def get_stats():
+    return app.state.stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--mode", choices=("synth", "record", "replay"), default="synth")
+    parser.add_argument("--latency", type=float, default=0.2, help="Seconds to wait before answering (median when --latency-sigma is set)")
+    parser.add_argument("--latency-sigma", type=float, default=0.0, help="Lognormal sigma of the latency (0 = fixed)")
+    parser.add_argument("--token-rate", type=float, default=0.0, help="Completion tokens per second (0 = instant)")
+    parser.add_argument("--token-rate-sigma", type=float, default=0.0, help="Lognormal sigma of the token rate")
+    parser.add_argument("--token-latency", type=float, default=0.0, help="Fixed seconds between streamed tokens (overrides --token-rate)")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the latency/token-rate samples")
+    parser.add_argument("--cassette", help="JSONL cassette written by record mode and read by replay mode")
+    parser.add_argument("--upstream", default="https://api.groq.com/openai/v1", help="Record mode: OpenAI-compatible base URL")
+    parser.add_argument("--upstream-key-env", default="GROQ_API_KEY", help="Record mode: environment variable holding the upstream API key")
+    parser.add_argument("--replay-speed", type=float, default=1.0, help="Replay mode: scale recorded timings (0 = instant)")
+    parser.add_argument("--on-miss", choices=("error", "synth"), default="error", help="Replay mode: requests not in the cassette")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="Fraction of requests answered with an error")
+    parser.add_argument("--fail-status", type=int, default=503, help="HTTP status used for injected failures")
+    args = parser.parse_args()
+
+    if args.mode != "synth":
+        if not args.cassette:
+            parser.error(f"--mode {args.mode} needs --cassette")
+        if args.mode == "replay" and not os.path.exists(args.cassette):
+            parser.error(f"cassette {args.cassette} does not exist")
+        app.state.cassette = Cassette(args.cassette)
+    if args.mode == "record":
+        app.state.upstream = args.upstream
+        app.state.upstream_key = os.getenv(args.upstream_key_env)
+        if not app.state.upstream_key:
+            parser.error(f"record mode needs ${args.upstream_key_env}")
+
+    app.state.mode = args.mode
+    app.state.latency = args.latency
+    app.state.latency_sigma = args.latency_sigma
+    app.state.token_rate = args.token_rate
+    app.state.token_rate_sigma = args.token_rate_sigma
+    app.state.token_latency = args.token_latency
+    app.state.rng = random.Random(args.seed)
+    app.state.replay_speed = args.replay_speed
+    app.state.on_miss = args.on_miss
+    app.state.fail_rate = args.fail_rate
+    app.state.fail_status = args.fail_status
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,300 @@
+"""
+Regression suite: end-to-end chat load and database hot paths, written as JSON.
+
+chat  Starts the backend (fresh scratch database) against the stub LLM and
+      drives /chat with concurrent scripted conversations that mix support,
+      accounts and loan/service intents, each keeping its session_id. Reports
+      throughput and p50/p95/p99 latency per route (the intent each scripted
+      message is written for) and overall.
+db    For each dataset size, loads a scratch SQLite database with
+      benchmarks/datagen.py and times the hot paths with the backend's own code
+      or the dashboard's queries: recent transactions (accounts agent), the
+      dashboard KPIs and daily totals, and the pending/processed service request
+      listings. Each iteration uses a new session, as a request or rerun would.
+
+Results go to benchmarks/results/<commit>.json (or --output) together with the
+commit, the machine and the settings used. Compare two runs with
+benchmarks/compare.py, which exits 1 on regressions.
+
+Run:  python -m benchmarks.suite
+      python -m benchmarks.suite --only db --sizes 10000,100000,1000000
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import httpx
+
+from .common import PROJECT_ROOT, free_port, percentile, start_backend, start_stub_llm
+
+SCRIPTS = [
+    [
+        ("ACCOUNTS", "What is my balance?"),
+        ("CUSTOMER_SUPPORT", "What are the branch hours?"),
+        ("ACCOUNTS", "Show my recent transactions"),
+        ("LOANS_SERVICES", "I want to apply for a loan"),
+    ],
+    [
+        ("CUSTOMER_SUPPORT", "How do I reset my password?"),
+        ("CUSTOMER_SUPPORT", "Where is the nearest ATM?"),
+        ("ACCOUNTS", "What is my balance?"),
+    ],
+    [
+        ("ACCOUNTS", "Show my recent transactions"),
+        ("LOANS_SERVICES", "I need a new debit card"),
+        ("ACCOUNTS", "What is my balance and my recent transactions?"),
+        ("CUSTOMER_SUPPORT", "What is the customer care number?"),
+    ],
+]
+
+
+def summarize(latencies, errors, elapsed):
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        "mean_ms": round(sum(latencies) / len(latencies) * 1000, 3) if latencies else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+    }
+
+
+# --- chat ---
+
+async def drive(url, conversations, rounds):
+    samples = {}  # route -> [latencies], errors under the same key
+    errors = {}
+
+    async def conversation(index, client):
+        script = SCRIPTS[index % len(SCRIPTS)]
+        session_id = None
+        for _ in range(rounds):
+            for route, message in script:
+                start = time.perf_counter()
+                try:
+                    response = await client.post(url, json={"message": message, "session_id": session_id})
+                    body = response.json() if response.status_code == 200 else {}
+                except httpx.HTTPError:
+                    body = {}
+                if not body or body.get("response", "").startswith("Error"):
+                    errors[route] = errors.get(route, 0) + 1
+                    continue
+                samples.setdefault(route, []).append(time.perf_counter() - start)
+                session_id = body.get("session_id")
+
+    limits = httpx.Limits(max_connections=conversations)
+    async with httpx.AsyncClient(timeout=60, limits=limits) as client:
+        start = time.perf_counter()
+        await asyncio.gather(*(conversation(c, client) for c in range(conversations)))
+        elapsed = time.perf_counter() - start
+    return samples, errors, elapsed
+
+
+def warm_up(url, requests):
+    # serve.py binds the socket before its workers finish importing
+    deadline = time.time() + 60
+    messages = [message for script in SCRIPTS for _, message in script]
+    with httpx.Client(timeout=60) as client:
+        done = 0
+        while done < requests:
+            try:
+                client.post(url, json={"message": messages[done % len(messages)]}).raise_for_status()
+                done += 1
+            except httpx.HTTPError:
+                if time.time() > deadline:
+                    raise
+                time.sleep(0.2)
+
+
+def run_chat(args):
+    llm_port, api_port = free_port(), free_port()
+    stub = start_stub_llm(llm_port, args.latency)
+    try:
+        with tempfile.TemporaryDirectory(prefix="bench_suite_") as workdir:
+            backend = start_backend(api_port, llm_port, cwd=workdir, workers=args.workers)
+            try:
+                url = f"http://127.0.0.1:{api_port}/chat"
+                warm_up(url, args.warmup)
+                samples, errors, elapsed = asyncio.run(drive(url, args.conversations, args.rounds))
+            finally:
+                backend.terminate()
+                backend.wait()
+        llm_calls = httpx.get(f"http://127.0.0.1:{llm_port}/_stats").json().get("requests")
+    finally:
+        stub.terminate()
+        stub.wait()
+
+    routes = {route: summarize(samples.get(route, []), errors.get(route, 0), elapsed)
+              for route in sorted(set(samples) | set(errors))}
+    routes["all"] = summarize([l for values in samples.values() for l in values], sum(errors.values()), elapsed)
+    return {
+        "config": {"conversations": args.conversations, "rounds": args.rounds, "workers": args.workers,
+                   "llm_latency": args.latency, "stub_llm_args": os.getenv("STUB_LLM_ARGS", "")},
+        "llm_calls": llm_calls,
+        "routes": routes,
+    }
+
+
+# --- db ---
+
+def hot_paths(user_ids):
+    from sqlalchemy import func
+    from sqlalchemy.orm import contains_eager
+
+    from backend.agents import AccountsAgent
+    from backend.config import DASHBOARD_WINDOW_DAYS
+    from backend.models import Account, ServiceRequest, User
+    from backend.rollups import daily_totals
+
+    users = iter(user_ids)
+
+    def recent_transactions(db):
+        return AccountsAgent(db, next(users)).get_recent_transactions(db)
+
+    # The queries below are the dashboard's (dashboard/app.py), minus Streamlit's cache
+    def dashboard_kpis(db):
+        return (
+            db.query(func.count(User.id)).scalar(),
+            db.query(func.sum(Account.balance)).scalar() or 0.0,
+            db.query(func.count(ServiceRequest.id)).filter(ServiceRequest.status == "Under Review").scalar(),
+        )
+
+    def dashboard_daily_totals(db):
+        return daily_totals(db, start_day=datetime.utcnow().date() - timedelta(days=DASHBOARD_WINDOW_DAYS - 1))
+
+    def service_requests_pending(db):
+        return (
+            db.query(ServiceRequest).join(ServiceRequest.owner).options(contains_eager(ServiceRequest.owner))
+            .filter(ServiceRequest.status.in_(["Requested", "Under Review", "Pending"])).all()
+        )
+
+    def service_requests_processed(db):
+        return (
+            db.query(ServiceRequest.id, User.name, ServiceRequest.service_type, ServiceRequest.status, ServiceRequest.timestamp)
+            .join(User, ServiceRequest.user_id == User.id)
+            .filter(ServiceRequest.status.in_(["Approved", "Rejected"]))
+            .order_by(ServiceRequest.timestamp.desc()).limit(50).all()
+        )
+
+    return {
+        "get_recent_transactions": recent_transactions,
+        "dashboard_kpis": dashboard_kpis,
+        "dashboard_daily_totals": dashboard_daily_totals,
+        "service_requests_pending": service_requests_pending,
+        "service_requests_processed": service_requests_processed,
+    }
+
+
+def time_path(engine, path, iterations, warmup):
+    from sqlalchemy.orm import Session
+
+    latencies = []
+    for i in range(warmup + iterations):
+        start = time.perf_counter()
+        with Session(engine) as db:
+            path(db)
+        if i >= warmup:
+            latencies.append(time.perf_counter() - start)
+    return summarize(latencies, 0, sum(latencies))
+
+
+def run_db(args):
+    from backend.database import create_db_engine
+    from .datagen import generate
+
+    results = {}
+    for size in args.sizes:
+        with tempfile.TemporaryDirectory(prefix="bench_suite_") as workdir:
+            engine = create_db_engine("sqlite:///" + os.path.join(workdir, "bench.db"))
+            users = max(100, size // 20)
+            data = generate(engine, users=users, transactions=size, seed=args.seed)
+            rng = random.Random(args.seed)
+            user_ids = [data["first_user_id"] + rng.randrange(users) for _ in range(args.warmup + args.iterations)]
+            paths = {name: time_path(engine, path, args.iterations, args.warmup)
+                     for name, path in hot_paths(user_ids).items()}
+            engine.dispose()
+        for timing in paths.values():
+            del timing["errors"], timing["rps"]
+        results[str(size)] = {
+            "dataset": {key: data[key] for key in ("users", "accounts", "transactions", "service_requests")},
+            "load_seconds": round(data["load_seconds"] + data["index_seconds"], 2),
+            "paths": paths,
+        }
+        print(f"  {size:>10,} transactions: " + ", ".join(
+            f"{name} p50 {timing['p50_ms']:.2f} ms" for name, timing in paths.items()), flush=True)
+    return {"config": {"iterations": args.iterations, "warmup": args.warmup, "seed": args.seed}, "sizes": results}
+
+
+# --- report ---
+
+def git(*args):
+    try:
+        return subprocess.run(["git", *args], cwd=PROJECT_ROOT, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def environment():
+    return {
+        "commit": git("rev-parse", "--short", "HEAD"),
+        "dirty": bool(git("status", "--porcelain", "--untracked-files=no")),
+        "timestamp": datetime.utcnow().isoformat(timespec="seconds") + "Z",
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def print_chat(chat):
+    print(f"\n{'route':<18} {'requests':>8} {'errors':>6} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for route, r in chat["routes"].items():
+        print(f"{route:<18} {r['requests']:>8} {r['errors']:>6} {r['rps']:>8.1f} "
+              f"{r['p50_ms']:>8.1f} {r['p95_ms']:>8.1f} {r['p99_ms']:>8.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--only", choices=["chat", "db"], help="Run one section only")
+    parser.add_argument("--output", help="JSON file to write (default: benchmarks/results/<commit>.json)")
+    parser.add_argument("--conversations", type=int, default=32, help="Concurrent conversations")
+    parser.add_argument("--rounds", type=int, default=3, help="Times each conversation plays its script")
+    parser.add_argument("--workers", type=int, help="Serve through serve.py with this many workers")
+    parser.add_argument("--latency", type=float, default=0.05, help="Stub LLM latency per call (seconds)")
+    parser.add_argument("--sizes", default="10000,100000", help="Comma separated transaction counts")
+    parser.add_argument("--iterations", type=int, default=200, help="Timed runs per DB hot path")
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    args.sizes = [int(size) for size in args.sizes.split(",")]
+
+    report = {"environment": environment()}
+    if args.only in (None, "chat"):
+        print(f"chat: {args.conversations} conversations x {args.rounds} rounds, "
+              f"stub LLM latency {args.latency * 1000:.0f} ms", flush=True)
+        report["chat"] = run_chat(args)
+        print_chat(report["chat"])
+    if args.only in (None, "db"):
+        print(f"\ndb: {args.iterations} runs per hot path", flush=True)
+        report["db"] = run_db(args)
+
+    output = args.output or os.path.join(PROJECT_ROOT, "benchmarks", "results",
+                                         f"{report['environment']['commit'] or 'unknown'}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nwrote {output}")
+    if args.only in (None, "chat") and report["chat"]["routes"]["all"]["errors"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+import os
+import sys
+import tempfile
+from datetime import datetime, timedelta
+
+# Query-count regression check for the dashboard pages. Renders each page
+# against a fresh database, then again with several times the customers,
+# transactions and service requests; the number of SQL statements per render
+# must not grow with the rows shown (an N+1 lazy load would). Also checks that
+# approving a request refreshes the cached KPIs. Exits 1 on failure.
+
+tmp = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tmp, 'dashboard.db')}"
+
+import streamlit as st
+from streamlit.testing.v1 import AppTest
+
+from backend.database import SessionLocal, engine, count_queries
+from backend.migrations import upgrade
+from backend.models import User, Account, Transaction, ServiceRequest
+
+APP = os.path.join(os.path.dirname(os.path.abspath(__file__)), "dashboard", "app.py")
+PAGES = ["Overview", "Transactions", "Service Requests"]
+
+
+def add_customers(first, count):
+    with SessionLocal() as db:
+        for i in range(first, first + count):
+            user = User(name=f"Customer {i}", email=f"customer{i}@example.com")
+            account = Account(owner=user, account_type="Savings", balance=1000.0)
+            db.add_all([user, account])
+            for day in range(3):
+                db.add(Transaction(account=account, transaction_type="Debit", amount=10.0 + day, status="Success",
+                                   description="Coffee", timestamp=datetime.utcnow() - timedelta(days=day)))
+            db.add(ServiceRequest(owner=user, service_type="Checkbook", details="", status="Requested"))
+            db.add(ServiceRequest(owner=user, service_type="Loan", details="", status="Approved"))
+        db.commit()
+
+
+def render(page):
+    st.cache_data.clear()
+    at = AppTest.from_file(APP, default_timeout=60)
+    at.run()
+    if page != "Overview":
+        at.sidebar.radio[0].set_value(page)
+    st.cache_data.clear()
+    with count_queries(engine) as counter:
+        at.run()
+    if at.exception:
+        raise RuntimeError(f"{page}: {at.exception[0].message}")
+    return counter.count
+
+
+def pending_approvals(at):
+    return next(m.value for m in at.metric if m.label == "Pending Approvals")
+
+
+def approve_updates_kpis():
+    with SessionLocal() as db:
+        request = ServiceRequest(user_id=1, service_type="Loan", details="", status="Under Review")
+        db.add(request)
+        db.commit()
+        request_id = request.id
+    st.cache_data.clear()
+    at = AppTest.from_file(APP, default_timeout=60)
+    at.run()
+    before = pending_approvals(at)
+    at.sidebar.radio[0].set_value("Service Requests").run()
+    at.button(key=f"app_{request_id}").click().run()
+    at.sidebar.radio[0].set_value("Overview").run()
+    return before, pending_approvals(at)
+
+
+if __name__ == "__main__":
+    upgrade(engine)
+    add_customers(1, 3)
+    small = {page: render(page) for page in PAGES}
+    add_customers(4, 12)
+    large = {page: render(page) for page in PAGES}
+
+    failures = 0
+    for page in PAGES:
+        ok = small[page] == large[page]
+        failures += not ok
+        print(f"[{'OK' if ok else 'FAIL'}] {page}: {small[page]} queries with 3 customers, {large[page]} with 15")
+    before, after = approve_updates_kpis()
+    ok = after == str(int(before) - 1)
+    failures += not ok
+    print(f"[{'OK' if ok else 'FAIL'}] approving a request updates Pending Approvals: {before} -> {after}")
+    engine.dispose()
+    sys.exit(1 if failures else 0)
@@ -0,0 +1,107 @@
+from sqlalchemy import create_engine, func, select, text
+from datetime import datetime
+from backend.models import Account, Transaction, ServiceRequest, TransactionDailyTotal
+from backend.transactions import filter_conditions
+from backend.rollups import rollup_conditions
+from backend.migrations import upgrade
+import sys
+import tempfile
+import os
+
+# EXPLAIN QUERY PLAN regression check for the hot queries.
+# Builds a fresh schema in a temp file and fails (exit 1) if any of them
+# scans a table or sorts where an index should be used.
+
+HOT_QUERIES = [
+    (
+        "account by user (get_balance / get_recent_transactions)",
+        select(Account.id).where(Account.user_id == 1).order_by(Account.id).limit(1),
+        ["ix_accounts_user_id"],
+    ),
+    (
+        "account by primary key (AccountCache -> Session.get)",
+        select(Account).where(Account.id == 1),
+        ["USING INTEGER PRIMARY KEY"],
+    ),
+    (
+        "latest transactions for an account",
+        select(Transaction).where(Transaction.account_id == 1).order_by(Transaction.timestamp.desc()).limit(10),
+        ["USING INDEX ix_transactions_account_id_timestamp"],
+    ),
+    (
+        "transaction page after a keyset cursor (query_transactions)",
+        select(Transaction).where(
+            *filter_conditions(1, start_date="2024-01-01", description="coffee"),
+            (Transaction.timestamp < datetime(2024, 6, 1)) | ((Transaction.timestamp == datetime(2024, 6, 1)) & (Transaction.id < 100)),
+        ).order_by(Transaction.timestamp.desc(), Transaction.id.desc()).limit(21),
+        ["USING INDEX ix_transactions_account_id_timestamp"],
+    ),
+    (
+        "spend by type in a date range (aggregate_transactions)",
+        select(Transaction.transaction_type, func.sum(Transaction.amount))
+        .where(*filter_conditions(1, start_date="2024-01-01", end_date="2024-01-31"))
+        .group_by(Transaction.transaction_type),
+        ["USING INDEX ix_transactions_account_id_timestamp"],
+    ),
+    (
+        "account totals by type from the daily rollups",
+        select(TransactionDailyTotal.transaction_type, func.sum(TransactionDailyTotal.total_amount))
+        .where(*rollup_conditions(1, datetime(2024, 1, 1).date()))
+        .group_by(TransactionDailyTotal.transaction_type),
+        ["(account_id=? AND day>?)"],
+    ),
+    (
+        "bank-wide daily totals for a window (dashboard)",
+        select(TransactionDailyTotal.day, TransactionDailyTotal.transaction_type, func.sum(TransactionDailyTotal.total_amount))
+        .where(*rollup_conditions(start_day=datetime(2024, 1, 1).date()))
+        .group_by(TransactionDailyTotal.day, TransactionDailyTotal.transaction_type)
+        .order_by(TransactionDailyTotal.day, TransactionDailyTotal.transaction_type),
+        ["USING COVERING INDEX ix_transaction_daily_totals_day_type_totals"],
+    ),
+    (
+        "service requests by user",
+        select(ServiceRequest).where(ServiceRequest.user_id == 1),
+        ["USING INDEX ix_service_requests_user_id"],
+    ),
+    (
+        "service request queue by status",
+        select(ServiceRequest).where(ServiceRequest.status == "Under Review").order_by(ServiceRequest.timestamp.desc()).limit(50),
+        ["USING INDEX ix_service_requests_status_timestamp"],
+    ),
+]
+
+# A full scan or a sort of any of these tables means an index is missing.
+# A temp B-tree for GROUP BY is expected: it only holds the groups of the
+# index range that was searched.
+FORBIDDEN = ["SCAN accounts", "SCAN transactions", "SCAN service_requests", "SCAN transaction_daily_totals", "USE TEMP B-TREE FOR ORDER BY"]
+
+
+def explain(conn, statement):
+    sql = str(statement.compile(conn.engine, compile_kwargs={"literal_binds": True}))
+    return [row[-1] for row in conn.execute(text(f"EXPLAIN QUERY PLAN {sql}"))]
+
+
+def check(engine):
+    failures = 0
+    with engine.connect() as conn:
+        for name, statement, expected in HOT_QUERIES:
+            plan = explain(conn, statement)
+            problems = [f"missing '{e}'" for e in expected if not any(e in step for step in plan)]
+            problems += [f"found '{f}'" for f in FORBIDDEN if any(step.startswith(f) for step in plan)]
+            status = "FAIL" if problems else "OK"
+            failures += bool(problems)
+            print(f"[{status}] {name}")
+            for step in plan:
+                print(f"       {step}")
+            for problem in problems:
+                print(f"       -> {problem}")
+    return failures
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'plans.db')}")
+        upgrade(engine)
+        failures = check(engine)
+        engine.dispose()
+    sys.exit(1 if failures else 0)
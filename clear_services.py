@@ -1,17 +1,7 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from backend.database import SessionLocal
 from backend.models import ServiceRequest
-import os
 
-# Connect to DB
-PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
-DB_PATH = os.path.join(PROJECT_ROOT, "app.db")
-if os.name == 'nt':
-    DB_PATH = DB_PATH.replace('\\', '/')
-SQLALCHEMY_DATABASE_URL = f"sqlite:///{DB_PATH}"
-
-engine = create_engine(SQLALCHEMY_DATABASE_URL)
-SessionLocal = sessionmaker(bind=engine)
+# Connect to DB (DATABASE_URL, defaults to app.db in the project root)
 db = SessionLocal()
 
 # Count before
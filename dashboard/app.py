@@ -1,10 +1,11 @@
 import streamlit as st
 import pandas as pd
-from sqlalchemy import create_engine, func
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import func
+from sqlalchemy.orm import contains_eager
 import sys
 import os
 import altair as alt
+from datetime import datetime, timedelta
 
 # --- Configuration & Setup ---
 st.set_page_config(
@@ -14,16 +15,13 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# Robust Database Connection
+# Robust Database Connection (shared engine factory: same DATABASE_URL and pragmas as the backend)
 try:
     PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-    DB_PATH = os.path.join(PROJECT_ROOT, "app.db")
-    if os.name == 'nt':
-        DB_PATH = DB_PATH.replace('\\', '/')
-    SQLALCHEMY_DATABASE_URL = f"sqlite:///{DB_PATH}"
-    
-    engine = create_engine(SQLALCHEMY_DATABASE_URL)
-    SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False)
+    if PROJECT_ROOT not in sys.path:
+        sys.path.append(PROJECT_ROOT)
+    from backend.database import engine, SessionLocal
+    from backend.config import DASHBOARD_WINDOW_DAYS, DASHBOARD_CACHE_TTL_SECONDS
 except Exception as e:
     st.error(f"Failed to connect to database: {e}")
     st.stop()
@@ -54,11 +52,31 @@ def get_db():
     finally:
         db.close()
 
+# Overview aggregates run in SQL (counts/sums and the daily rollups) and are
+# cached for DASHBOARD_CACHE_TTL_SECONDS, so a rerun doesn't touch the database
+@st.cache_data(ttl=DASHBOARD_CACHE_TTL_SECONDS, show_spinner=False)
+def load_kpis():
+    from backend.models import ServiceRequest, User, Account
+    with SessionLocal() as db:
+        return {
+            "customers": db.query(func.count(User.id)).scalar(),
+            "balance": db.query(func.sum(Account.balance)).scalar() or 0.0,
+            "pending": db.query(func.count(ServiceRequest.id)).filter(ServiceRequest.status == "Under Review").scalar(),
+        }
+
+@st.cache_data(ttl=DASHBOARD_CACHE_TTL_SECONDS, show_spinner=False)
+def load_daily_totals(days: int):
+    from backend.rollups import daily_totals
+    with SessionLocal() as db:
+        # Rollup days are UTC days (transaction timestamps are utcnow())
+        rows = daily_totals(db, start_day=datetime.utcnow().date() - timedelta(days=days - 1))
+    return pd.DataFrame(rows, columns=["Date", "Type", "Amount", "Count"])
+
 # --- Main App ---
 def main():
     # Import models explicitly here to avoid import errors if path varies
-    sys.path.append(PROJECT_ROOT)
     from backend.models import Transaction, ServiceRequest, User, Account
+    from backend.search import search_condition
 
     db = next(get_db())
 
@@ -69,13 +87,13 @@ def main():
         nav = st.radio("Navigation", ["Overview", "Transactions", "Service Requests"])
         st.markdown("---")
         if st.button("🔄 Refresh Data"):
+            st.cache_data.clear()
             st.rerun()
         st.caption("v2.0.0 | Admin Panel")
 
     # Fetch Common Data
-    total_customers = db.query(User).count()
-    total_balance = db.query(func.sum(Account.balance)).scalar() or 0.0
-    pending_requests = db.query(ServiceRequest).filter(ServiceRequest.status == "Under Review").count()
+    kpis = load_kpis()
+    total_customers, total_balance, pending_requests = kpis["customers"], kpis["balance"], kpis["pending"]
     
     # --- PAGE: OVERVIEW ---
     if nav == "Overview":
@@ -89,12 +107,14 @@ def main():
         col4.metric("System Status", "Online", delta="Stable")
 
         st.markdown("### Financial Pulse")
+        windows = [7, 30, 90, 365]
+        if DASHBOARD_WINDOW_DAYS not in windows:
+            windows = sorted(windows + [DASHBOARD_WINDOW_DAYS])
+        window = st.selectbox("Window", windows, index=windows.index(DASHBOARD_WINDOW_DAYS), format_func=lambda d: f"Last {d} days")
         
-        # Transaction Query for Charts
-        tx_query = db.query(Transaction).all()
-        if tx_query:
-            data = [{"Amount": t.amount, "Type": t.transaction_type, "Date": t.timestamp} for t in tx_query]
-            df = pd.DataFrame(data)
+        # Bank-wide totals per day and type from the rollups, not raw transactions
+        df = load_daily_totals(window)
+        if not df.empty:
             
             c1, c2 = st.columns(2)
             with c1:
@@ -109,13 +129,13 @@ def main():
             with c2:
                 st.markdown("**Recent Trend**")
                 line = alt.Chart(df).mark_line(point=True).encode(
-                    x='Date',
+                    x='Date:T',
                     y='Amount',
                     color='Type'
                 )
                 st.altair_chart(line, use_container_width=True)
         else:
-            st.info("No transaction data available for charts.")
+            st.info("No transaction data in this window.")
 
     # --- PAGE: TRANSACTIONS ---
     elif nav == "Transactions":
@@ -126,10 +146,16 @@ def main():
         search_term = filter_col1.text_input("Search (Description)", placeholder="Coffee, Salary...")
         tx_type_filter = filter_col2.selectbox("Type", ["All", "Credit", "Debit"])
         
-        query = db.query(Transaction).join(Account).join(User)
+        # Column projection over the joins: one query, no per-row lazy loads of account/owner
+        query = db.query(
+            Transaction.id, User.name, Transaction.description, Transaction.transaction_type,
+            Transaction.amount, Transaction.timestamp, Transaction.status,
+        ).join(Account, Transaction.account_id == Account.id).join(User, Account.user_id == User.id)
         
-        if search_term:
-            query = query.filter(Transaction.description.ilike(f"%{search_term}%"))
+        # Full-text index instead of ILIKE '%term%' (a full scan on every rerun)
+        condition = search_condition(db, search_term)
+        if condition is not None:
+            query = query.filter(condition)
         if tx_type_filter != "All":
             query = query.filter(Transaction.transaction_type == tx_type_filter)
             
@@ -139,7 +165,7 @@ def main():
         for t in transactions:
             data.append({
                 "ID": t.id,
-                "Customer": t.account.owner.name,
+                "Customer": t.name,
                 "Description": t.description,
                 "Type": t.transaction_type,
                 "Amount": f"${t.amount:,.2f}",
@@ -173,7 +199,11 @@ def main():
         tabs = st.tabs(["⏳ Pending Review", "✅ Processed"])
         
         with tabs[0]:
-            pending = db.query(ServiceRequest).join(User).filter(ServiceRequest.status.in_(["Requested", "Under Review", "Pending"])).all()
+            # Full objects (the buttons update them); owner comes from the same join
+            pending = (
+                db.query(ServiceRequest).join(ServiceRequest.owner).options(contains_eager(ServiceRequest.owner))
+                .filter(ServiceRequest.status.in_(["Requested", "Under Review", "Pending"])).all()
+            )
             
             if pending:
                 for req in pending:
@@ -189,23 +219,30 @@ def main():
                             if st.button("✅ Approve", key=f"app_{req.id}"):
                                 req.status = "Approved"
                                 db.commit()
+                                load_kpis.clear()  # Pending Approvals changed
                                 st.success(f"Request #{req.id} Approved!")
                                 st.rerun()
                                 
                             if st.button("❌ Reject", key=f"rej_{req.id}"):
                                 req.status = "Rejected"
                                 db.commit()
+                                load_kpis.clear()  # Pending Approvals changed
                                 st.error(f"Request #{req.id} Rejected.")
                                 st.rerun()
             else:
                 st.success("🎉 No pending requests! Good job.")
         
         with tabs[1]:
-            history = db.query(ServiceRequest).join(User).filter(ServiceRequest.status.in_(["Approved", "Rejected"])).order_by(ServiceRequest.timestamp.desc()).limit(50).all()
+            history = (
+                db.query(ServiceRequest.id, User.name, ServiceRequest.service_type, ServiceRequest.status, ServiceRequest.timestamp)
+                .join(User, ServiceRequest.user_id == User.id)
+                .filter(ServiceRequest.status.in_(["Approved", "Rejected"]))
+                .order_by(ServiceRequest.timestamp.desc()).limit(50).all()
+            )
             
             data = [{
                 "ID": r.id,
-                "Customer": r.owner.name,
+                "Customer": r.name,
                 "Type": r.service_type,
                 "Status": r.status,
                 "Date": r.timestamp.strftime("%Y-%m-%d")
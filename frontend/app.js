@@ -1,12 +1,16 @@
 const chatBox = document.getElementById('chat-box');
 const userInput = document.getElementById('user-input');
 const quickActions = document.getElementById('quick-actions');
-let history = [];
+// Conversation history lives on the server; we only keep the session ID
+let sessionId = null;
 
 // Add a hidden typing indicator
 const typingIndicator = document.createElement('div');
 typingIndicator.classList.add('typing-indicator');
 typingIndicator.innerHTML = '<div class="dot"></div><div class="dot"></div><div class="dot"></div>';
+const typingStatus = document.createElement('span');
+typingStatus.classList.add('typing-status');
+typingIndicator.appendChild(typingStatus);
 chatBox.appendChild(typingIndicator);
 
 function scrollToBottom() {
@@ -26,19 +30,50 @@ async function sendMessage(text = null) {
     if (quickActions) quickActions.style.display = 'none';
 
     try {
-        const response = await fetch('http://127.0.0.1:8000/chat', {
+        const response = await fetch('http://127.0.0.1:8000/chat/stream', {
             method: 'POST',
             headers: { 'Content-Type': 'application/json' },
-            body: JSON.stringify({ message: message, history: history })
+            body: JSON.stringify({ message: message, session_id: sessionId })
         });
 
-        const data = await response.json();
-
-        history.push({ role: 'user', parts: [message] });
-        history.push({ role: 'model', parts: [data.response] });
+        // Read Server-Sent Events off the response body as they arrive
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+        let replyText = '';
+        let replyDiv = null;
+
+        while (true) {
+            const { value, done } = await reader.read();
+            if (done) break;
+            buffer += decoder.decode(value, { stream: true });
+
+            const events = buffer.split('\n\n');
+            buffer = events.pop();
+            for (const raw of events) {
+                if (!raw.startsWith('data: ')) continue;
+                const event = JSON.parse(raw.slice(6));
+
+                if (event.type === 'session') {
+                    sessionId = event.session_id;
+                } else if (event.type === 'route') {
+                    setTypingStatus(`Routed to ${formatAgent(event.agent)}`);
+                } else if (event.type === 'tool') {
+                    setTypingStatus(`Running ${event.name}...`);
+                } else if (event.type === 'token' || event.type === 'error') {
+                    replyText += event.type === 'token' ? event.content : event.message;
+                    if (!replyDiv) {
+                        showTyping(false);
+                        replyDiv = appendMessage('bot', '');
+                    }
+                    replyDiv.innerHTML = marked.parse(replyText);
+                    scrollToBottom();
+                }
+            }
+        }
 
         showTyping(false);
-        appendMessage('bot', data.response);
+        if (!replyDiv) appendMessage('bot', replyText);
     } catch (error) {
         console.error('Error:', error);
         showTyping(false);
@@ -46,6 +81,16 @@ async function sendMessage(text = null) {
     }
 }
 
+function formatAgent(agent) {
+    const names = { ACCOUNTS: 'Accounts', LOANS_SERVICES: 'Loans & Services', CUSTOMER_SUPPORT: 'Customer Support' };
+    return names[agent] || agent;
+}
+
+function setTypingStatus(text) {
+    typingStatus.textContent = text;
+    scrollToBottom();
+}
+
 function sendQuickMessage(text) {
     sendMessage(text);
 }
@@ -69,10 +114,12 @@ function appendMessage(role, text) {
     // Insert before typing indicator
     chatBox.insertBefore(msgDiv, typingIndicator);
     scrollToBottom();
+    return contentDiv;
 }
 
 function showTyping(show) {
     if (show) {
+        typingStatus.textContent = '';
         typingIndicator.style.display = 'flex';
         chatBox.appendChild(typingIndicator); // Move to bottom
     } else {
@@ -88,7 +135,7 @@ userInput.addEventListener('keypress', (e) => {
 
 // Clear chat feature
 document.getElementById('clear-chat').addEventListener('click', () => {
-    history = [];
+    sessionId = null;
     // remove all messages except the first welcome one and typing indicator
     const messages = chatBox.querySelectorAll('.message:not(:first-child)');
     messages.forEach(msg => msg.remove());
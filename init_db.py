@@ -1,18 +1,14 @@
-from sqlalchemy import create_engine
-from backend.models import Base, User, Account, Transaction, ServiceRequest
-import os
+from backend.database import engine
+from backend.bootstrap import initialize
 
-# EXACT logic from dashboard/app.py to ensure we hit the same file
-PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
-DB_PATH = os.path.join(PROJECT_ROOT, "app.db")
-if os.name == 'nt':
-    DB_PATH = DB_PATH.replace('\\', '/')
-    
-SQLALCHEMY_DATABASE_URL = f"sqlite:///{DB_PATH}"
+# Same engine factory as the backend and dashboard, so we hit the same database
+print(f"Initializing Database at: {engine.url.render_as_string(hide_password=True)}")
 
-print(f"Initializing Database at: {DB_PATH}")
-
-engine = create_engine(SQLALCHEMY_DATABASE_URL)
-Base.metadata.create_all(bind=engine)
+# Also brings an existing app.db up to date (missing tables and indexes) and seeds
+# an empty one; takes the same lock as the backend's startup, so it is safe to run
+# while workers are starting
+created = initialize(engine)
 
 print("Tables created successfully.")
+if created:
+    print("Indexes created:", ", ".join(created))
@@ -1,4 +1,8 @@
-import google.generativeai as genai
+try:
+    import google.generativeai as genai
+except ImportError:
+    # Legacy Gemini check; the backend talks to Groq and no longer installs this package
+    raise SystemExit("pip install google-generativeai to run this script")
 import os
 from dotenv import load_dotenv
 
@@ -0,0 +1,14 @@
+from backend.database import engine
+from backend.migrations import upgrade
+from backend.rollups import rebuild_rollups
+import sys
+
+# Recomputes transaction_daily_totals from the transactions table. Needed after
+# loading transactions with Core/bulk inserts, which skip the ORM event that
+# keeps the rollups up to date. Pass an account id to rebuild just that account.
+
+account_id = int(sys.argv[1]) if len(sys.argv) > 1 else None
+
+upgrade(engine)
+rows = rebuild_rollups(engine, account_id)
+print(f"Rebuilt {rows} daily rollup rows" + (f" for account {account_id}" if account_id else "") + ".")
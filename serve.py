@@ -0,0 +1,48 @@
+"""
+Runs the backend with several worker processes.
+
+The schema upgrade and seed run once here, under the init lock, before the
+workers start; the workers skip them (DB_AUTO_INIT=false). WEB_CONCURRENCY is
+set for the workers so chat sessions and FAQ answers default to the shared
+database-backed stores instead of per-process memory, and GET /metrics sums
+the workers' histograms (METRICS_DIR).
+
+Run:  python serve.py --workers 4
+"""
+import argparse
+import os
+
+import uvicorn
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--log-level", default="info")
+    args = parser.parse_args()
+
+    # Config is read from the environment on import, in this process and in every worker
+    os.environ["WEB_CONCURRENCY"] = str(args.workers)
+    os.environ["DB_AUTO_INIT"] = "false"
+    from backend.bootstrap import initialize
+    from backend.database import engine
+
+    created = initialize(engine)
+    if created:
+        print("Indexes created:", ", ".join(created))
+    engine.dispose()
+
+    # Workers' metric snapshots from an earlier run would be added to this one's
+    from backend.config import METRICS_DIR
+    if METRICS_DIR and os.path.isdir(METRICS_DIR):
+        for filename in os.listdir(METRICS_DIR):
+            if filename.endswith((".json", ".tmp")):
+                os.remove(os.path.join(METRICS_DIR, filename))
+
+    uvicorn.run("backend.main:app", host=args.host, port=args.port, workers=args.workers, log_level=args.log_level)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,15 @@
-import os
 from dotenv import load_dotenv
 from groq import Groq
 
 load_dotenv(override=True)
-api_key = os.getenv("GROQ_API_KEY")
+# LLM_PROVIDER=stub checks the local stub server instead (benchmarks/stub_llm.py)
+from backend.config import GROQ_API_KEY as api_key, GROQ_BASE_URL
 
 print(f"Key loaded: {api_key[:10] if api_key else 'None'}...")
 
 if api_key:
     try:
-        client = Groq(api_key=api_key)
+        client = Groq(api_key=api_key, base_url=GROQ_BASE_URL)
         chat_completion = client.chat.completions.create(
             messages=[
                 {
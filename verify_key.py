@@ -1,6 +1,10 @@
 import os
 from dotenv import load_dotenv
-import google.generativeai as genai
+try:
+    import google.generativeai as genai
+except ImportError:
+    # Legacy Gemini check; the backend talks to Groq and no longer installs this package
+    raise SystemExit("pip install google-generativeai to run this script")
 
 # Force reload of .env
 load_dotenv(override=True)
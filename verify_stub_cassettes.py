@@ -0,0 +1,107 @@
+import json
+import os
+import sys
+import tempfile
+
+import httpx
+
+from benchmarks.common import free_port, start_backend, start_python, wait_for_port
+
+# Record/replay checks for the stub LLM server (benchmarks/stub_llm.py), fully offline:
+# a synth-mode stub stands in for Groq, a record-mode stub sits in front of it,
+# and a replay of the resulting cassette must give the backend the same answers
+# with no cassette misses. Exits 1 on failure.
+
+SCRIPT = [
+    ("chat", "What is my balance?"),
+    ("chat", "Show my recent transactions"),
+    ("chat", "What are the branch hours?"),
+    ("stream", "Show my recent transactions"),
+    ("chat", "I want to apply for a loan"),
+    ("chat", "What is my balance and my recent transactions?"),
+]
+
+failures = 0
+
+
+def check(name, ok, detail=""):
+    global failures
+    failures += not ok
+    print(f"[{'OK' if ok else 'FAIL'}] {name}" + (f": {detail}" if detail else ""))
+
+
+def start_stub(port, *args, env=None):
+    proc = start_python(["-m", "benchmarks.stub_llm", "--port", str(port), *args], env=env)
+    wait_for_port(port)
+    return proc
+
+
+def run_script(llm_port, workdir):
+    """Plays SCRIPT as one conversation against a fresh backend and returns the answers."""
+    api_port = free_port()
+    backend = start_backend(api_port, llm_port, cwd=workdir, env={"RESPONSE_CACHE_ENABLED": "false"})
+    answers, session_id = [], None
+    try:
+        with httpx.Client(base_url=f"http://127.0.0.1:{api_port}", timeout=60) as client:
+            for kind, message in SCRIPT:
+                body = {"message": message, "session_id": session_id}
+                if kind == "chat":
+                    reply = client.post("/chat", json=body).json()
+                    session_id = reply["session_id"]
+                    answers.append(reply["response"])
+                    continue
+                events = [json.loads(line[len("data: "):]) for line in client.post("/chat/stream", json=body).text.splitlines()
+                          if line.startswith("data: ")]
+                session_id = next(e["session_id"] for e in events if e["type"] == "session")
+                answers.append("".join(e["content"] for e in events if e["type"] == "token"))
+    finally:
+        backend.terminate()
+        backend.wait()
+    return answers
+
+
+def stub_stats(port):
+    return httpx.get(f"http://127.0.0.1:{port}/_stats").json()
+
+
+if __name__ == "__main__":
+    tmp = tempfile.mkdtemp()
+    cassette = os.path.join(tmp, "cassette.jsonl")
+    upstream_port, recorder_port, replayer_port = free_port(), free_port(), free_port()
+    processes = []
+    try:
+        # 1. Record through a synth stub standing in for Groq
+        processes.append(start_stub(upstream_port, "--latency", "0.02", "--latency-sigma", "0.5", "--token-rate", "400"))
+        processes.append(start_stub(recorder_port, "--mode", "record", "--cassette", cassette,
+                                    "--upstream", f"http://127.0.0.1:{upstream_port}/v1",
+                                    env={"GROQ_API_KEY": "upstream-key"}))
+        os.makedirs(os.path.join(tmp, "record"))
+        recorded_answers = run_script(recorder_port, os.path.join(tmp, "record"))
+        recorded = stub_stats(recorder_port)
+        with open(cassette) as f:
+            entries = [json.loads(line) for line in f]
+        check("every upstream exchange is in the cassette",
+              recorded["recorded"] == len(entries) == stub_stats(upstream_port)["requests"] > 0,
+              f"{len(entries)} entries")
+        check("tool calls are recorded", any(e["message"].get("tool_calls") for e in entries))
+        check("streamed completions are recorded", any(e["request"].get("stream") for e in entries))
+
+        # 2. Replay with the upstream gone, against a fresh database
+        for proc in processes:
+            proc.terminate()
+            proc.wait()
+        processes = [start_stub(replayer_port, "--mode", "replay", "--cassette", cassette, "--replay-speed", "0")]
+        os.makedirs(os.path.join(tmp, "replay"))
+        replayed_answers = run_script(replayer_port, os.path.join(tmp, "replay"))
+        replayed = stub_stats(replayer_port)
+        check("replay answers every request from the cassette",
+              replayed["misses"] == 0 and replayed["replayed"] == len(entries),
+              f"{replayed['replayed']} replayed, {replayed['misses']} misses")
+        check("replayed conversation matches the recording", replayed_answers == recorded_answers,
+              "" if replayed_answers == recorded_answers else f"{recorded_answers} != {replayed_answers}")
+    finally:
+        for proc in processes:
+            proc.terminate()
+            proc.wait()
+
+    sys.exit(1 if failures else 0)
@@ -0,0 +1,145 @@
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# Exactly-once checks for the loan/service submission queue (backend/submissions.py).
+# Runs against a throwaway database and journal; exits 1 on failure.
+
+tmp = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tmp, 'app.db')}"
+os.environ["SUBMISSION_JOURNAL_PATH"] = os.path.join(tmp, "journal.db")
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from backend.database import engine
+from backend.migrations import upgrade
+from backend.models import ServiceRequest, User
+from backend.submissions import SubmissionConflictError, SubmissionQueue, journal
+
+# Child process for the crash test: accepts requests with the writer stopped,
+# prints each reference ID, then dies without flushing (like a kill -9).
+CRASH_CHILD = """
+import os, sys
+from backend.submissions import SubmissionQueue
+queue = SubmissionQueue(flush_interval=3600)
+for n in range(int(sys.argv[1])):
+    print(queue.submit(1, "Checkbook", f"crash {n}"), flush=True)
+os._exit(1)
+"""
+
+failures = 0
+
+
+def check(name, ok, detail=""):
+    global failures
+    failures += not ok
+    print(f"[{'OK' if ok else 'FAIL'}] {name}" + (f": {detail}" if detail else ""))
+
+
+def service_request_ids():
+    with engine.connect() as conn:
+        return conn.execute(select(ServiceRequest.id)).scalars().all()
+
+
+def journal_count(queue):
+    with queue.journal_engine.connect() as conn:
+        return conn.execute(select(func.count()).select_from(journal)).scalar()
+
+
+if __name__ == "__main__":
+    upgrade(engine)
+    with engine.begin() as conn:
+        conn.execute(User.__table__.insert().values(id=1, name="Test", email="test@example.com"))
+
+    # 1. Concurrent submitters while the writer group-commits in the background
+    queue = SubmissionQueue(batch_size=50, flush_interval=0.01, block_size=25)
+    queue.start()
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        accepted = list(pool.map(lambda n: queue.submit(1, "Credit Card", f"concurrent {n}"), range(1000)))
+    queue.stop()
+    ids = service_request_ids()
+    check("concurrent submissions applied exactly once",
+          len(ids) == 1000 and set(ids) == set(accepted) and len(set(accepted)) == 1000,
+          f"{len(accepted)} accepted, {len(ids)} rows, {len(set(ids))} distinct, {queue.counters['batches']} batches")
+    check("journal drained", journal_count(queue) == 0)
+
+    # 2. Crash after accepting, before anything was written to service_requests
+    env = dict(os.environ, PYTHONPATH=os.path.dirname(os.path.abspath(__file__)))
+    child = subprocess.run([sys.executable, "-c", CRASH_CHILD, "200"], capture_output=True, text=True, env=env)
+    crashed = [int(line) for line in child.stdout.split()]
+    restarted = SubmissionQueue(flush_interval=0.01)
+    restarted.start()
+    restarted.stop()
+    ids = service_request_ids()
+    check("accepted requests survive a crash and are replayed on start",
+          len(crashed) == 200 and set(crashed) <= set(ids) and len(ids) == len(set(ids)) == 1200,
+          f"{len(crashed)} accepted before the crash, {restarted.counters['replayed']} replayed")
+
+    # 3. Crash after the service_requests commit but before the journal delete
+    queue = SubmissionQueue(flush_interval=3600)
+    pending = [queue.submit(1, "Loan", f"half applied {n}") for n in range(30)]
+    with queue.journal_engine.connect() as conn:
+        rows = [dict(r) for r in conn.execute(select(journal).limit(10)).mappings()]
+    with engine.begin() as conn:
+        conn.execute(ServiceRequest.__table__.insert(), rows)
+    queue.flush()
+    ids = service_request_ids()
+    check("replaying a half-applied batch does not duplicate rows",
+          set(pending) <= set(ids) and len(ids) == len(set(ids)) == 1230 and journal_count(queue) == 0)
+
+    # 4. Several processes' queues drawing ID blocks from the same database
+    queues = [SubmissionQueue(journal_path=os.path.join(tmp, f"journal{i}.db"), block_size=7) for i in range(4)]
+    results, lock = [], threading.Lock()
+
+    def submit_many(q):
+        refs = [q.submit(1, "Debit Card", "parallel") for _ in range(100)]
+        with lock:
+            results.extend(refs)
+
+    threads = [threading.Thread(target=submit_many, args=(q,)) for q in queues]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    for q in queues:
+        q.flush()
+    ids = service_request_ids()
+    check("separate queues never hand out the same reference ID",
+          len(set(results)) == 400 and len(ids) == len(set(ids)) == 1630)
+
+    # 5. Other writers while reference IDs are reserved but not yet flushed
+    from benchmarks.datagen import generate
+    queue = SubmissionQueue(journal_path=os.path.join(tmp, "mixed.db"), flush_interval=3600)
+    queued = {queue.submit(1, "Credit Card", f"mixed {n}"): f"mixed {n}" for n in range(3)}
+    with Session(engine) as db:
+        direct = ServiceRequest(user_id=1, service_type="Checkbook", details="direct", status="Requested")
+        db.add(direct)
+        db.commit()
+        direct_id = direct.id
+    generated = generate(engine, users=5, transactions=20, service_requests=5)
+    queue.flush()
+    with engine.connect() as conn:
+        details = dict(conn.execute(select(ServiceRequest.id, ServiceRequest.details)).all())
+    check("ORM inserts and datagen never take a reserved reference ID",
+          direct_id not in queued and all(details.get(ref) == text for ref, text in queued.items())
+          and details.get(direct_id) == "direct" and len(details) == 1630 + 3 + 1 + generated["service_requests"],
+          f"queued {sorted(queued)}, direct {direct_id}")
+
+    # 6. A raw insert that does take a reserved ID is reported, not silently dropped
+    reference = queue.submit(1, "Loan", "collides")
+    with engine.begin() as conn:
+        conn.execute(ServiceRequest.__table__.insert().values(id=reference, user_id=1, service_type="Other", details="raw"))
+    try:
+        queue.flush()
+        raised = False
+    except SubmissionConflictError:
+        raised = True
+    check("a colliding reference ID fails the flush and stays in the journal",
+          raised and journal_count(queue) == 1 and queue.counters["conflicts"] == 1)
+
+    engine.dispose()
+    sys.exit(1 if failures else 0)